@@ -0,0 +1,76 @@
+"""
+ベンチマーク用コーパス生成
+Qiita の記事タイトルに近い文字列と、LaTeX を多く含む文字列を乱数シードから再現可能に生成する
+"""
+import random
+from typing import List
+
+_TOPICS = [
+    "生成AI", "LLM", "Python", "RAG", "LangChain", "ChatGPT", "Transformer",
+    "PyTorch", "機械学習", "Docker", "TypeScript", "Rust", "AWS", "GitHub Actions"
+]
+
+_TITLE_TEMPLATES = [
+    "{topic}入門：{topic2}と組み合わせて使う方法",
+    "【{topic}】{number}分で分かる{topic2}の基礎",
+    "{topic}で{topic2}アプリを作ってみた",
+    "{topic} {version} の新機能まとめ",
+    "初心者向け {topic} × {topic2} ハンズオン",
+    "{topic}の性能を{number}倍にした話",
+]
+
+_LATEX_FRAGMENTS = [
+    r"$\alpha$", r"$\beta$", r"$\theta$", r"$\lambda$", r"$\Sigma$", r"$\nabla f$",
+    r"$\frac{1}{2}$", r"\frac{a}{b}", r"\sqrt{x}", r"\sqrt[3]{x}",
+    r"$E=mc^2$", r"x^{2}", r"e^{-x}", r"10^{3\times 2}", r"O(n^2)",
+    r"H_{2}O", r"x_{i}", r"a_{n+1}", r"$x_{ij}$", r"$y^{(k)}$",
+    r"\mathbb{R}", r"\mathbb{N}", r"\mathbf{W}", r"\mathcal{L}", r"\text{softmax}",
+    r"\leq", r"\geq", r"\approx", r"\infty", r"\int", r"\in", r"\sum", r"\rightarrow",
+    r"$\int_0^\infty$", r"\partial", r"\cdot", r"\times", r"\pm", r"\forall", r"\exists",
+]
+
+# 等価性チェックで組み合わせる断片（壊れた LaTeX や境界になりやすい記号も含める）
+FUZZ_ATOMS = _LATEX_FRAGMENTS + [
+    "\\", "\\in", "\\inf", "\\no", "\\frac", "\\sqrt", "\\mathbb", "\\text",
+    "{", "}", "[", "]", "$", "_", "^", " ", "=", "+", "-", "(", ")", "×", ",",
+    "a", "b", "x", "R", "N", "0", "1", "2", "9", "²", "あ", "漢", "{2}", "{n}",
+]
+
+
+def generate_titles(count: int, seed: int = 0) -> List[str]:
+    """Qiita の記事タイトルらしい文字列を生成する（大半は LaTeX を含まない）"""
+    rng = random.Random(seed)
+    titles = []
+    for _ in range(count):
+        title = rng.choice(_TITLE_TEMPLATES).format(
+            topic=rng.choice(_TOPICS),
+            topic2=rng.choice(_TOPICS),
+            number=rng.randint(1, 100),
+            version=f"{rng.randint(1, 4)}.{rng.randint(0, 12)}"
+        )
+        # 一部のタイトルには数式を混ぜる
+        if rng.random() < 0.2:
+            title += " " + rng.choice(_LATEX_FRAGMENTS)
+        titles.append(title)
+    return titles
+
+
+def generate_latex_heavy(count: int, seed: int = 0) -> List[str]:
+    """LaTeX の記号を多く含む文字列を生成する"""
+    rng = random.Random(seed)
+    texts = []
+    for _ in range(count):
+        parts = [rng.choice(_LATEX_FRAGMENTS) for _ in range(rng.randint(3, 10))]
+        texts.append(rng.choice(_TOPICS) + "の数式 " + " ".join(parts))
+    return texts
+
+
+def generate_corpus(count: int, seed: int = 0) -> List[str]:
+    """タイトルと LaTeX の多い文字列を半分ずつ含むコーパスを生成する"""
+    half = count // 2
+    return generate_titles(count - half, seed) + generate_latex_heavy(half, seed + 1)
+
+
+def generate_fuzz_case(rng: random.Random, max_atoms: int = 12) -> List[str]:
+    """等価性チェック用に断片の列を生成する"""
+    return [rng.choice(FUZZ_ATOMS) for _ in range(rng.randint(0, max_atoms))]
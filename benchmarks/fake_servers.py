@@ -0,0 +1,287 @@
+"""
+負荷試験用のスタンドインサーバ
+
+Qiita の記事一覧API（/api/v2/items）と Slack Web API（chat.postMessage など）の
+最低限の振る舞いをローカルの HTTP サーバで再現する。
+応答の遅延・エラー率・レート制限（Qiita は Rate-Remaining: 0 の 403、Slack は Retry-After 付きの 429）を
+設定でき、サーバ側で受けた呼び出しを (エンドポイント, ステータス) ごとに数える
+"""
+import json
+import time
+import random
+import hashlib
+import threading
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+# 記事本文の生成に使う語彙（少ない語彙から作ると、どの記事も文字 n-gram がほぼ共通になり
+# 類似記事の判定が実際の記事より極端に遅くなるため、音節を組み合わせた語を多数用意する）
+SYLLABLES = "あいうえおかきくけこさしすせそたちつてとなにぬねのはひふへほまみむめもやゆよらりるれろわん"
+_vocabulary_rng = random.Random(0)
+VOCABULARY = ["".join(_vocabulary_rng.choice(SYLLABLES) for _ in range(_vocabulary_rng.randint(2, 5)))
+              for _ in range(8192)]
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """リクエストをサーバ（FakeServer）の handle に渡す"""
+    
+    protocol_version = "HTTP/1.1"  # keep-alive
+    
+    def log_message(self, format, *args):
+        pass
+    
+    def do_GET(self):
+        self._dispatch()
+    
+    def do_POST(self):
+        self._dispatch()
+    
+    def _dispatch(self):
+        url = urlparse(self.path)
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        status, headers, payload = self.server.app.handle(url.path, parse_qs(url.query), self.headers, body)
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    # 既定の待ち行列（5）では同時接続が多いと SYN が再送され、応答に1秒以上の遅延が混じる
+    request_queue_size = 256
+
+
+class FakeServer:
+    """遅延とエラーを注入できるスタンドインサーバの基底クラス"""
+    
+    def __init__(self, latency_ms: float = 0.0, jitter_ms: float = 0.0, error_rate: float = 0.0, seed: int = 0):
+        self.latency = latency_ms / 1000
+        self.jitter = jitter_ms / 1000
+        self.error_rate = error_rate
+        self.calls: Counter = Counter()  # (エンドポイント, ステータス) → 回数
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server: Optional[_Server] = None
+    
+    def start(self) -> "FakeServer":
+        """空いているポートで待ち受けを始める"""
+        self._server = _Server(("127.0.0.1", 0), _Handler)
+        self._server.app = self
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+    
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+    
+    @property
+    def port(self) -> int:
+        return self._server.server_port
+    
+    def handle(self, path: str, query: Dict[str, List[str]], headers: Any,
+               body: bytes) -> Tuple[int, Dict[str, str], bytes]:
+        raise NotImplementedError
+    
+    def _delay_and_fail(self) -> bool:
+        """設定した遅延だけ待ち、エラーを返すべきなら True を返す"""
+        with self._lock:
+            delay = max(0.0, self.latency + self._rng.uniform(-self.jitter, self.jitter))
+            failed = self._rng.random() < self.error_rate
+        if delay:
+            time.sleep(delay)
+        return failed
+    
+    def _count(self, endpoint: str, status: int):
+        with self._lock:
+            self.calls[(endpoint, status)] += 1
+
+
+class FakeQiitaServer(FakeServer):
+    """
+    Qiita の記事一覧APIのスタンドイン
+    
+    タグごとに articles_per_tag 件の記事を（タグ名から決まる内容で）新しい順に返し、
+    query の "tag:" と "created:>=" 、" OR " 、page / per_page を解釈する。
+    quota 回を超えると Rate-Remaining: 0 の 403 を返す。publish で各タグに新しい記事を追加できる
+    """
+    
+    def __init__(self, articles_per_tag: int = 50, quota: int = 100000, body_length: int = 2000, **kwargs):
+        super().__init__(**kwargs)
+        self.articles_per_tag = articles_per_tag
+        self.quota = quota
+        self.body_length = body_length
+        self._remaining = quota
+        self._reset_at = int(time.time()) + 3600
+        # 既存の記事は2日前から遡って並べ、publish した記事はその後に続ける
+        self._origin = datetime.now(timezone.utc).replace(microsecond=0) - timedelta(days=2)
+        self._published = 0
+        self._articles: Dict[str, List[Dict[str, Any]]] = {}
+    
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port}/api/v2/items"
+    
+    def handle(self, path, query, headers, body):
+        failed = self._delay_and_fail()
+        with self._lock:
+            if self._remaining > 0:
+                self._remaining -= 1
+                remaining = self._remaining
+            else:
+                remaining = None
+        rate_headers = {
+            "Rate-Limit": str(self.quota),
+            "Rate-Remaining": str(remaining or 0),
+            "Rate-Reset": str(self._reset_at),
+            "Content-Type": "application/json",
+        }
+        if remaining is None:
+            self._count("items", 403)
+            return 403, rate_headers, b'{"message":"Rate limit exceeded","type":"rate_limit_exceeded"}'
+        if failed:
+            self._count("items", 500)
+            return 500, rate_headers, b'{"message":"Internal Server Error","type":"internal_server_error"}'
+        
+        tags, since = _parse_query(query.get("query", [""])[0])
+        page = int(query.get("page", ["1"])[0])
+        per_page = int(query.get("per_page", ["20"])[0])
+        articles = [a for tag in tags for a in self._tag_articles(tag)]
+        if since:
+            articles = [a for a in articles if a["created_at"][:10] >= since]
+        if len(tags) > 1:
+            articles.sort(key=lambda a: a["created_at"], reverse=True)
+        payload = json.dumps(articles[(page - 1) * per_page:page * per_page], ensure_ascii=False).encode("utf-8")
+        
+        etag = '"%s"' % hashlib.md5(payload).hexdigest()
+        rate_headers["ETag"] = etag
+        if headers.get("If-None-Match") == etag:
+            self._count("items", 304)
+            return 304, rate_headers, b""
+        self._count("items", 200)
+        return 200, rate_headers, payload
+    
+    def publish(self, count: int):
+        """すべてのタグに、既存の記事より新しい記事を count 件ずつ追加する"""
+        with self._lock:
+            self._published += count
+            self._articles.clear()
+    
+    def _tag_articles(self, tag: str) -> List[Dict[str, Any]]:
+        """タグの記事（新しい順）。初回に生成して以降は同じものを返す"""
+        key = tag.lower()
+        with self._lock:
+            articles = self._articles.get(key)
+            published = self._published
+        if articles is not None:
+            return articles
+        
+        articles = []
+        # 番号が負の記事が publish で追加された記事（番号ごとに内容が決まるため、追加しても既存の記事は変わらない）
+        for i in range(-published, self.articles_per_tag):
+            rng = random.Random(f"{key}:{i}")
+            article_id = hashlib.sha1(f"{key}:{i}".encode("utf-8")).hexdigest()[:20]
+            created = self._origin - timedelta(minutes=i * 37 + rng.randint(0, 30))
+            words = rng.choices(VOCABULARY, k=self.body_length // 4)
+            articles.append({
+                "id": article_id,
+                "title": f"{tag} の記事 {i}: {' '.join(words[:4])}",
+                "url": f"https://qiita.com/user{i % 97}/items/{article_id}",
+                "body": "# " + " ".join(words)[:self.body_length],
+                "likes_count": int(rng.paretovariate(1.2)) - 1,
+                "stocks_count": int(rng.paretovariate(1.5)) - 1,
+                "created_at": created.isoformat(),
+                "updated_at": created.isoformat(),
+                "user": {"id": f"user{rng.randint(0, 300)}"},
+                "tags": [{"name": tag, "versions": []}],
+            })
+        with self._lock:
+            return self._articles.setdefault(key, articles)
+
+
+class FakeSlackServer(FakeServer):
+    """
+    Slack Web API のスタンドイン
+    
+    chat.postMessage はチャンネルごとに rate 件/秒（burst 件までのバースト）を超えると
+    Retry-After: retry_after の 429 を返す。conversations.history / replies は空の履歴を返す
+    """
+    
+    def __init__(self, rate: float = 1.0, burst: int = 3, retry_after: int = 1, **kwargs):
+        super().__init__(**kwargs)
+        self.rate = rate
+        self.burst = burst
+        self.retry_after = retry_after
+        self.posts: Counter = Counter()  # チャンネル → 投稿数
+        self._buckets: Dict[str, Tuple[float, float]] = {}  # チャンネル → (トークン, 更新時刻)
+        self._ts = 0
+    
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port}/api/"
+    
+    def handle(self, path, query, headers, body):
+        method = path.rsplit("/", 1)[-1]
+        failed = self._delay_and_fail()
+        content_type = {"Content-Type": "application/json"}
+        if failed:
+            self._count(method, 503)
+            return 503, content_type, b'{"ok":false,"error":"service_unavailable"}'
+        
+        if method == "chat.postMessage":
+            args = _parse_body(headers, body)
+            channel = args.get("channel", "")
+            if not self._take_token(channel):
+                self._count(method, 429)
+                return 429, dict(content_type, **{"Retry-After": str(self.retry_after)}), \
+                    b'{"ok":false,"error":"ratelimited"}'
+            with self._lock:
+                self._ts += 1
+                ts = f"{int(time.time())}.{self._ts:06d}"
+                self.posts[channel] += 1
+            self._count(method, 200)
+            return 200, content_type, json.dumps({"ok": True, "channel": channel, "ts": ts}).encode("utf-8")
+        
+        self._count(method, 200)
+        if method in ("conversations.history", "conversations.replies"):
+            return 200, content_type, b'{"ok":true,"messages":[],"has_more":false}'
+        return 200, content_type, b'{"ok":true}'
+    
+    def _take_token(self, channel: str) -> bool:
+        """チャンネルのトークンバケットから1つ取り出す（無ければ False）"""
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated_at = self._buckets.get(channel, (float(self.burst), now))
+            tokens = min(self.burst, tokens + (now - updated_at) * self.rate)
+            taken = tokens >= 1
+            self._buckets[channel] = (tokens - 1 if taken else tokens, now)
+            return taken
+
+
+def _parse_query(query: str) -> Tuple[List[str], Optional[str]]:
+    """検索クエリからタグ（出現順）と created:>= の日付を取り出す"""
+    tags = []
+    since = None
+    for token in query.split():
+        if token.startswith("tag:"):
+            tags.append(token[4:])
+        elif token.startswith("created:>="):
+            since = token[len("created:>="):]
+    return tags, since
+
+
+def _parse_body(headers: Any, body: bytes) -> Dict[str, Any]:
+    """JSON またはフォーム形式のリクエスト本文を辞書にする"""
+    if not body:
+        return {}
+    if "json" in (headers.get("Content-Type") or ""):
+        return json.loads(body.decode("utf-8"))
+    return {key: values[0] for key, values in parse_qs(body.decode("utf-8")).items()}
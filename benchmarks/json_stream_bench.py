@@ -0,0 +1,154 @@
+"""
+記事一覧レスポンスの解析のベンチマーク
+
+1ページの件数を変えながら、json.loads でまとめて解析した場合と、
+src/utils/json_stream で受信しながら本文を切り詰めた場合のピークメモリと処理時間を比べる。
+QiitaService と同じく受信しながら本文のプレビュー（src/utils/preview）を取り出す場合の処理時間も表示する
+
+使い方（リポジトリのルートで実行）:
+    python -m benchmarks.json_stream_bench          # 計測結果を表示
+    python -m benchmarks.json_stream_bench --check  # 出力の一致と、作業用メモリが件数によらず一定かを確認
+"""
+import sys
+import json
+import functools
+import time
+import random
+import argparse
+import tracemalloc
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from src.utils.json_stream import iter_array_items
+from src.utils.preview import PreviewExtractor, extract_preview
+
+# 受信時のチャンクサイズ（QiitaService と同じ）
+CHUNK_SIZE = 64 * 1024
+STRING_LIMITS = {"body": 200, "rendered_body": 0}
+
+
+def generate_page(count: int, body_length: int, seed: int = 0) -> bytes:
+    """Qiita の記事一覧 API に近い形のレスポンス本文を生成する"""
+    rng = random.Random(seed)
+    paragraph = "## 見出し\nPython で $E=mc^2$ を計算する `code` と本文のテキスト。\n"
+    items = []
+    for i in range(count):
+        body = (paragraph * (body_length // len(paragraph) + 1))[:body_length]
+        items.append({
+            "rendered_body": f"<p>{body}</p>" * 2,
+            "body": body,
+            "coediting": False,
+            "comments_count": rng.randint(0, 20),
+            "created_at": "2024-01-01T09:00:00+09:00",
+            "id": f"{i:020x}",
+            "likes_count": rng.randint(0, 500),
+            "private": False,
+            "tags": [{"name": "Python", "versions": []}, {"name": "生成AI", "versions": []}],
+            "title": f"記事 {i} の タイトル",
+            "updated_at": "2024-01-02T09:00:00+09:00",
+            "url": f"https://qiita.com/user/items/{i:020x}",
+            "user": {"id": "user", "description": "自己紹介" * 20},
+        })
+    return json.dumps(items, ensure_ascii=False).encode("utf-8")
+
+
+def _chunks(raw: bytes) -> Iterator[bytes]:
+    for start in range(0, len(raw), CHUNK_SIZE):
+        yield raw[start:start + CHUNK_SIZE]
+
+
+def parse_whole(raw: bytes) -> List[Dict[str, Any]]:
+    """本文を受信し終えてから json.loads で解析し、切り詰める（従来の方法）"""
+    content = b"".join(_chunks(raw))
+    items = json.loads(content)
+    for item in items:
+        item.pop("rendered_body", None)
+        item["body"] = item["body"][:STRING_LIMITS["body"]]
+    return items
+
+
+def parse_streaming(raw: bytes) -> List[Dict[str, Any]]:
+    """受信しながら解析し、本文を切り詰める"""
+    return list(iter_array_items(_chunks(raw), STRING_LIMITS))
+
+
+def parse_preview_whole(raw: bytes) -> List[Dict[str, Any]]:
+    """本文を受信し終えてから json.loads で解析し、本文全体からプレビューを取り出す"""
+    items = json.loads(b"".join(_chunks(raw)))
+    for item in items:
+        item.pop("rendered_body", None)
+        item["body"] = extract_preview(item["body"], STRING_LIMITS["body"])
+    return items
+
+
+def parse_preview_streaming(raw: bytes) -> List[Dict[str, Any]]:
+    """受信しながら解析し、本文のプレビューを必要な文字数まで取り出す（QiitaService と同じ方法）"""
+    extractors = {"body": functools.partial(PreviewExtractor, STRING_LIMITS["body"])}
+    return list(iter_array_items(_chunks(raw), {"rendered_body": 0}, extractors))
+
+
+def measure(func: Callable[[bytes], Any], raw: bytes, rounds: int) -> Dict[str, float]:
+    """
+    ピークメモリ・作業用メモリ・最速の処理時間を計測する
+    
+    作業用メモリは、ピークから解析結果として残るぶんを除いたもの（解析中だけ使うメモリ）
+    """
+    tracemalloc.start()
+    result = func(raw)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    
+    best = min(_elapsed(func, raw) for _ in range(rounds))
+    return {"peak_kb": peak / 1024, "working_kb": (peak - current) / 1024, "ms": best * 1e3}
+
+
+def _elapsed(func: Callable[[bytes], Any], raw: bytes) -> float:
+    start = time.perf_counter()
+    func(raw)
+    return time.perf_counter() - start
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="記事一覧レスポンスの解析のベンチマーク")
+    parser.add_argument("--page-sizes", type=int, nargs="+", default=[10, 50, 100])
+    parser.add_argument("--body-length", type=int, default=8000, help="1記事の本文の文字数")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--check", action="store_true", help="出力の一致と作業用メモリの増え方を確認する")
+    parser.add_argument("--growth", type=float, default=2.0,
+                        help="ストリーミング解析の作業用メモリの、ページ間での許容倍率")
+    args = parser.parse_args(argv)
+    
+    print(f"{'per_page':>8} {'size_kb':>8} {'whole_peak_kb':>14} {'stream_peak_kb':>15} "
+          f"{'stream_work_kb':>15} {'whole_ms':>9} {'stream_ms':>10} {'preview_ms':>11}")
+    failures = []
+    working = []
+    for page_size in args.page_sizes:
+        raw = generate_page(page_size, args.body_length)
+        whole = measure(parse_whole, raw, args.rounds)
+        stream = measure(parse_streaming, raw, args.rounds)
+        preview = measure(parse_preview_streaming, raw, args.rounds)
+        working.append(stream["working_kb"])
+        print(f"{page_size:8d} {len(raw) / 1024:8.0f} {whole['peak_kb']:14.0f} {stream['peak_kb']:15.0f} "
+              f"{stream['working_kb']:15.0f} {whole['ms']:9.1f} {stream['ms']:10.1f} {preview['ms']:11.1f}")
+        if parse_whole(raw) != parse_streaming(raw):
+            failures.append(f"per_page={page_size}: ストリーミング解析の結果が json.loads と一致しません")
+        if parse_preview_whole(raw) != parse_preview_streaming(raw):
+            failures.append(f"per_page={page_size}: 受信しながら取り出したプレビューが本文全体からのものと一致しません")
+    
+    if not args.check:
+        return 0
+    
+    # 解析中だけ使うメモリは、ページの件数によらずほぼ一定であること
+    growth = max(working) / min(working) if min(working) else 1.0
+    if growth > args.growth:
+        failures.append(f"ストリーミング解析の作業用メモリが件数とともに増えています（{growth:.2f}x）")
+    for failure in failures:
+        print(f"❌ {failure}")
+    if failures:
+        return 1
+    print(f"✅ 出力は一致し、作業用メモリの増え方は {growth:.2f}x に収まっています。")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,225 @@
+"""
+エンドツーエンドの負荷試験
+
+ローカルのスタンドイン（benchmarks/fake_servers.py）の Qiita API と Slack Web API に向けて、
+main.py と同じパイプライン（取得 → 重複除外 → 選択 → 通知）を実行し、
+実行ごとのスループット、処理段階ごと・API ごとのレイテンシの分位点、API の呼び出し数を表示する。
+実際の API には一切アクセスしない（トークンもダミーの値を使う）
+
+使い方（リポジトリのルートで実行）:
+    python -m benchmarks.loadtest                                  # 500タグ・200チャンネルで2回実行
+    python -m benchmarks.loadtest --tags 50 --channels 20 --slack-error-rate 0.05
+    python -m benchmarks.loadtest --set slack_delivery_concurrency=32 --set notification_mode='"digest"'
+    python -m benchmarks.loadtest --check --max-seconds 120        # 1回目の実行時間の上限と通知の成否を確認
+
+注意: リポジトリに .env がある場合、その SLACK_CHANNELS の通知先も（スタンドインへの送信として）加わる
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+from benchmarks.fake_servers import FakeQiitaServer, FakeSlackServer
+
+# 分位点を表示する処理段階（main.py / SlackService のスパン）
+STAGES = ["fetch", "global_dedup", "select", "notify", "dedup", "post"]
+
+
+def parse_overrides(items: List[str]) -> Dict[str, Any]:
+    """--set key=value（value は JSON。解釈できなければ文字列）を辞書にする"""
+    overrides = {}
+    for item in items:
+        key, sep, value = item.partition("=")
+        if not sep:
+            raise SystemExit(f"--set は key=value の形式で指定してください: {item}")
+        try:
+            overrides[key] = json.loads(value)
+        except ValueError:
+            overrides[key] = value
+    return overrides
+
+
+def build_config(args: argparse.Namespace, qiita: FakeQiitaServer, slack: FakeSlackServer,
+                 workdir: str) -> Dict[str, Any]:
+    """タグ数・チャンネル数に合わせた config.json の内容（タグはチャンネルに順番に割り当てる）"""
+    tags = [f"loadtest{i:03d}" for i in range(args.tags)]
+    channels = [f"C{i:08d}" for i in range(args.channels)]
+    config = {
+        "tags": tags,
+        "routes": {tag: [channels[i % len(channels)]] for i, tag in enumerate(tags)},
+        "state_dir": os.path.join(workdir, "state"),
+        "qiita_api_url": qiita.url,
+        "slack_api_url": slack.url,
+        "fetch_per_tag": args.fetch_per_tag,
+        "notify_per_tag": args.notify_per_tag,
+        "rate_limit_per_hour": args.qiita_quota,
+    }
+    config.update(parse_overrides(args.set))
+    return config
+
+
+def collect_run(run: int, success: bool, seconds: float, tags: int,
+                qiita_calls: Counter, slack_calls: Counter) -> Dict[str, Any]:
+    """直前の実行のメトリクスとサーバ側の呼び出し数をまとめる"""
+    from src.utils.metrics import metrics
+    
+    report = metrics.report()
+    stages = {}
+    for stage in STAGES:
+        p50 = metrics.quantile("span_seconds", 0.5, stage=stage)
+        if p50 is not None:
+            stages[stage] = {"p50": p50, "p95": metrics.quantile("span_seconds", 0.95, stage=stage),
+                             "p99": metrics.quantile("span_seconds", 0.99, stage=stage)}
+    
+    api = {}
+    for histogram in report["histograms"]:
+        if histogram["name"] == "qiita_request_seconds":
+            api["qiita"] = histogram
+        elif histogram["name"] == "slack_api_seconds":
+            api[histogram["labels"]["method"]] = histogram
+    
+    counters = {}
+    for counter in report["counters"]:
+        labels = ",".join(f"{k}={v}" for k, v in sorted(counter["labels"].items()))
+        counters[f"{counter['name']}{{{labels}}}" if labels else counter["name"]] = counter["value"]
+    
+    posted = sum(count for (method, status), count in slack_calls.items()
+                 if method == "chat.postMessage" and status == 200)
+    return {
+        "run": run,
+        "success": success,
+        "seconds": round(seconds, 3),
+        "tags_per_second": round(tags / seconds, 1) if seconds else None,
+        "messages_per_second": round(posted / seconds, 1) if seconds else None,
+        "stages": stages,
+        "api": {name: {key: h[key] for key in ("count", "p50", "p95", "max")} for name, h in api.items()},
+        "counters": counters,
+        "server_calls": {
+            "qiita": {f"{endpoint} {status}": count for (endpoint, status), count in sorted(qiita_calls.items())},
+            "slack": {f"{endpoint} {status}": count for (endpoint, status), count in sorted(slack_calls.items())},
+        },
+    }
+
+
+def print_run(result: Dict[str, Any]):
+    print(f"\n=== 実行 {result['run']}: {'通知成功' if result['success'] else '通知なし・失敗'} "
+          f"{result['seconds']:.2f}s  タグ {result['tags_per_second']}/s  投稿 {result['messages_per_second']}/s")
+    print(f"{'stage':<14}{'p50_s':>10}{'p95_s':>10}{'p99_s':>10}")
+    for stage, quantiles in result["stages"].items():
+        print(f"{stage:<14}{quantiles['p50']:>10.3f}{quantiles['p95']:>10.3f}{quantiles['p99']:>10.3f}")
+    print(f"{'api':<24}{'count':>8}{'p50_s':>10}{'p95_s':>10}{'max_s':>10}")
+    for name, h in result["api"].items():
+        print(f"{name:<24}{h['count']:>8}{h['p50']:>10.3f}{h['p95']:>10.3f}{h['max']:>10.3f}")
+    for side, calls in result["server_calls"].items():
+        if calls:
+            print(f"{side} サーバ: " + ", ".join(f"{name}={count}" for name, count in calls.items()))
+    interesting = ("qiita_requests_total", "qiita_rate_limited_total", "qiita_rate_limit_denied_total",
+                   "slack_api_calls_total", "slack_retries_total", "slack_spooled_messages_total",
+                   "articles_total", "payload_renders_total", "tags_deferred_total",
+                   "qiita_hedged_requests_total")
+    for name, value in result["counters"].items():
+        if name.startswith(interesting):
+            print(f"  {name} = {value:g}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="ローカルのスタンドインに対するエンドツーエンドの負荷試験")
+    parser.add_argument("--tags", type=int, default=500)
+    parser.add_argument("--channels", type=int, default=200)
+    parser.add_argument("--runs", type=int, default=2, help="実行回数（2回目以降は増分取得・キャッシュが効いた状態）")
+    parser.add_argument("--new-per-run", type=int, default=2,
+                        help="2回目以降の実行の前に、スタンドインが各タグに追加する新しい記事の数")
+    parser.add_argument("--articles-per-tag", type=int, default=50, help="スタンドインがタグごとに返す記事数")
+    parser.add_argument("--fetch-per-tag", type=int, default=20)
+    parser.add_argument("--notify-per-tag", type=int, default=1)
+    parser.add_argument("--qiita-latency-ms", type=float, default=30.0)
+    parser.add_argument("--qiita-jitter-ms", type=float, default=10.0)
+    parser.add_argument("--qiita-error-rate", type=float, default=0.0, help="500 を返す割合")
+    parser.add_argument("--qiita-quota", type=int, default=100000, help="Rate-Limit（超えると 403）")
+    parser.add_argument("--slack-latency-ms", type=float, default=20.0)
+    parser.add_argument("--slack-jitter-ms", type=float, default=10.0)
+    parser.add_argument("--slack-error-rate", type=float, default=0.0, help="503 を返す割合")
+    parser.add_argument("--slack-rate", type=float, default=1.0, help="チャンネルごとの chat.postMessage の上限（件/秒）")
+    parser.add_argument("--slack-burst", type=int, default=3)
+    parser.add_argument("--slack-retry-after", type=int, default=1, help="429 の Retry-After（秒）")
+    parser.add_argument("--set", action="append", default=[], metavar="KEY=VALUE",
+                        help="config.json の値を上書きする（VALUE は JSON）。複数指定可")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", metavar="PATH", help="結果を JSON で書き出す")
+    parser.add_argument("--keep", action="store_true", help="作業ディレクトリ（state_dir を含む）を残す")
+    parser.add_argument("--check", action="store_true", help="1回目の通知の成否と実行時間の上限を確認する")
+    parser.add_argument("--max-seconds", type=float, default=300.0, help="--check での1回目の実行時間の上限")
+    args = parser.parse_args(argv)
+    
+    # main.py はリポジトリのルートから読み込む（作業ディレクトリを移す前に）
+    import main as pipeline
+    from src.config import Config
+    from src.services import QiitaService, SlackService
+    
+    qiita = FakeQiitaServer(articles_per_tag=args.articles_per_tag, quota=args.qiita_quota,
+                            latency_ms=args.qiita_latency_ms, jitter_ms=args.qiita_jitter_ms,
+                            error_rate=args.qiita_error_rate, seed=args.seed).start()
+    slack = FakeSlackServer(rate=args.slack_rate, burst=args.slack_burst, retry_after=args.slack_retry_after,
+                            latency_ms=args.slack_latency_ms, jitter_ms=args.slack_jitter_ms,
+                            error_rate=args.slack_error_rate, seed=args.seed + 1).start()
+    workdir = tempfile.mkdtemp(prefix="qiita-loadtest-")
+    cwd = os.getcwd()
+    results = []
+    try:
+        with open(os.path.join(workdir, "config.json"), "w", encoding="utf-8") as f:
+            json.dump(build_config(args, qiita, slack, workdir), f, ensure_ascii=False)
+        # 本物のトークンをスタンドインに送らないよう、ダミーの値で上書きする
+        os.environ.update(SLACK_TOKEN="xoxb-loadtest", API_TOKEN="loadtest", SLACK_CHANNELS="")
+        os.chdir(workdir)
+        config = Config()
+        print(f"作業ディレクトリ: {workdir}（タグ {len(config.tags)} 件、通知先 {len(config.routing)} 件）")
+        
+        for run in range(1, args.runs + 1):
+            if run > 1:
+                qiita.publish(args.new_per_run)
+            qiita_before, slack_before = Counter(qiita.calls), Counter(slack.calls)
+            start = time.perf_counter()
+            # GitHub Actions と同じく、実行ごとにサービスを作り直す
+            success = pipeline.run_pipeline(QiitaService(config), SlackService(config))
+            seconds = time.perf_counter() - start
+            result = collect_run(run, success, seconds, len(config.tags),
+                                 qiita.calls - qiita_before, slack.calls - slack_before)
+            results.append(result)
+    finally:
+        os.chdir(cwd)
+        qiita.stop()
+        slack.stop()
+        if args.keep:
+            print(f"作業ディレクトリを残しました: {workdir}")
+        else:
+            shutil.rmtree(workdir, ignore_errors=True)
+    
+    for result in results:
+        print_run(result)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+    
+    if not args.check:
+        return 0
+    
+    failures = []
+    if not results[0]["success"]:
+        failures.append("1回目の実行で Slack への通知に失敗しました")
+    if results[0]["seconds"] > args.max_seconds:
+        failures.append(f"1回目の実行に {results[0]['seconds']:.1f}s かかりました（上限 {args.max_seconds:.0f}s）")
+    for failure in failures:
+        print(f"❌ {failure}")
+    if failures:
+        return 1
+    print(f"✅ 1回目の実行は {results[0]['seconds']:.1f}s で完了しました。")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,117 @@
+"""
+記事のランキングのベンチマーク
+
+候補数を変えながら、RankingEngine（スコア計算 + ヒープによる上位選択）の処理時間を計測し、
+全件を毎回走査して選ぶ素朴な実装と選択結果が一致するかを確認する
+
+使い方（リポジトリのルートで実行）:
+    python -m benchmarks.ranking_bench          # 計測結果を表示
+    python -m benchmarks.ranking_bench --check  # 選択結果の一致と、最大の候補数での処理時間の上限を確認
+"""
+import sys
+import time
+import random
+import argparse
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+from src.models import Article
+from src.services.ranking import RankingEngine, _load_numpy_ops
+
+NOW = datetime(2024, 6, 1, tzinfo=timezone.utc)
+TAGS = ["生成AI", "Python", "LLM", "AWS", "Docker"]
+
+
+def generate_candidates(count: int, seed: int = 0) -> List[Article]:
+    """いいね数の偏りと著者の重複がある候補を生成する（新しい順）"""
+    rng = random.Random(seed)
+    articles = []
+    for i in range(count):
+        created = NOW - timedelta(minutes=i * 7 + rng.randint(0, 6))
+        articles.append(Article(
+            id=f"{i:020x}",
+            title=f"記事 {i}",
+            url=f"https://qiita.com/user/items/{i:020x}",
+            likes=int(rng.paretovariate(1.2)) - 1,
+            stocks=int(rng.paretovariate(1.5)) - 1,
+            tag=TAGS[i % len(TAGS)],
+            created_at=created.isoformat(),
+            user=f"user{int(rng.paretovariate(0.8)) % 500}",
+            tags=tuple(rng.sample(TAGS, 2))
+        ))
+    return articles
+
+
+def reference_top_k(engine: RankingEngine, articles: List[Article], k: int) -> List[str]:
+    """毎回全候補のスコアを下げ直して最大のものを選ぶ素朴な実装（O(nk)）"""
+    scores = engine.score(articles, NOW)
+    counts: Dict[str, int] = {}
+    remaining = list(range(len(articles)))
+    selected = []
+    while remaining and len(selected) < k:
+        best = max(
+            remaining,
+            key=lambda i: (engine._penalized(scores[i], counts.get(articles[i].user, 0)), -i)
+        )
+        remaining.remove(best)
+        selected.append(articles[best].id)
+        counts[articles[best].user] = counts.get(articles[best].user, 0) + 1
+    return selected
+
+
+def measure(engine: RankingEngine, articles: List[Article], k: int, rounds: int) -> float:
+    """score + top_k の最速の処理時間（ms）"""
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        engine.top_k(articles, k, now=NOW)
+        best = min(best, time.perf_counter() - start)
+    return best * 1e3
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="記事のランキングのベンチマーク")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--k", type=int, default=10, help="選ぶ件数")
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--check", action="store_true", help="選択結果の一致と処理時間の上限を確認する")
+    parser.add_argument("--budget-ms", type=float, default=2000.0,
+                        help="最大の候補数での処理時間の上限（純 Python で計算した場合）")
+    args = parser.parse_args(argv)
+    
+    backends = ["python"] + (["numpy"] if _load_numpy_ops() is not None else [])
+    engines = {backend: RankingEngine(tag_priority=TAGS, backend=backend) for backend in backends}
+    print(f"{'candidates':>10} " + " ".join(f"{backend + '_ms':>10}" for backend in backends))
+    
+    failures = []
+    slowest = 0.0
+    for size in args.sizes:
+        articles = generate_candidates(size)
+        timings = [measure(engines[backend], articles, args.k, args.rounds) for backend in backends]
+        print(f"{size:10d} " + " ".join(f"{ms:10.1f}" for ms in timings))
+        if size == max(args.sizes):
+            slowest = timings[0]
+    
+    # 素朴な実装は O(nk) のため、一致の確認は少ない候補で行う
+    sample = generate_candidates(2000, seed=1)
+    for backend, engine in engines.items():
+        expected = reference_top_k(engine, sample, args.k)
+        actual = [article.id for article in engine.top_k(sample, args.k, now=NOW)]
+        if actual != expected:
+            failures.append(f"{backend}: 上位の選択結果が素朴な実装と一致しません")
+    
+    if not args.check:
+        return 0
+    
+    if slowest > args.budget_ms:
+        failures.append(f"候補 {max(args.sizes)} 件の処理に {slowest:.0f}ms かかりました（上限 {args.budget_ms:.0f}ms）")
+    for failure in failures:
+        print(f"❌ {failure}")
+    if failures:
+        return 1
+    print(f"✅ 選択結果は一致し、候補 {max(args.sizes)} 件を {slowest:.0f}ms で処理しました。")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,97 @@
+"""
+Qiita記事通知Bot - 常駐実行ファイル
+サービス（Qiita の HTTP セッション、Slack クライアント）を起動したまま保持し、
+設定したスケジュールでワークフローを実行する。config.json の変更は再起動せずに反映する
+"""
+import sys
+import time
+import argparse
+from typing import List, Optional
+
+import schedule
+
+from src.config import Config
+from src.services import QiitaService, SlackService
+from main import run_pipeline
+
+
+class NotifierDaemon:
+    """スケジュールに従ってワークフローを繰り返し実行する常駐プロセス"""
+    
+    def __init__(self, config: Config):
+        self.config = config
+        self.qiita_service = QiitaService(config)
+        self.slack_service = SlackService(config)
+        self.scheduler = schedule.Scheduler()
+        self._schedule_signature = None
+    
+    def run_once(self):
+        """ワークフローを1回実行する（失敗しても常駐は続ける）"""
+        try:
+            run_pipeline(self.qiita_service, self.slack_service)
+        except Exception as e:
+            print(f"❌ エラーが発生しました: {e}")
+        
+        next_run = self.scheduler.next_run
+        if next_run:
+            print(f"⏰ 次回の実行: {next_run.strftime('%Y-%m-%d %H:%M')}")
+    
+    def reload_if_changed(self):
+        """config.json が更新されていれば、サービスとスケジュールに反映する"""
+        if not self.config.reload_if_changed():
+            return
+        self.qiita_service.reload_config(self.config)
+        self.slack_service.reload_config(self.config)
+        self._apply_schedule()
+    
+    def _apply_schedule(self):
+        """設定に従ってジョブを登録する（スケジュールが変わった場合のみ登録し直す）"""
+        signature = (tuple(self.config.schedule_times), self.config.schedule_interval_minutes)
+        if signature == self._schedule_signature:
+            return
+        
+        self.scheduler.clear()
+        if self.config.schedule_interval_minutes > 0:
+            self.scheduler.every(self.config.schedule_interval_minutes).minutes.do(self.run_once)
+            print(f"⏰ {self.config.schedule_interval_minutes}分ごとに実行します。")
+        else:
+            for time_text in self.config.schedule_times:
+                self.scheduler.every().day.at(time_text).do(self.run_once)
+            print(f"⏰ 毎日 {', '.join(self.config.schedule_times)} に実行します。")
+        self._schedule_signature = signature
+    
+    def serve_forever(self, run_now: bool = False):
+        """スケジュールに従って実行を続ける（Ctrl+C で終了）"""
+        self._apply_schedule()
+        if run_now:
+            self.run_once()
+        
+        try:
+            while True:
+                self.reload_if_changed()
+                self.scheduler.run_pending()
+                
+                # 次のジョブか、設定ファイルの確認のどちらか早い方まで待つ
+                idle_seconds = self.scheduler.idle_seconds
+                wait = self.config.config_watch_interval
+                if idle_seconds is not None:
+                    wait = min(wait, max(idle_seconds, 0))
+                time.sleep(max(wait, 0.1))
+        except KeyboardInterrupt:
+            print("👋 常駐モードを終了します。")
+        finally:
+            self.qiita_service.session.close()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Qiita記事通知Bot を常駐させてスケジュール実行する")
+    parser.add_argument("--run-now", action="store_true", help="起動直後に1回実行する")
+    args = parser.parse_args(argv)
+    
+    daemon = NotifierDaemon(Config())
+    daemon.serve_forever(run_now=args.run_now)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,8 +2,165 @@
 Qiita記事通知Bot - メイン実行ファイル
 ワークフローのみを記述し、詳細な処理は各サービスに委譲
 """
+import os
+from datetime import timedelta
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional
+
 from src.config import Config
-from src.services import QiitaService, SlackService
+from src.utils.deadline import Deadline
+from src.utils.metrics import metrics
+
+if TYPE_CHECKING:
+    from src.models import Article
+    from src.services import QiitaService, SlackService
+    from src.storage import RunJournal
+
+
+def open_journal(config: Config) -> Optional["RunJournal"]:
+    """実行ジャーナルを開く（前回の実行が中断していれば、その記録を引き継ぐ）"""
+    if not config.run_journal:
+        return None
+    from src.storage import RunJournal
+    return RunJournal(
+        os.path.join(config.state_dir, "run_journal.jsonl"),
+        max_resume_age=timedelta(hours=config.run_journal_max_age_hours)
+    )
+
+
+def collect_articles(qiita_service: "QiitaService", deadline: Optional[Deadline] = None,
+                     journal: Optional["RunJournal"] = None) -> Optional[Dict[str, List["Article"]]]:
+    """
+    記事を取得し、通知する記事を選ぶ
+    
+    実行ジャーナルに中断した実行の選択結果（または取得結果）があれば、取得し直さずにそれを使う
+    
+    Returns:
+        dict: タグごとの通知する記事（通知する記事が無い場合は None）
+    """
+    selected_articles = journal.selected() if journal is not None else None
+    if selected_articles is not None:
+        print("♻️ 中断した実行で選択した記事を通知します。")
+        qiita_service.restore_watermarks(journal.watermarks())
+        return selected_articles
+    
+    articles_by_tag = journal.fetched() if journal is not None else None
+    if articles_by_tag is not None:
+        print("♻️ 中断した実行で取得した記事を使います。")
+        qiita_service.restore_watermarks(journal.watermarks())
+    else:
+        print("🔍 Qiita記事を取得中...")
+        with metrics.span("fetch"):
+            articles_by_tag = qiita_service.fetch_qiita_articles(deadline)
+        if journal is not None:
+            journal.checkpoint_fetched(articles_by_tag, qiita_service.pending_watermarks())
+    metrics.increment("articles_total", sum(len(articles) for articles in articles_by_tag.values()), stage="fetched")
+    
+    # タグをまたいだ重複と、以前の実行で通知済みの記事を除外
+    with metrics.span("global_dedup"):
+        articles_by_tag = qiita_service.deduplicate_articles(articles_by_tag)
+    
+    # 記事が見つかったかどうか
+    if not qiita_service.has_articles(articles_by_tag):
+        print("No articles found for any tag.")
+        return None
+    
+    # 優先順位に基づいて最適な記事を選択
+    print("📋 最適な記事を選択中...")
+    with metrics.span("select"):
+        selected_articles = qiita_service.select_best_articles(articles_by_tag)
+    metrics.increment("articles_total", sum(len(articles) for articles in selected_articles.values()), stage="selected")
+    
+    if not selected_articles:
+        print("No suitable articles found after priority filtering.")
+        return None
+    if journal is not None:
+        journal.checkpoint_selected(selected_articles)
+    return selected_articles
+
+
+def deliver_articles(qiita_service: "QiitaService", slack_service: "SlackService",
+                     selected_articles: Dict[str, List["Article"]], deadline: Optional[Deadline] = None,
+                     journal: Optional["RunJournal"] = None) -> bool:
+    """
+    選択した記事を Slack に通知し、通知できたタグのウォーターマークを保存する
+    
+    Returns:
+        bool: Slack への通知に（1つ以上のタグで）成功した場合は True
+    """
+    print("📤 記事をSlackに通知中...")
+    with metrics.span("notify"):
+        delivered_tags = slack_service.notify_articles(selected_articles, deadline, journal)
+    
+    if delivered_tags:
+        # 通知できた位置までを次回の増分取得の起点として保存（通知できなかったタグは次回に取得し直す）
+        undelivered = [tag for tag in selected_articles if tag not in delivered_tags]
+        qiita_service.commit_watermarks(exclude=undelivered)
+        qiita_service.mark_seen({tag: articles for tag, articles in selected_articles.items() if tag in delivered_tags})
+        if undelivered:
+            print(f"⚠️ 通知できなかったタグ: {', '.join(undelivered)}")
+        print("✅ Slack通知が完了しました。")
+    else:
+        print("❌ Slack通知に失敗しました。")
+    return bool(delivered_tags)
+
+
+def run_pipeline(qiita_service: "QiitaService", slack_service: "SlackService") -> bool:
+    """
+    記事の取得から Slack への通知までを1回実行する
+    
+    Returns:
+        bool: Slack への通知に成功した場合は True
+    """
+    metrics.reset()
+    deadline = Deadline(qiita_service.config.run_deadline)
+    return run_once(qiita_service, lambda: slack_service, deadline)
+
+
+def run_once(qiita_service: "QiitaService", get_slack_service: Callable[[], "SlackService"],
+             deadline: Optional[Deadline] = None) -> bool:
+    """
+    実行ジャーナルを開いて記事の取得・選択・通知を行い、結果に応じてジャーナルを閉じる
+    
+    Args:
+        get_slack_service: SlackService を返す関数（通知する記事がある場合だけ呼ぶ）
+    
+    Returns:
+        bool: Slack への通知に成功した場合は True
+    """
+    journal = open_journal(qiita_service.config)
+    try:
+        selected_articles = collect_articles(qiita_service, deadline, journal)
+        success = bool(selected_articles) and deliver_articles(
+            qiita_service, get_slack_service(), selected_articles, deadline, journal
+        )
+        close_journal(journal, completed=True)
+        return success
+    except BaseException:
+        close_journal(journal, completed=False)
+        raise
+    finally:
+        export_metrics(qiita_service.config)
+
+
+def close_journal(journal: Optional["RunJournal"], completed: bool):
+    """最後まで終わった実行のジャーナルは削除し、途中で失敗した実行のものは次回の再開用に残す"""
+    if journal is None:
+        return
+    if completed:
+        journal.complete()
+    else:
+        journal.close()
+
+
+def export_metrics(config: Config):
+    """今回の実行のメトリクスを state_dir/metrics に書き出す（失敗しても実行結果には影響させない）"""
+    print(f"⏱️ {metrics.summary()}")
+    if not config.metrics_export:
+        return
+    try:
+        metrics.export(os.path.join(config.state_dir, "metrics"))
+    except OSError as e:
+        print(f"Warning: メトリクスを書き出せませんでした: {e}")
 
 
 def main():
@@ -11,37 +168,18 @@ def main():
     try:
         # 設定の読み込み
         config = Config()
+        deadline = Deadline(config.run_deadline)
         
-        # サービスの初期化
+        # サービスの初期化（slack_sdk は通知する記事がある場合のみ読み込む）
+        from src.services import QiitaService
         qiita_service = QiitaService(config)
-        slack_service = SlackService(config)
-        
-        # メインワークフロー
-        print("🔍 Qiita記事を取得中...")
-        articles_by_tag = qiita_service.fetch_qiita_articles()
-        
-        # 記事が見つかったかどうか
-        if not qiita_service.has_articles(articles_by_tag):
-            print("No articles found for any tag.")
-            return
-        
-        # 優先順位に基づいて最適な記事を選択
-        print("📋 最適な記事を選択中...")
-        selected_articles = qiita_service.select_best_articles(articles_by_tag)
-        
-        if not selected_articles:
-            print("No suitable articles found after priority filtering.")
-            return
         
-        # 選択した記事をSlackに通知
-        print("📤 記事をSlackに通知中...")
-        success = slack_service.notify_articles(selected_articles)
+        def create_slack_service() -> "SlackService":
+            from src.services import SlackService
+            return SlackService(config)
         
-        if success:
-            print("✅ Slack通知が完了しました。")
-        else:
-            print("❌ Slack通知に失敗しました。")
-            
+        run_once(qiita_service, create_slack_service, deadline)
+    
     except Exception as e:
         print(f"❌ エラーが発生しました: {e}")
         raise
@@ -0,0 +1,50 @@
+"""
+Qiita記事通知Bot - 操作用サーバ
+タグの変更と即時実行を HTTP API / Slack のスラッシュコマンドで受け付け、
+ワークフローはバックグラウンドのワーカーで実行する
+"""
+import sys
+import argparse
+from typing import List, Optional
+
+from src.config import Config
+from src.services import QiitaService, SlackService, LocalSlackClient
+from src.server import RunWorker, create_app
+from main import run_pipeline
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Qiita記事通知Bot の操作用サーバ")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=3000)
+    parser.add_argument("--local-slack", action="store_true",
+                        help="Slack に投稿せず、標準出力に表示する（動作確認用）")
+    args = parser.parse_args(argv)
+    
+    config = Config()
+    # サービスには設定の複製を渡す（POST /tags などで共有の設定が変わっても、実行中の値は変わらない）
+    run_config = config.snapshot()
+    qiita_service = QiitaService(run_config)
+    slack_service = SlackService(run_config, client=LocalSlackClient() if args.local_slack else None)
+    
+    def job() -> bool:
+        # タグの変更などで設定が更新されていれば、実行の開始時点の設定の複製をサービスに反映する
+        config.reload_if_changed()
+        snapshot = config.snapshot()
+        if snapshot.generation != qiita_service.config.generation:
+            qiita_service.reload_config(snapshot)
+            slack_service.reload_config(snapshot)
+        return run_pipeline(qiita_service, slack_service)
+    
+    worker = RunWorker(job)
+    worker.start()
+    app = create_app(config, worker)
+    try:
+        app.run(host=args.host, port=args.port, threaded=True)
+    finally:
+        worker.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,4 +1,23 @@
 # Config package
-from .settings import Config
+# 設定モジュールは必要になった時点で読み込む
+import importlib
 
-__all__ = ['Config']
+_EXPORTS = {
+    'Config': '.settings',
+    'RoutingTable': '.routing'
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    """公開名に初めてアクセスしたときにモジュールを読み込む（PEP 562）"""
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
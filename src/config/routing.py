@@ -0,0 +1,83 @@
+"""
+通知先のルーティング
+タグから通知先（ワークスペースとチャンネル）の集合を引く転置インデックス
+"""
+from typing import Dict, Iterable, List, NamedTuple, Set
+
+# SLACK_TOKEN のワークスペース
+DEFAULT_WORKSPACE = "default"
+
+# すべてのタグの記事を受け取る通知先のタグ名
+WILDCARD_TAG = "*"
+
+
+class Destination(NamedTuple):
+    """通知先"""
+    workspace: str
+    channel: str
+    
+    def __str__(self) -> str:
+        if self.workspace == DEFAULT_WORKSPACE:
+            return self.channel
+        return f"{self.workspace}:{self.channel}"
+
+
+class RoutingTable:
+    """タグ → 通知先の集合（1つのタグを複数のチャンネル・ワークスペースに配信できる）"""
+    
+    def __init__(self):
+        self._routes: Dict[str, Set[Destination]] = {}
+    
+    @classmethod
+    def parse(cls, slack_channels: str, routes: Dict[str, Iterable[str]]) -> "RoutingTable":
+        """
+        SLACK_CHANNELS と config.json の routes から作成する
+        
+        Args:
+            slack_channels: "タグ:チャンネルID" または "タグ:ワークスペース:チャンネルID" のカンマ区切り
+                （同じタグを複数回書くと、すべてのチャンネルに配信する）
+            routes: タグ → 通知先（"チャンネルID" または "ワークスペース:チャンネルID"）の一覧。
+                タグ "*" の通知先にはすべてのタグの記事を配信する
+        """
+        table = cls()
+        for pair in slack_channels.split(","):
+            parts = [part.strip() for part in pair.split(":")]
+            if len(parts) in (2, 3) and all(parts):
+                table.add(parts[0], _parse_destination(":".join(parts[1:])))
+        for tag, destinations in routes.items():
+            if isinstance(destinations, str):
+                destinations = [destinations]
+            for destination in destinations:
+                table.add(tag, _parse_destination(destination))
+        return table
+    
+    def add(self, tag: str, destination: Destination):
+        """タグの通知先を追加する"""
+        self._routes.setdefault(tag, set()).add(destination)
+    
+    def destinations(self, tag: str) -> List[Destination]:
+        """タグの通知先（"*" の通知先を含む）を一定の順序で返す"""
+        destinations = self._routes.get(tag, set()) | self._routes.get(WILDCARD_TAG, set())
+        return sorted(destinations)
+    
+    def workspaces(self) -> Set[str]:
+        """通知先に含まれるワークスペース"""
+        return {destination.workspace for destinations in self._routes.values() for destination in destinations}
+    
+    def __contains__(self, tag: str) -> bool:
+        return bool(self._routes.get(tag) or self._routes.get(WILDCARD_TAG))
+    
+    def __bool__(self) -> bool:
+        return bool(self._routes)
+    
+    def __len__(self) -> int:
+        """通知先の数（重複を除く）"""
+        return len({destination for destinations in self._routes.values() for destination in destinations})
+
+
+def _parse_destination(text: str) -> Destination:
+    """"チャンネルID" または "ワークスペース:チャンネルID" を通知先にする"""
+    workspace, _, channel = text.strip().rpartition(":")
+    if not channel:
+        raise ValueError(f"Invalid Slack destination: {text!r}")
+    return Destination(workspace.strip() or DEFAULT_WORKSPACE, channel.strip())
@@ -3,21 +3,40 @@
 環境変数と設定ファイルの管理を行う
 """
 import os
+import re
+import copy
 import json
-from dotenv import load_dotenv, find_dotenv
-from typing import List, Dict
+import threading
+from typing import Any, Dict, List, Optional
+
+from .routing import DEFAULT_WORKSPACE, RoutingTable
 
 
 class Config:
-    """設定管理クラス"""
+    """
+    設定管理クラス
+    
+    設定の再読み込み・タグの更新は、新しい値を別に組み立ててから1回の代入で入れ替えるため、
+    他のスレッドが途中の状態を読むことは無い。実行中に値が変わらないようにするには snapshot を使う
+    """
+    
+    # 設定の入れ替え（reload_if_changed / update_tags / snapshot）を直列にする
+    _swap_lock = threading.Lock()
     
     def __init__(self):
         # .env の読み込み（強制的に再読み込み）
-        load_dotenv(find_dotenv(), override=True)
+        # .env が無い環境（GitHub Actions など）では python-dotenv 自体を読み込まない
+        dotenv_path = _find_dotenv()
+        if dotenv_path:
+            from dotenv import load_dotenv
+            load_dotenv(dotenv_path, override=True)
         
         # 設定ファイルのパス
         self.CONFIG_FILE = "config.json"
         
+        # 設定を入れ替えた回数（再読み込み・タグの更新のたびに増える）
+        self.generation = 0
+        
         # 設定の読み込み
         self._load_config()
         self._load_environment_variables()
@@ -25,39 +44,218 @@ class Config:
     
     def _load_config(self):
         """設定ファイルを読み込む"""
+        config_data = {}
+        self._config_mtime = self._get_config_mtime()
         if os.path.exists(self.CONFIG_FILE):
             with open(self.CONFIG_FILE, "r", encoding="utf-8") as f:
                 config_data = json.load(f)
-                self.tags = config_data.get("tags", ["生成AI", "Python", "LLM"])
-        else:
-            self.tags = ["生成AI", "Python", "LLM"]  # デフォルト値
+        
+        self.tags = config_data.get("tags", ["生成AI", "Python", "LLM"])  # デフォルト値
         
         # タグの優先順位（配列の順番が優先順位を表す）
         self.tag_priority = self.tags.copy()
+        
+        # 記事取得の並列数（1 以下の場合は逐次取得）
+        self.fetch_concurrency = int(config_data.get("fetch_concurrency", 4))
+        
+        # 取得方式（"per_tag": タグごとに検索 / "combined": OR検索でまとめて取得）
+        self.fetch_strategy = config_data.get("fetch_strategy", "per_tag")
+        if self.fetch_strategy not in ("per_tag", "combined"):
+            raise ValueError(f"Unknown fetch_strategy: {self.fetch_strategy}")
+        
+        # タグごとに取得する記事数
+        self.fetch_per_tag = int(config_data.get("fetch_per_tag", 20))
+        
+        # タグごとに通知する記事数（取得した候補からスコアの高い順に選ぶ）
+        self.notify_per_tag = int(config_data.get("notify_per_tag", 1))
+        
+        # 記事のスコア（スコア関数ごとの重み、新しさの半減期、同じ著者の記事を選ぶたびに掛ける係数）
+        self.ranking_weights = config_data.get("ranking_weights", {"popularity": 1.0, "recency": 1.0, "tag_priority": 0.5})
+        self.ranking_half_life_hours = float(config_data.get("ranking_half_life_hours", 24))
+        self.ranking_author_penalty = float(config_data.get("ranking_author_penalty", 0.5))
+        
+        # OR検索のクエリ長上限（URLエンコード後の長さ）とページ数上限
+        self.combined_query_max_length = int(config_data.get("combined_query_max_length", 1000))
+        self.combined_max_pages = int(config_data.get("combined_max_pages", 5))
+        
+        # 実行間で保持する状態（ウォーターマークなど）の保存先
+        self.state_dir = config_data.get("state_dir", ".state")
+        
+        # 前回処理した記事より新しいものだけを取得する（増分取得）
+        self.incremental_fetch = bool(config_data.get("incremental_fetch", True))
+        
+        # Qiita APIレスポンスのディスクキャッシュ（TTL秒・総バイト数上限）
+        self.response_cache = bool(config_data.get("response_cache", True))
+        self.response_cache_ttl = float(config_data.get("response_cache_ttl", 600))
+        self.response_cache_max_bytes = int(config_data.get("response_cache_max_bytes", 50 * 1024 * 1024))
+        
+        # API のエンドポイント（負荷試験などでローカルのスタンドインに向ける場合に変更する）
+        self.qiita_api_url = config_data.get("qiita_api_url", "https://qiita.com/api/v2/items")
+        self.slack_api_url = config_data.get("slack_api_url", "https://www.slack.com/api/")
+        
+        # Qiita APIのレートリミット（1時間あたりの上限と、枠が空くまで待つ最大秒数）
+        self.rate_limit_per_hour = int(config_data.get("rate_limit_per_hour", 1000))
+        self.rate_limit_max_wait = float(config_data.get("rate_limit_max_wait", 30))
+        
+        # 1回の実行の持ち時間（秒、0 なら無期限）と、そのうち記事の取得に使う割合。
+        # 時間切れになったら優先順位の低いタグから次回に持ち越す
+        self.run_deadline = float(config_data.get("run_deadline", 600))
+        self.fetch_deadline_ratio = float(config_data.get("fetch_deadline_ratio", 0.5))
+        if not 0 < self.fetch_deadline_ratio <= 1:
+            raise ValueError("fetch_deadline_ratio must be between 0 and 1")
+        # 1リクエストのタイムアウト（秒）と、Qiita の応答が遅い場合に同じリクエストを重ねて送るまでの秒数（0 なら送らない）
+        self.qiita_request_timeout = float(config_data.get("qiita_request_timeout", 10))
+        self.qiita_hedge_after = float(config_data.get("qiita_hedge_after", 0))
+        self.slack_request_timeout = int(config_data.get("slack_request_timeout", 30))
+        
+        # 投稿済み記事の重複判定方式（"local": SQLiteインデックス / "slack_history": Slack履歴を走査）
+        self.dedup_store = config_data.get("dedup_store", "local")
+        if self.dedup_store not in ("local", "slack_history"):
+            raise ValueError(f"Unknown dedup_store: {self.dedup_store}")
+        
+        # 初回のみ Slack 履歴から投稿済み記事を取り込むか、記録の保持日数
+        self.dedup_backfill = bool(config_data.get("dedup_backfill", True))
+        self.dedup_retention_days = float(config_data.get("dedup_retention_days", 90))
+        # Slack 履歴から最新の親投稿を探すとき、前回の親投稿がキャッシュに無い場合に遡る日数
+        self.thread_discovery_lookback_days = float(config_data.get("thread_discovery_lookback_days", 7))
+        if self.thread_discovery_lookback_days <= 0:
+            raise ValueError("thread_discovery_lookback_days must be positive")
+        
+        # 整形済みタイトル・ブロックのキャッシュ件数と、実行間で永続化するか
+        self.render_cache_size = int(config_data.get("render_cache_size", 10000))
+        self.render_cache_persist = bool(config_data.get("render_cache_persist", False))
+        
+        # 通知済み記事フィルタ（通知した記事IDを世代別のブルームフィルタで保持し、タグや実行をまたいだ重複を除く）
+        self.seen_filter = bool(config_data.get("seen_filter", True))
+        self.seen_filter_days = float(config_data.get("seen_filter_days", 180))
+        self.seen_filter_capacity = int(config_data.get("seen_filter_capacity", 20000))
+        self.seen_filter_error_rate = float(config_data.get("seen_filter_error_rate", 0.001))
+        
+        # 類似記事フィルタ（タイトルと本文の先頭の MinHash 署名で、翻訳・転載・連載の続きなどを除く）
+        self.near_duplicate_filter = bool(config_data.get("near_duplicate_filter", True))
+        self.near_duplicate_threshold = float(config_data.get("near_duplicate_threshold", 0.8))
+        if not 0 < self.near_duplicate_threshold <= 1:
+            raise ValueError("near_duplicate_threshold must be between 0 and 1")
+        self.near_duplicate_days = float(config_data.get("near_duplicate_days", 30))
+        
+        # 記事の本文（body）から残す文字数（0 の場合は本文を読み込まない）
+        self.article_description_length = int(config_data.get("article_description_length", 200))
+        
+        # 通知形式（"thread": 親投稿 + 記事ごとの返信 / "digest": 記事をまとめて少ないメッセージで投稿）
+        self.notification_mode = config_data.get("notification_mode", "thread")
+        if self.notification_mode not in ("thread", "digest"):
+            raise ValueError(f"Unknown notification_mode: {self.notification_mode}")
+        
+        # Slack への送信（チャンネルをまたぐ同時送信数と、429 の再試行回数）
+        self.slack_delivery_concurrency = int(config_data.get("slack_delivery_concurrency", 4))
+        self.slack_max_retries = int(config_data.get("slack_max_retries", 3))
+        
+        # 実行レポート（JSON）と Prometheus 形式のメトリクスを state_dir/metrics に書き出す
+        self.metrics_export = bool(config_data.get("metrics_export", True))
+        
+        # 実行の段階ごとの途中経過を state_dir/run_journal.jsonl に記録し、中断した実行を次回に続きから再開する
+        self.run_journal = bool(config_data.get("run_journal", True))
+        # 再開する実行の古さの上限（時間）。実行の間隔（GitHub Actions なら毎日）より長くしておく
+        self.run_journal_max_age_hours = float(config_data.get("run_journal_max_age_hours", 36))
+        if self.run_journal_max_age_hours <= 0:
+            raise ValueError("run_journal_max_age_hours must be positive")
+        
+        # 1つのタグを複数のチャンネル・ワークスペースに配信する通知先（SLACK_CHANNELS に追加される）
+        # routes: {"タグ": ["チャンネルID", "ワークスペース:チャンネルID"]}、タグ "*" はすべてのタグ
+        # slack_workspaces: {"ワークスペース": "Bot Token を入れた環境変数名"}
+        self.routes = config_data.get("routes", {})
+        self.slack_workspaces = config_data.get("slack_workspaces", {})
+        # 通知先ごとの準備（重複判定・メッセージの組み立て）を並列に行うシャード数
+        self.slack_fanout_shards = int(config_data.get("slack_fanout_shards", 8))
+        
+        # 常駐モード（daemon.py）の実行スケジュール
+        # schedule_interval_minutes が 1 以上なら一定間隔、0 なら schedule_times の時刻（ローカル時刻）に実行
+        self.schedule_times = config_data.get("schedule_times", ["08:10"])
+        for time_text in self.schedule_times:
+            if not re.fullmatch(r"([01]\d|2[0-3]):[0-5]\d", time_text):
+                raise ValueError(f"Invalid schedule_times entry (HH:MM expected): {time_text}")
+        self.schedule_interval_minutes = int(config_data.get("schedule_interval_minutes", 0))
+        if self.schedule_interval_minutes <= 0 and not self.schedule_times:
+            raise ValueError("schedule_times must not be empty when schedule_interval_minutes is 0")
+        # config.json の更新を確認する間隔（秒）
+        self.config_watch_interval = float(config_data.get("config_watch_interval", 5))
+    
+    def _get_config_mtime(self) -> Optional[float]:
+        """設定ファイルの更新日時（ファイルが無ければ None）"""
+        try:
+            return os.path.getmtime(self.CONFIG_FILE)
+        except OSError:
+            return None
+    
+    def reload_if_changed(self) -> bool:
+        """
+        設定ファイルが更新されていれば読み直す（常駐モード用）
+        
+        読み込みや検証に失敗した場合は警告を出し、それまでの設定を使い続ける
+        
+        Returns:
+            bool: 設定を読み直した場合は True
+        """
+        mtime = self._get_config_mtime()
+        if mtime == self._config_mtime:
+            return False
+        
+        # 読み込みと検証は複製に対して行い、使用中の設定には触れない
+        candidate = self.snapshot()
+        try:
+            candidate._load_config()
+            candidate._build_routing()
+        except (OSError, ValueError, TypeError) as e:
+            self._config_mtime = mtime  # 次にファイルが更新されるまで再試行しない
+            print(f"Warning: {self.CONFIG_FILE} を読み直せなかったため、以前の設定を使い続けます: {e}")
+            return False
+        
+        self._swap(vars(candidate))
+        print(f"Configuration reloaded: {self.CONFIG_FILE}")
+        return True
+    
+    def snapshot(self) -> "Config":
+        """
+        現在の設定の複製を返す（1回の実行の間、同じ設定を使い続けるため）
+        
+        値は入れ替えるだけで書き換えないため、浅い複製で足りる
+        """
+        with self._swap_lock:
+            return copy.copy(self)
+    
+    def _swap(self, values: Dict[str, Any]):
+        """設定の値をまとめて入れ替える（属性の辞書を1回の代入で置き換える）"""
+        with self._swap_lock:
+            values = dict(values, generation=self.generation + 1)
+            self.__dict__ = values
     
     def _load_environment_variables(self):
         """環境変数を読み込む"""
         self.slack_token = os.getenv("SLACK_TOKEN")
         self.qiita_api_token = os.getenv("API_TOKEN")  # Qiita APIトークン
         
-        # Slackチャンネル設定
-        slack_channels = os.getenv("SLACK_CHANNELS", "")
-        self.tag_channel_map = self._parse_slack_channels(slack_channels)
+        # 操作用サーバ（server.py）の認証
+        self.slack_signing_secret = os.getenv("SLACK_SIGNING_SECRET")  # スラッシュコマンドの署名検証
+        self.control_api_token = os.getenv("CONTROL_API_TOKEN")  # HTTP API の Bearer トークン
+        
+        # Slackチャンネル設定（"タグ:チャンネルID" のカンマ区切り。config.json の routes と合わせて使う）
+        self.slack_channels = os.getenv("SLACK_CHANNELS", "")
+        self._build_routing()
     
-    def _parse_slack_channels(self, slack_channels: str) -> Dict[str, str]:
-        """Slackチャンネル設定を解析してタグごとのチャンネルIDマッピングを取得"""
-        tag_channel_map = {}
-        if not slack_channels:
-            return tag_channel_map
-        
-        pairs = slack_channels.split(",")
-        for pair in pairs:
-            parts = pair.split(":")
-            if len(parts) == 2:
-                tag, channel_id = parts
-                tag_channel_map[tag.strip()] = channel_id.strip()
-        
-        return tag_channel_map
+    def _build_routing(self):
+        """SLACK_CHANNELS と config.json の routes から、タグごとの通知先の対応表を作る"""
+        self.routing = RoutingTable.parse(self.slack_channels, self.routes)
+        
+        # ワークスペースごとの Bot Token（SLACK_TOKEN 以外は slack_workspaces で指定した環境変数から読む）
+        self.slack_workspace_tokens = {DEFAULT_WORKSPACE: self.slack_token}
+        for workspace, env_name in self.slack_workspaces.items():
+            token = os.getenv(env_name)
+            if not token:
+                raise ValueError(f"{env_name} environment variable must be set for Slack workspace {workspace}.")
+            self.slack_workspace_tokens[workspace] = token
+        unknown = self.routing.workspaces() - set(self.slack_workspace_tokens)
+        if unknown:
+            raise ValueError(f"Unknown Slack workspace in routes: {', '.join(sorted(unknown))}")
     
     def _validate_config(self):
         """設定の検証"""
@@ -67,7 +265,7 @@ class Config:
         if not self.qiita_api_token:
             raise ValueError("API_TOKEN (Qiita API token) environment variable must be set.")
         
-        if not self.tag_channel_map:
+        if not self.routing:
             print("Warning: No valid Slack channel mapping found. "
                   "Please set SLACK_CHANNELS environment variable.")
         
@@ -76,11 +274,37 @@ class Config:
     
     def update_tags(self, new_tags: List[str]) -> List[str]:
         """タグを更新する"""
-        self.tags = new_tags
-        self.tag_priority = new_tags.copy()
-        
-        config = {"tags": new_tags}
-        with open(self.CONFIG_FILE, "w", encoding="utf-8") as f:
+        # タグ以外の設定値は保持したまま書き戻す
+        config = {}
+        if os.path.exists(self.CONFIG_FILE):
+            with open(self.CONFIG_FILE, "r", encoding="utf-8") as f:
+                config = json.load(f)
+        config["tags"] = new_tags
+        # 常駐中のプロセスが書きかけのファイルを読まないよう、一時ファイル経由で置き換える
+        tmp_path = f"{self.CONFIG_FILE}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
             json.dump(config, f, ensure_ascii=False, indent=4)
+        os.replace(tmp_path, self.CONFIG_FILE)
         
+        # 書き戻したファイルは読み直す必要が無いため、更新日時も合わせて入れ替える
+        self._swap(dict(
+            vars(self), tags=new_tags, tag_priority=new_tags.copy(), _config_mtime=self._get_config_mtime()
+        ))
         return self.tags
+
+
+def _find_dotenv(filename: str = ".env") -> Optional[str]:
+    """
+    このファイルのディレクトリから親ディレクトリへ順に .env を探す
+    
+    find_dotenv() と同じ探索順だが、呼び出し元のフレームを調べないぶん速い
+    """
+    directory = os.path.dirname(os.path.abspath(__file__))
+    while True:
+        path = os.path.join(directory, filename)
+        if os.path.isfile(path):
+            return path
+        parent = os.path.dirname(directory)
+        if parent == directory:
+            return None
+        directory = parent
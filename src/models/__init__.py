@@ -0,0 +1,4 @@
+# Models package
+from .article import Article
+
+__all__ = ['Article']
@@ -0,0 +1,91 @@
+"""
+記事モデル
+Qiita API の記事のうち、通知に使う項目だけを保持する軽量なレコード
+"""
+from typing import Any, Dict, Optional, Tuple
+
+from ..utils.preview import extract_preview
+
+
+class Article:
+    """
+    通知対象の記事
+    
+    1ページ100件・多数のタグを扱ってもメモリを抑えられるよう __slots__ で属性を固定する
+    （Python 3.9 では dataclass の slots 指定が使えないため、通常のクラスで定義する）
+    """
+    
+    __slots__ = ("id", "title", "url", "description", "likes", "stocks", "tag",
+                 "created_at", "updated_at", "user", "tags")
+    
+    def __init__(self, id: Optional[str], title: str, url: str, description: str = "", likes: int = 0,
+                 tag: Optional[str] = None, created_at: Optional[str] = None, updated_at: Optional[str] = None,
+                 user: Optional[str] = None, tags: Tuple[str, ...] = (), stocks: int = 0):
+        self.id = id
+        self.title = title
+        self.url = url
+        self.description = description  # 本文の先頭（API の body を切り詰めたもの）
+        self.likes = likes
+        self.stocks = stocks
+        self.tag = tag  # 通知先を決めるタグ（取得に使ったタグ）
+        self.created_at = created_at
+        self.updated_at = updated_at
+        self.user = user
+        self.tags = tags  # 記事に付いている全タグ名
+    
+    @classmethod
+    def from_api(cls, item: Dict[str, Any], description_length: int = 200) -> "Article":
+        """
+        Qiita API の記事（JSON）から作成する
+        
+        description は本文（Markdown）から取り出した読める文章の先頭。受信時に取り出し済みなら
+        （"body_preview" があれば）それを使う
+        """
+        if "body_preview" in item:
+            description = item["body_preview"][:description_length]
+        else:
+            description = extract_preview(item.get("body") or "", description_length)
+        return cls(
+            id=item["id"],
+            title=item["title"],
+            url=item["url"],
+            description=description,
+            likes=item.get("likes_count", 0),
+            stocks=item.get("stocks_count", 0),
+            created_at=item["created_at"],
+            updated_at=item.get("updated_at"),
+            user=(item.get("user") or {}).get("id"),
+            tags=tuple(t["name"] for t in item.get("tags") or [])
+        )
+    
+    def with_tag(self, tag: str) -> "Article":
+        """通知先のタグを設定したコピーを返す"""
+        article = Article.__new__(Article)
+        for name in Article.__slots__:
+            setattr(article, name, getattr(self, name))
+        article.tag = tag
+        return article
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """辞書に変換する（ログや JSON への保存用）"""
+        return {name: getattr(self, name) for name in Article.__slots__}
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Article":
+        """to_dict で変換した辞書（JSON から読み込んだもの）から作成する"""
+        article = cls.__new__(cls)
+        for name in Article.__slots__:
+            setattr(article, name, data.get(name))
+        article.tags = tuple(article.tags or ())
+        return article
+    
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, Article):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in Article.__slots__)
+    
+    def __hash__(self) -> int:
+        return hash((self.id, self.tag))
+    
+    def __repr__(self) -> str:
+        return f"Article(id={self.id!r}, tag={self.tag!r}, title={self.title!r})"
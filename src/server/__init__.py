@@ -0,0 +1,5 @@
+# Server package
+from .worker import RunWorker
+from .app import create_app
+
+__all__ = ['RunWorker', 'create_app']
@@ -0,0 +1,155 @@
+"""
+操作用サーバ
+タグの変更と即時実行を、HTTP API と Slack のスラッシュコマンドから受け付ける
+"""
+import hmac
+import time
+from typing import Any, List, Optional, Tuple
+
+from flask import Flask, Response, jsonify, request
+from slack_sdk.signature import SignatureVerifier
+
+from ..config.settings import Config
+from ..utils.metrics import metrics
+from .worker import RunWorker
+
+# Slack が受け付けるリクエストの時刻のずれ（秒）
+SLACK_TIMESTAMP_TOLERANCE = 60 * 5
+
+_SLASH_COMMAND_HELP = (
+    "使い方:\n"
+    "• `run` 今すぐ記事を取得して通知する\n"
+    "• `tags` 現在のタグ（優先順）を表示する\n"
+    "• `tags 生成AI,Python,LLM` タグを変更する（先頭ほど優先）\n"
+    "• `status` 実行状況を表示する"
+)
+
+_RUN_MESSAGES = {
+    "started": "⏳ 実行を開始しました。",
+    "queued": "⏳ 実行中のジョブの後に実行します。",
+    "coalesced": "⏳ 既に実行待ちのため、その実行にまとめました。"
+}
+
+
+def create_app(config: Config, worker: RunWorker) -> Flask:
+    """
+    操作用の Flask アプリケーションを作成する
+    
+    実行要求はワーカーに積むだけですぐに応答する（Slack の3秒以内の応答に間に合わせるため）
+    """
+    app = Flask(__name__)
+    verifier = SignatureVerifier(config.slack_signing_secret) if config.slack_signing_secret else None
+    
+    @app.before_request
+    def _authorize():
+        if request.path == "/slack/command":
+            return None  # 署名で検証する
+        if config.control_api_token:
+            expected = f"Bearer {config.control_api_token}"
+            if not hmac.compare_digest(request.headers.get("Authorization", ""), expected):
+                return jsonify({"error": "unauthorized"}), 401
+        return None
+    
+    @app.get("/status")
+    def status():
+        return jsonify(worker.status())
+    
+    @app.get("/metrics")
+    def get_metrics():
+        # 最後に実行した（実行中ならその時点までの）メトリクス
+        return Response(metrics.to_prometheus(), mimetype="text/plain; version=0.0.4")
+    
+    @app.get("/tags")
+    def get_tags():
+        return jsonify({"tags": config.tags})
+    
+    @app.post("/tags")
+    def update_tags():
+        payload = request.get_json(silent=True) or {}
+        tags, error = _normalize_tags(payload.get("tags"))
+        if error:
+            return jsonify({"error": error}), 400
+        
+        config.update_tags(tags)
+        body = {"tags": tags, "unmapped_tags": _unmapped_tags(config, tags)}
+        if payload.get("run"):
+            body["run"] = worker.request_run()
+        return jsonify(body)
+    
+    @app.post("/run")
+    def run():
+        return jsonify({"run": worker.request_run()}), 202
+    
+    @app.post("/slack/command")
+    def slack_command():
+        if verifier is None:
+            return jsonify({"error": "SLACK_SIGNING_SECRET is not configured"}), 503
+        body = request.get_data()
+        timestamp = request.headers.get("X-Slack-Request-Timestamp", "")
+        signature = request.headers.get("X-Slack-Signature", "")
+        if not _is_recent(timestamp) or not verifier.is_valid(body, timestamp, signature):
+            return jsonify({"error": "invalid signature"}), 401
+        
+        text = request.form.get("text", "").strip()
+        user = request.form.get("user_name", "unknown")
+        print(f"Slash command from {user}: {request.form.get('command', '')} {text}")
+        return jsonify({"response_type": "ephemeral", "text": _handle_command(config, worker, text)})
+    
+    return app
+
+
+def _handle_command(config: Config, worker: RunWorker, text: str) -> str:
+    """スラッシュコマンドの引数を解釈して、応答のテキストを返す"""
+    command, _, argument = text.partition(" ")
+    command = command.lower()
+    
+    if command == "run":
+        return _RUN_MESSAGES[worker.request_run()]
+    
+    if command == "tags":
+        if not argument.strip():
+            return "現在のタグ（優先順）: " + ", ".join(config.tags)
+        tags, error = _normalize_tags(argument.split(","))
+        if error:
+            return f"❌ {error}"
+        config.update_tags(tags)
+        message = "✅ タグを更新しました: " + ", ".join(tags)
+        unmapped = _unmapped_tags(config, tags)
+        if unmapped:
+            message += "\n⚠️ 通知先チャンネルが設定されていないタグ: " + ", ".join(unmapped)
+        return message
+    
+    if command == "status":
+        status = worker.status()
+        state = "実行中" if status["running"] else "待機中"
+        return (f"状態: {state}（実行待ち: {'あり' if status['pending'] else 'なし'}）\n"
+                f"前回の実行: {status['last_finished_at'] or '-'} / 結果: {status['last_error'] or status['last_result']}")
+    
+    return _SLASH_COMMAND_HELP
+
+
+def _normalize_tags(tags: Any) -> Tuple[List[str], Optional[str]]:
+    """タグの一覧を検証し、前後の空白と重複を取り除く（順序＝優先順位は保つ）"""
+    if not isinstance(tags, list) or not all(isinstance(tag, str) for tag in tags):
+        return [], "tags must be a list of strings"
+    normalized = []
+    for tag in tags:
+        tag = tag.strip()
+        if tag and tag not in normalized:
+            normalized.append(tag)
+    if not normalized:
+        return [], "tags must not be empty"
+    return normalized, None
+
+
+def _unmapped_tags(config: Config, tags: List[str]) -> List[str]:
+    """SLACK_CHANNELS・routes に通知先が無いタグ"""
+    return [tag for tag in tags if tag not in config.routing]
+
+
+def _is_recent(timestamp: str) -> bool:
+    """リプレイ攻撃を防ぐため、古いリクエストを拒否する"""
+    try:
+        return abs(time.time() - int(timestamp)) <= SLACK_TIMESTAMP_TOLERANCE
+    except ValueError:
+        return False
@@ -0,0 +1,110 @@
+"""
+バックグラウンド実行ワーカー
+実行要求をキューに積み、専用スレッドでワークフローを1つずつ実行する
+"""
+import threading
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional
+
+
+class RunWorker:
+    """
+    ワークフローの実行要求を受け付け、バックグラウンドで実行するワーカー
+    
+    実行中・実行待ちの間に届いた要求は1回の実行待ちにまとめる（同時に実行されることはない）
+    """
+    
+    def __init__(self, job: Callable[[], Any]):
+        self._job = job
+        self._cond = threading.Condition()
+        self._running = False
+        self._pending = False
+        self._stopped = False
+        self._runs = 0
+        self._coalesced = 0
+        self._last_started_at = None
+        self._last_finished_at = None
+        self._last_result = None
+        self._last_error = None
+        self._thread = threading.Thread(target=self._loop, name="run-worker", daemon=True)
+    
+    def start(self):
+        """ワーカースレッドを開始する"""
+        self._thread.start()
+    
+    def stop(self, timeout: Optional[float] = None):
+        """実行中のジョブが終わるのを待ってワーカーを止める（実行待ちの要求は破棄する）"""
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+        if self._thread.is_alive():
+            self._thread.join(timeout)
+    
+    def request_run(self) -> str:
+        """
+        実行を要求する（すぐに戻る）
+        
+        Returns:
+            str: "started"（待ちなしで実行）/ "queued"（実行中のジョブの後に実行）/
+                 "coalesced"（既に実行待ちの要求にまとめた）
+        """
+        with self._cond:
+            if self._pending:
+                self._coalesced += 1
+                return "coalesced"
+            self._pending = True
+            self._cond.notify_all()
+            return "queued" if self._running else "started"
+    
+    def wait_idle(self, timeout: Optional[float] = None) -> bool:
+        """実行中・実行待ちのジョブが無くなるまで待つ"""
+        with self._cond:
+            return self._cond.wait_for(lambda: not self._running and not self._pending, timeout)
+    
+    def status(self) -> Dict[str, Any]:
+        """実行状況を返す"""
+        with self._cond:
+            return {
+                "running": self._running,
+                "pending": self._pending,
+                "runs": self._runs,
+                "coalesced": self._coalesced,
+                "last_started_at": _format_time(self._last_started_at),
+                "last_finished_at": _format_time(self._last_finished_at),
+                "last_result": self._last_result,
+                "last_error": self._last_error
+            }
+    
+    def _loop(self):
+        """実行要求を待ち、1つずつ実行する"""
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._pending or self._stopped)
+                if self._stopped:
+                    return
+                self._pending = False
+                self._running = True
+                self._last_started_at = datetime.now()
+            
+            result = None
+            error = None
+            try:
+                result = self._job()
+            except Exception as e:
+                error = str(e)
+                print(f"❌ バックグラウンド実行でエラーが発生しました: {e}")
+            
+            with self._cond:
+                self._running = False
+                self._runs += 1
+                self._last_finished_at = datetime.now()
+                self._last_result = result
+                self._last_error = error
+                self._cond.notify_all()
+
+
+def _format_time(value: Optional[datetime]) -> Optional[str]:
+    """日時を ISO 8601 形式の文字列に変換する"""
+    if value is None:
+        return None
+    return value.isoformat(timespec="seconds")
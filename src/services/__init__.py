@@ -1,5 +1,27 @@
 # Services package
-from .qiita_service import QiitaService
-from .slack_service import SlackService
+# requests や slack_sdk は重いため、使うサービスのモジュールだけを必要になった時点で読み込む
+import importlib
 
-__all__ = ['QiitaService', 'SlackService']
+_EXPORTS = {
+    'QiitaService': '.qiita_service',
+    'SlackService': '.slack_service',
+    'LocalSlackClient': '.local_slack',
+    'RankingEngine': '.ranking',
+    'FanoutExecutor': '.fanout',
+    'ThreadDiscovery': '.thread_discovery'
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    """公開名に初めてアクセスしたときにモジュールを読み込む（PEP 562）"""
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,52 @@
+"""
+ファンアウト実行
+通知先をシャードに分け、シャードごとにスレッドで並列に処理する。
+同じ通知先は常に同じシャードで投入順に処理されるため、チャンネル内の順序が保たれる
+"""
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, List, Sequence, Tuple
+
+
+class FanoutExecutor:
+    """
+    (通知先, 入力) のジョブを通知先ごとのシャードに振り分けて並列に実行する
+    
+    Slack への通知は I/O 待ちが中心のため、プロセスではなくスレッドで並列化する
+    （WebClient やレート制限の状態をプロセス間で複製せずに共有できる）
+    """
+    
+    def __init__(self, shards: int):
+        self.shards = max(1, shards)
+    
+    def shard_of(self, destination: Hashable) -> int:
+        """通知先のシャード番号（実行をまたいで一定）"""
+        return zlib.crc32(str(destination).encode("utf-8")) % self.shards
+    
+    def run(self, jobs: Sequence[Tuple[Hashable, Any]], func: Callable[[Hashable, Any], Any]) -> List[Any]:
+        """
+        ジョブを実行し、入力順に結果を返す
+        
+        1つのジョブで例外が起きても他のシャードは止めず、その結果は None になる
+        """
+        shards: Dict[int, List[int]] = {}
+        for index, (destination, _) in enumerate(jobs):
+            shards.setdefault(self.shard_of(destination), []).append(index)
+        
+        results: List[Any] = [None] * len(jobs)
+        
+        def run_shard(indexes: List[int]):
+            for index in indexes:
+                destination, payload = jobs[index]
+                try:
+                    results[index] = func(destination, payload)
+                except Exception as e:
+                    print(f"Error preparing notification for {destination}: {e}")
+        
+        if len(shards) <= 1:
+            for indexes in shards.values():
+                run_shard(indexes)
+        else:
+            with ThreadPoolExecutor(max_workers=len(shards)) as executor:
+                list(executor.map(run_shard, shards.values()))
+        return results
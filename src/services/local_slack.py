@@ -0,0 +1,76 @@
+"""
+ローカル Slack クライアント
+WebClient の代わりに使い、投稿をメモリ上に保持して標準出力に表示する（動作確認用）
+"""
+import time
+import threading
+from typing import Any, Dict, List, Optional
+
+
+class LocalSlackClient:
+    """SlackService が使う WebClient のメソッドだけを持つスタンドイン"""
+    
+    def __init__(self, echo: bool = True):
+        self.echo = echo
+        self.messages = []  # 投稿されたメッセージ（投稿順）
+        self._lock = threading.Lock()
+        self._last_ts = 0.0
+    
+    def chat_postMessage(self, channel: str, text: str, blocks: Optional[List[Dict[str, Any]]] = None,
+                         thread_ts: Optional[str] = None, metadata: Optional[Dict[str, Any]] = None,
+                         **kwargs) -> Dict[str, Any]:
+        """メッセージを記録し、Slack と同じ形式の ts を返す"""
+        with self._lock:
+            # 同じ秒に複数投稿しても ts が重複・逆転しないようにする
+            self._last_ts = max(time.time(), self._last_ts + 0.000001)
+            ts = f"{self._last_ts:.6f}"
+            message = {"channel": channel, "ts": ts, "text": text}
+            if blocks:
+                message["blocks"] = blocks
+            if thread_ts:
+                message["thread_ts"] = thread_ts
+            if metadata:
+                message["metadata"] = metadata
+            self.messages.append(message)
+        
+        if self.echo:
+            indent = "    ↳ " if thread_ts else ""
+            print(f"[local-slack] #{channel} {indent}{text.splitlines()[0] if text else ''}")
+        return {"ok": True, "channel": channel, "ts": ts, "message": message}
+    
+    def conversations_history(self, channel: str, limit: int = 100, oldest: Optional[str] = None,
+                              cursor: Optional[str] = None, **kwargs) -> Dict[str, Any]:
+        """チャンネルの親投稿を新しい順に返す（oldest より新しいものだけ、cursor でページ送り）"""
+        with self._lock:
+            messages = [
+                m for m in reversed(self.messages)
+                if m["channel"] == channel and "thread_ts" not in m
+                and (oldest is None or float(m["ts"]) > float(oldest))
+            ]
+        return _page(messages, limit, cursor)
+    
+    def conversations_replies(self, channel: str, ts: str, limit: int = 100, oldest: Optional[str] = None,
+                              cursor: Optional[str] = None, **kwargs) -> Dict[str, Any]:
+        """親投稿とスレッドの返信を古い順に返す（親投稿は oldest に関わらず先頭に含める）"""
+        with self._lock:
+            messages = [
+                m for m in self.messages
+                if m["channel"] == channel and (
+                    m["ts"] == ts
+                    or (m.get("thread_ts") == ts and (oldest is None or float(m["ts"]) > float(oldest)))
+                )
+            ]
+        return _page(messages, limit, cursor)
+
+
+def _page(messages: List[Dict[str, Any]], limit: int, cursor: Optional[str]) -> Dict[str, Any]:
+    """Slack と同じ形式で1ページ分を返す（カーソルは次のページの開始位置）"""
+    start = int(cursor or 0)
+    end = start + limit
+    has_more = len(messages) > end
+    return {
+        "ok": True,
+        "messages": messages[start:end],
+        "has_more": has_more,
+        "response_metadata": {"next_cursor": str(end) if has_more else ""}
+    }
@@ -2,9 +2,32 @@
 Qiita記事取得サービス
 Qiitaから記事を取得し、選択ロジックを提供する
 """
+import os
+import json
+import functools
+import threading
 import requests
-from typing import Dict, List, Any
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed, wait
+from datetime import datetime
+from requests.adapters import HTTPAdapter
+from typing import Callable, Dict, Iterable, List, Any, Optional
+from urllib.parse import quote
 from ..config.settings import Config
+from ..models import Article
+from ..storage import WatermarkStore, ResponseCache, SeenFilter, NearDuplicateIndex
+from ..utils.deadline import Deadline
+from ..utils.json_stream import iter_array_items
+from ..utils.metrics import metrics
+from ..utils.minhash import LSHIndex
+from ..utils.preview import PreviewExtractor
+from .rate_limiter import RateLimiter
+from .ranking import RankingEngine
+
+# 1ページあたりの取得件数の上限（Qiita API の上限）
+MAX_PER_PAGE = 100
+
+# レスポンスを受信しながら解析する際のチャンクサイズ
+STREAM_CHUNK_SIZE = 64 * 1024
 
 
 class QiitaService:
@@ -15,73 +38,653 @@ class QiitaService:
         self.tags = config.tags
         self.tag_priority = config.tag_priority
         self.qiita_api_token = config.qiita_api_token
-        self.base_url = 'https://qiita.com/api/v2/items'
-    
-    def fetch_qiita_articles(self) -> Dict[str, List[Dict[str, Any]]]:
-        """各タグにつき最新の記事を取得する"""
-        all_articles = {}
-        
-        for tag in self.tags:
-            try:
-                headers = {'Authorization': f'Bearer {self.qiita_api_token}'}
-                params = {
-                    'query': f'tag:{tag}',
-                    'page': 1,
-                    'per_page': 1,  # 各タグで最新の1件のみ取得
-                    'sort': 'created'
-                }
-                
-                response = requests.get(self.base_url, headers=headers, params=params)
-                
-                if response.status_code == 200:
-                    articles = response.json()
-                    formatted_articles = []
-                    
-                    for article in articles:
-                        article_info = {
-                            "id": article["id"],
-                            "title": article["title"],
-                            "url": article["url"],
-                            "description": article["body"][:200],  # 最初の200文字
-                            "likes": article["likes_count"],
-                            "tag": tag,  # タグ情報を追加
-                            "created_at": article["created_at"],
-                            "user": article["user"]["id"]
-                        }
-                        formatted_articles.append(article_info)
-                    
-                    all_articles[tag] = formatted_articles
-                    print(f"Found {len(formatted_articles)} articles for tag {tag}")
-                else:
-                    print(f"Error fetching articles for tag {tag}: {response.status_code}")
-                    all_articles[tag] = []
-                    
-            except Exception as e:
-                print(f"Error fetching articles for tag {tag}: {e}")
-                all_articles[tag] = []
+        self.base_url = config.qiita_api_url
+        self.fetch_concurrency = max(1, config.fetch_concurrency)
+        self.session = self._create_session()
+        self._pending_watermarks = {}
+        self._pending_lock = threading.Lock()
+        self._deadline = Deadline()
+        self._deferred_tags = []
+        self._hedge_pool = None
+        
+        # Qiita API 呼び出し全体で共有するレートリミット
+        self.rate_limiter = RateLimiter(
+            limit=config.rate_limit_per_hour,
+            max_wait=config.rate_limit_max_wait
+        )
+        
+        self._open_stores(config)
+        self.ranking = self._create_ranking(config)
+    
+    def _create_ranking(self, config: Config) -> RankingEngine:
+        """設定に従って記事のランキングを作成する"""
+        return RankingEngine(
+            weights=config.ranking_weights,
+            half_life_hours=config.ranking_half_life_hours,
+            author_penalty=config.ranking_author_penalty,
+            tag_priority=config.tag_priority
+        )
+    
+    def _open_stores(self, config: Config):
+        """state_dir 配下のウォーターマークとレスポンスキャッシュを開く"""
+        # 増分取得用のウォーターマーク（通知成功後に commit_watermarks で保存する）
+        self.watermarks = None
+        if config.incremental_fetch:
+            self.watermarks = WatermarkStore(os.path.join(config.state_dir, "watermarks.json"))
+        
+        # 同一クエリの再取得を避けるレスポンスキャッシュ
+        self.response_cache = None
+        if config.response_cache:
+            self.response_cache = ResponseCache(
+                os.path.join(config.state_dir, "http_cache"),
+                ttl_seconds=config.response_cache_ttl,
+                max_bytes=config.response_cache_max_bytes
+            )
+        
+        # 以前の実行で通知した記事ID（タグや実行をまたいだ重複の除外用）
+        self.seen_filter = None
+        if config.seen_filter:
+            self.seen_filter = SeenFilter(
+                os.path.join(config.state_dir, "seen_articles.bloom"),
+                window_days=config.seen_filter_days,
+                capacity=config.seen_filter_capacity,
+                error_rate=config.seen_filter_error_rate
+            )
+        
+        # 通知した記事の MinHash 署名（本文がほぼ同じ記事の除外用）
+        self.near_duplicates = None
+        if config.near_duplicate_filter:
+            self.near_duplicates = NearDuplicateIndex(
+                os.path.join(config.state_dir, "near_duplicates.json"),
+                threshold=config.near_duplicate_threshold,
+                retention_days=config.near_duplicate_days
+            )
+        self._signatures = {}
+    
+    def reload_config(self, config: Config):
+        """
+        再読み込みした設定を反映する（常駐モード用）
+        
+        セッションのコネクションプールとレートリミットの状態は引き継ぎ、
+        並列数が変わった場合のみセッションを作り直す
+        """
+        self.config = config
+        self.tags = config.tags
+        self.tag_priority = config.tag_priority
+        self.base_url = config.qiita_api_url
+        
+        fetch_concurrency = max(1, config.fetch_concurrency)
+        if fetch_concurrency != self.fetch_concurrency:
+            self.fetch_concurrency = fetch_concurrency
+            self.session.close()
+            self.session = self._create_session()
+            if self._hedge_pool is not None:
+                self._hedge_pool.shutdown(wait=False)
+                self._hedge_pool = None
+        
+        self.rate_limiter.configure(config.rate_limit_per_hour, config.rate_limit_max_wait)
+        self._open_stores(config)
+        self.ranking = self._create_ranking(config)
+    
+    def _create_session(self) -> requests.Session:
+        """全リクエストで共有する keep-alive のセッションを作成する"""
+        session = requests.Session()
+        # 並列数ぶんのコネクションを同一ホストに対してプールする
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=self.fetch_concurrency
+        )
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        session.headers.update({'Authorization': f'Bearer {self.qiita_api_token}'})
+        return session
+    
+    def fetch_qiita_articles(self, deadline: Optional[Deadline] = None) -> Dict[str, List[Article]]:
+        """
+        各タグにつき最新の記事を取得する
+        
+        Args:
+            deadline (Deadline): 実行の締め切り。取得にはそのうち fetch_deadline_ratio の割合だけを使い、
+                時間切れになったタグ（優先順位の低いものから）は取得せずに次回へ持ち越す
+        """
+        self.rate_limiter.reset_usage()
+        with self._pending_lock:
+            # 常駐モードで前回の実行（通知失敗）の取得位置を持ち越さない
+            self._pending_watermarks.clear()
+            self._deferred_tags = []
+        self._deadline = deadline.portion(self.config.fetch_deadline_ratio) if deadline is not None else Deadline()
+        if self.config.fetch_strategy == "combined":
+            all_articles = self._fetch_combined()
+        else:
+            results = self._map_concurrently(self._fetch_tag_articles, self.tags)
+            all_articles = dict(zip(self.tags, results))
+        
+        if self.response_cache is not None:
+            self.response_cache.save()
+            stats = self.response_cache.stats()
+            print(f"Response cache: hits={stats['hits']} revalidated={stats['revalidated']} "
+                  f"misses={stats['misses']} hit_rate={stats['hit_rate']:.0%}")
+        
+        usage = self.rate_limiter.usage()
+        print(f"Qiita API usage: requests={usage['requests']} denied={usage['denied']} "
+              f"remaining={usage['remaining']}/{usage['limit']} reset_at={usage['reset_at']}")
         
+        if self._deferred_tags:
+            deferred = sorted(self._deferred_tags, key=self._priority_of)
+            metrics.increment("tags_deferred_total", len(deferred), stage="fetch")
+            print(f"⏭️ 取得の持ち時間を使い切ったため、{len(deferred)} 件のタグを次回に持ち越します: {', '.join(deferred)}")
         return all_articles
     
-    def select_best_articles(self, articles_by_tag: Dict[str, List[Dict[str, Any]]]) -> Dict[str, List[Dict[str, Any]]]:
+    def _defer(self, tags: List[str]):
+        """時間切れで取得しなかったタグを記録する（ウォーターマークは進めない）"""
+        with self._pending_lock:
+            self._deferred_tags.extend(tags)
+    
+    def _map_concurrently(self, func: Callable[[Any], Any], items: List[Any]) -> List[Any]:
+        """設定された並列数で func を items に適用し、入力順に結果を返す"""
+        if self.fetch_concurrency <= 1 or len(items) <= 1:
+            return [func(item) for item in items]
+        
+        workers = min(self.fetch_concurrency, len(items))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            # map は入力順に結果を返すため、タグの順序が保たれる
+            return list(executor.map(func, items))
+    
+    def _fetch_tag_articles(self, tag: str) -> List[Article]:
+        """1つのタグの記事を取得する"""
+        # タグは優先順位の順に取りかかるため、時間切れで残るのは優先順位の低いタグ
+        if self._deadline.expired():
+            self._defer([tag])
+            return []
+        
+        watermark = self._get_watermark(tag)
+        query = f'tag:{tag}'
+        if watermark:
+            # 前回処理した日以降の記事に絞り込む（日付単位のため境界は後段で除外）
+            query += f' created:>={watermark["created_at"][:10]}'
+        
+        with metrics.timer("qiita_fetch_seconds", tag=tag):
+            articles = self._page_tag_articles(tag, query, watermark)
+        if articles is None:
+            if self._deadline.expired():
+                self._defer([tag])
+            return []
+        
+        formatted_articles = [
+            article.with_tag(tag)
+            for article in articles
+            if self._is_newer_than(article, watermark)
+        ]
+        self._record_watermark(tag, formatted_articles)
+        print(f"Found {len(formatted_articles)} articles for tag {tag}")
+        return formatted_articles
+    
+    def _page_tag_articles(self, tag: str, query: str, watermark: Optional[Dict[str, Any]]) -> Optional[List[Article]]:
+        """
+        fetch_per_tag 件（ランキングの候補）に達するまで新しい順にページングして取得する
+        
+        Returns:
+            list: 取得した記事（1ページ目の取得に失敗した場合は None）
+        """
+        fetch_per_tag = self.config.fetch_per_tag
+        per_page = max(1, min(fetch_per_tag, MAX_PER_PAGE))
+        articles = []
+        for page in range(1, -(-fetch_per_tag // per_page) + 1):
+            params = {
+                'query': query,
+                'page': page,
+                'per_page': per_page,
+                'sort': 'created'
+            }
+            items = self._get_items(params, f"tag {tag}", self._priority_of(tag))
+            if items is None:
+                return None if page == 1 else articles
+            articles.extend(items)
+            
+            # 最終ページに到達したか、ウォーターマーク以前の記事まで取得したら終了
+            if len(items) < per_page or (watermark and items and not self._is_newer_than(items[-1], watermark)):
+                break
+        return articles[:fetch_per_tag]
+    
+    def _fetch_combined(self) -> Dict[str, List[Article]]:
+        """OR検索でタグをまとめて取得し、記事のタグ情報から各タグに振り分ける"""
+        batches = self._build_combined_batches(self.tags)
+        results = self._map_concurrently(self._fetch_batch_articles, batches)
+        
+        all_articles = {tag: [] for tag in self.tags}
+        for batch_articles in results:
+            all_articles.update(batch_articles)
+        
+        for tag, articles in all_articles.items():
+            self._record_watermark(tag, articles)
+            print(f"Found {len(articles)} articles for tag {tag}")
+        return all_articles
+    
+    def _build_combined_batches(self, tags: List[str]) -> List[List[str]]:
+        """URLエンコード後のクエリ長が上限に収まるようにタグを分割する"""
+        batches = []
+        current = []
+        for tag in dict.fromkeys(tags):  # 重複タグは1度だけ検索する
+            candidate = current + [tag]
+            if current and len(quote(self._build_or_query(candidate))) > self.config.combined_query_max_length:
+                batches.append(current)
+                candidate = [tag]
+            current = candidate
+        if current:
+            batches.append(current)
+        return batches
+    
+    def _build_or_query(self, tags: List[str]) -> str:
+        """タグのOR検索クエリを組み立てる"""
+        return " OR ".join(f"tag:{tag}" for tag in tags)
+    
+    def _fetch_batch_articles(self, batch: List[str]) -> Dict[str, List[Article]]:
+        """1つのOR検索クエリをページングしながら取得し、タグごとに振り分ける"""
+        if self._deadline.expired():
+            self._defer(batch)
+            return {}
+        with metrics.timer("qiita_fetch_seconds", tag=",".join(batch)):
+            return self._page_batch_articles(batch)
+    
+    def _page_batch_articles(self, batch: List[str]) -> Dict[str, List[Article]]:
+        """OR検索の結果を1ページずつ取得して振り分ける"""
+        per_tag = self.config.fetch_per_tag
+        batch_articles = {tag: [] for tag in batch}
+        # Qiita のタグ検索は大文字小文字を区別しない
+        keys = {tag: tag.casefold() for tag in batch}
+        label = f"tags {', '.join(batch)}"
+        priority = min(self._priority_of(tag) for tag in batch)
+        watermarks = {tag: self._get_watermark(tag) for tag in batch}
+        crossed = {tag: False for tag in batch}
+        
+        for page in range(1, self.config.combined_max_pages + 1):
+            params = {
+                'query': self._build_or_query(batch),
+                'page': page,
+                'per_page': MAX_PER_PAGE,
+                'sort': 'created'
+            }
+            articles = self._get_items(params, label, priority)
+            if not articles:
+                break
+            
+            for article in articles:
+                article_tags = {name.casefold() for name in article.tags}
+                for tag in batch:
+                    if crossed[tag] or keys[tag] not in article_tags:
+                        continue
+                    if not self._is_newer_than(article, watermarks[tag]):
+                        continue
+                    if len(batch_articles[tag]) < per_tag:
+                        batch_articles[tag].append(article.with_tag(tag))
+            
+            # 作成日時の降順で返るため、ページ末尾がウォーターマーク以前なら以降は不要
+            for tag in batch:
+                if watermarks[tag] and not self._is_newer_than(articles[-1], watermarks[tag]):
+                    crossed[tag] = True
+            
+            # 全タグが必要数に達したかウォーターマークを越えた、または最終ページに到達したら終了
+            if all(crossed[tag] or len(batch_articles[tag]) >= per_tag for tag in batch):
+                break
+            if len(articles) < MAX_PER_PAGE:
+                break
+        
+        return batch_articles
+    
+    def _get_watermark(self, tag: str) -> Optional[Dict[str, Any]]:
+        """タグのウォーターマークを返す（増分取得が無効な場合は None）"""
+        if self.watermarks is None:
+            return None
+        return self.watermarks.get(tag)
+    
+    def _is_newer_than(self, article: Article, watermark: Optional[Dict[str, Any]]) -> bool:
+        """記事がウォーターマークより新しいか判定する"""
+        if not watermark:
+            return True
+        created_at = _parse_timestamp(article.created_at)
+        marked_at = _parse_timestamp(watermark["created_at"])
+        if created_at != marked_at:
+            return created_at > marked_at
+        return article.id != watermark["id"]
+    
+    def _record_watermark(self, tag: str, articles: List[Article]):
+        """取得した最新記事を保存待ちのウォーターマークとして記録する"""
+        if self.watermarks is None or not articles:
+            return
+        newest = max(articles, key=lambda a: _parse_timestamp(a.created_at))
+        with self._pending_lock:
+            self._pending_watermarks[tag] = newest
+    
+    def pending_watermarks(self) -> Dict[str, Article]:
+        """保存待ちのウォーターマーク（タグごとの今回取得した最新記事）"""
+        with self._pending_lock:
+            return dict(self._pending_watermarks)
+    
+    def restore_watermarks(self, pending: Dict[str, Article]):
+        """中断した実行で取得した位置を保存待ちのウォーターマークとして戻す（実行ジャーナルからの再開用）"""
+        with self._pending_lock:
+            self._pending_watermarks = dict(pending)
+    
+    def commit_watermarks(self, tags: Optional[List[str]] = None, exclude: Iterable[str] = ()):
         """
-        優先順位の高いカテゴリから順に記事を選択し、各タグから最適な記事を返す
+        取得済みの位置をウォーターマークとして保存する
+        
+        Args:
+            tags (list): 保存対象のタグ（省略時は今回取得した全タグ）
+            exclude (list): 保存しないタグ（通知できずに次回へ持ち越すタグ）
+        """
+        if self.watermarks is None:
+            return
+        with self._pending_lock:
+            pending = dict(self._pending_watermarks)
+        excluded = set(exclude)
+        for tag, article in pending.items():
+            if (tags is None or tag in tags) and tag not in excluded:
+                self.watermarks.update(tag, article.created_at, article.id)
+        self.watermarks.save()
+    
+    def deduplicate_articles(self, articles_by_tag: Dict[str, List[Article]]) -> Dict[str, List[Article]]:
+        """
+        タグをまたいだ重複と、以前の実行で通知済みの記事、本文がほぼ同じ記事を取り除く
+        
+        複数のタグに該当する記事は、記事に付いているタグと取得に使ったタグのうち
+        通知先のあるタグのうち優先順位が最も高いタグにだけ残す。タイトルと本文の先頭が通知済みの記事に近い記事も取り除く
+        （今回の候補どうしが似ている場合は、select_best_articles でスコアの高いほうを残す）
         
         Args:
             articles_by_tag (dict): タグごとの記事リスト
         
         Returns:
-            dict: タグごとの選択された記事リスト
+            dict: タグごとの重複を除いた記事リスト
+        """
+        configured = {tag.casefold(): tag for tag in reversed(self.tag_priority)}
+        deduplicated = {tag: [] for tag in articles_by_tag}
+        visited = set()
+        cross_tag = 0
+        seen = 0
+        near_duplicate = 0
+        self._signatures = {}
+        for tag, articles in articles_by_tag.items():
+            for article in articles:
+                if article.id in visited:
+                    cross_tag += 1
+                    continue
+                visited.add(article.id)
+                if self.seen_filter is not None and article.id in self.seen_filter:
+                    seen += 1
+                    continue
+                if self.near_duplicates is not None and self._is_near_duplicate(article):
+                    near_duplicate += 1
+                    continue
+                
+                owner = self._owner_tag(tag, article, configured)
+                deduplicated.setdefault(owner, []).append(article if owner == article.tag else article.with_tag(owner))
+        
+        metrics.increment("articles_total", cross_tag, stage="cross_tag_duplicate")
+        metrics.increment("articles_total", seen, stage="seen")
+        metrics.increment("articles_total", near_duplicate, stage="near_duplicate")
+        if cross_tag or seen or near_duplicate:
+            print(f"Removed {cross_tag} cross-tag duplicates, {seen} previously notified articles "
+                  f"and {near_duplicate} near-duplicates")
+        return deduplicated
+    
+    def _owner_tag(self, tag: str, article: Article, configured: Dict[str, str]) -> str:
+        """
+        記事を通知するタグを決める
+        
+        取得に使ったタグと、記事に付いている設定済みのタグのうち通知先があるものから、
+        優先順位が最も高いタグを選ぶ（通知先の無いタグに移して通知されなくなるのを防ぐ）
+        """
+        routing = self.config.routing
+        candidates = [tag] if tag in routing else []
+        candidates += [configured[name.casefold()] for name in article.tags
+                       if name.casefold() in configured and configured[name.casefold()] in routing]
+        return min(candidates, key=self._priority_of) if candidates else tag
+    
+    def _is_near_duplicate(self, article: Article) -> bool:
+        """通知済みの記事と本文がほぼ同じかどうか"""
+        signature = NearDuplicateIndex.signature(article.title, article.description)
+        match = self.near_duplicates.find(signature)
+        if match:
+            print(f"記事 {article.id} は記事 {match[0]} とほぼ同じ内容です（類似度 {match[1]:.2f}）。スキップします。")
+            return True
+        self._signatures[article.id] = signature
+        return False
+    
+    def _batch_near_duplicate_filter(self) -> Callable[[Article], bool]:
+        """
+        今回選んだ記事とほぼ同じ内容の候補を選ばないようにする関数を返す
+        
+        ランキングはスコアの高い順に候補を渡すため、似た記事どうしではスコアの高いほうが残る。
+        インデックスには実際に選んだ記事だけを加える
         """
-        selected_articles = {}
+        batch_index = LSHIndex(self.config.near_duplicate_threshold)
+        
+        def accept(article: Article) -> bool:
+            signature = self._signatures.get(article.id)
+            if signature is None:
+                signature = NearDuplicateIndex.signature(article.title, article.description)
+            match = batch_index.query(signature)
+            if match:
+                print(f"記事 {article.id} は選択済みの記事 {match[0]} とほぼ同じ内容です（類似度 {match[1]:.2f}）。スキップします。")
+                metrics.increment("articles_total", stage="near_duplicate")
+                return False
+            batch_index.add(article.id, signature)
+            return True
+        
+        return accept
+    
+    def mark_seen(self, articles_by_tag: Dict[str, List[Article]]):
+        """通知した記事を通知済み記事フィルタと類似記事インデックスに記録して保存する"""
+        articles = [article for tag_articles in articles_by_tag.values() for article in tag_articles]
+        if self.seen_filter is not None:
+            for article in articles:
+                self.seen_filter.add(article.id)
+            self.seen_filter.save()
+        if self.near_duplicates is not None:
+            for article in articles:
+                signature = self._signatures.get(article.id)
+                if signature is None:
+                    signature = NearDuplicateIndex.signature(article.title, article.description)
+                self.near_duplicates.add(article.id, signature)
+            self.near_duplicates.save()
+    
+    def _priority_of(self, tag: str) -> int:
+        """タグの優先順位（小さいほど高い）を返す"""
+        try:
+            return self.tag_priority.index(tag)
+        except ValueError:
+            return len(self.tag_priority)
+    
+    def _get_items(self, params: Dict[str, Any], label: str, priority: int = 0) -> Optional[List[Article]]:
+        """記事一覧APIを呼び出す。失敗時は None を返す"""
+        cache = self.response_cache
+        response = None
+        try:
+            headers = {}
+            if cache is not None:
+                key = cache.make_key(self.base_url, params)
+                entry = cache.lookup(key)
+                if entry and entry["fresh"]:
+                    body = cache.get(key)
+                    if body is not None:
+                        metrics.increment("response_cache_requests_total", result="hit")
+                        return self._to_articles(json.loads(body))
+                elif entry and entry["etag"]:
+                    # ETag があれば条件付きリクエストで再検証する
+                    headers['If-None-Match'] = entry["etag"]
+            
+            response = self._send(params, headers, priority, label)
+            if response is None:
+                return None
+            
+            if response.status_code == 304 and cache is not None:
+                body = cache.get(key, revalidated=True)
+                if body is not None:
+                    metrics.increment("response_cache_requests_total", result="revalidated")
+                    return self._to_articles(json.loads(body))
+                # キャッシュ本体が失われていた場合は条件なしで取り直す
+                response.close()
+                response = self._send(params, {}, priority, label)
+                if response is None:
+                    return None
+            
+            if cache is not None:
+                metrics.increment("response_cache_requests_total", result="miss")
+            if response.status_code == 200:
+                items = self._read_items(response)
+                if cache is not None:
+                    # キャッシュには切り詰めた後の記事だけを保存する
+                    cache.put(key, json.dumps(items, ensure_ascii=False).encode("utf-8"), response.headers.get('ETag'))
+                return self._to_articles(items)
+            
+            if cache is not None:
+                cache.record_miss()
+            print(f"Error fetching articles for {label}: {response.status_code}")
+            return None
         
-        for tag in self.tag_priority:
-            if tag in articles_by_tag and articles_by_tag[tag]:
-                # 各タグから最新の1件の記事を選択
-                articles = articles_by_tag[tag]
-                selected_articles[tag] = articles[:1]  # 最新の1件を選択
+        except Exception as e:
+            print(f"Error fetching articles for {label}: {e}")
+            return None
         
-        return selected_articles
+        finally:
+            if response is not None:
+                response.close()
+    
+    def _read_items(self, response: requests.Response) -> List[Dict[str, Any]]:
+        """
+        レスポンスを受信しながら記事を1件ずつ解析する
+        
+        本文（body）は受信しながら Markdown の記法やコードブロックを除いた文章を通知に使う長さだけ取り出して
+        "body_preview" に入れ、rendered_body は捨てるため、1ページの件数や本文の長さによらずメモリ使用量はほぼ一定
+        """
+        length = self.config.article_description_length
+        string_limits = {"rendered_body": 0}
+        string_extractors = {}
+        if length > 0:
+            string_extractors["body"] = functools.partial(PreviewExtractor, length)
+        else:
+            string_limits["body"] = 0
+        items = list(iter_array_items(response.iter_content(STREAM_CHUNK_SIZE), string_limits, string_extractors))
+        for item in items:
+            if "body" in item:
+                item["body_preview"] = item.pop("body")
+        return items
+    
+    def _to_articles(self, items: List[Dict[str, Any]]) -> List[Article]:
+        """API の記事一覧を Article に変換する"""
+        return [Article.from_api(item, self.config.article_description_length) for item in items]
     
-    def has_articles(self, articles_by_tag: Dict[str, List[Dict[str, Any]]]) -> bool:
+    def _send(self, params: Dict[str, Any], headers: Dict[str, str], priority: int, label: str) -> Optional[requests.Response]:
+        """
+        レートリミットの枠を取得してからリクエストを送る。枠が無い場合は None を返す
+        
+        本文は受信しながら解析するため stream=True で送る（呼び出し元で close すること）
+        """
+        for _ in range(2):
+            if self._deadline.expired():
+                print(f"Run deadline reached, skipped fetching articles for {label}")
+                return None
+            if not self.rate_limiter.acquire(priority, max_wait=self._deadline.remaining()):
+                print(f"Rate limit budget exhausted, skipped fetching articles for {label}")
+                metrics.increment("qiita_rate_limit_denied_total")
+                return None
+            
+            response = self._hedged_get(params, headers)
+            metrics.increment("qiita_requests_total", status=response.status_code)
+            self.rate_limiter.update_from_headers(response.headers)
+            
+            # Qiita はレート制限超過時に 403（Rate-Remaining: 0）を返す
+            rate_limited = response.status_code == 429 or (
+                response.status_code == 403 and response.headers.get('Rate-Remaining') == '0'
+            )
+            if not rate_limited:
+                return response
+            
+            print(f"Rate limit exceeded while fetching articles for {label}")
+            metrics.increment("qiita_rate_limited_total")
+            self.rate_limiter.exhaust()
+            response.close()
+        
+        return response
+    
+    def _get(self, params: Dict[str, Any], headers: Dict[str, str]) -> requests.Response:
+        """1回のリクエスト（タイムアウトは qiita_request_timeout と取得の持ち時間の残りの短い方）"""
+        timeout = max(0.001, self._deadline.timeout(self.config.qiita_request_timeout))
+        # stream=True のため、計測されるのはヘッダを受信するまでの時間（本文の受信中も timeout で打ち切る）
+        with metrics.timer("qiita_request_seconds"):
+            return self.session.get(self.base_url, params=params, headers=headers, stream=True, timeout=timeout)
+    
+    def _hedged_get(self, params: Dict[str, Any], headers: Dict[str, str]) -> requests.Response:
+        """
+        qiita_hedge_after 秒を過ぎても応答が無ければ同じリクエストをもう1つ送り、先に成功した方を使う
+        
+        もう1つ送るのはレートリミットの枠が待たずに取れる場合だけ。使わなかった方の応答は届き次第閉じる
+        """
+        hedge_after = self.config.qiita_hedge_after
+        if hedge_after <= 0:
+            return self._get(params, headers)
+        
+        pool = self._get_hedge_pool()
+        futures = [pool.submit(self._get, params, headers)]
+        done, _ = wait(futures, timeout=hedge_after)
+        if not done and not self._deadline.expired() and self.rate_limiter.try_acquire():
+            futures.append(pool.submit(self._get, params, headers))
+        
+        winner = None
+        error = None
+        for future in as_completed(futures):
+            if future.exception() is None:
+                winner = future
+                break
+            error = error or future.exception()
+        for future in futures:
+            if future is not winner:
+                future.add_done_callback(_close_response)
+        if len(futures) > 1:
+            metrics.increment("qiita_hedged_requests_total", winner="hedge" if winner is futures[1] else "original")
+        if winner is None:
+            raise error
+        return winner.result()
+    
+    def _get_hedge_pool(self) -> ThreadPoolExecutor:
+        """ヘッジ用のスレッドプール（並列数ぶんの元のリクエストと重ねたリクエストを同時に送れる大きさ）"""
+        with self._pending_lock:
+            if self._hedge_pool is None:
+                self._hedge_pool = ThreadPoolExecutor(
+                    max_workers=2 * self.fetch_concurrency,
+                    thread_name_prefix="qiita-hedge"
+                )
+            return self._hedge_pool
+    
+    def select_best_articles(self, articles_by_tag: Dict[str, List[Article]]) -> Dict[str, List[Article]]:
+        """
+        優先順位の高いカテゴリから順に、各タグの候補からスコアの高い記事を選択する
+        
+        スコアはいいね・ストック数、新しさ、タグの優先度の重み付き和で、
+        同じ著者の記事はタグをまたいで選ばれにくくなる（RankingEngine）。
+        本文がほぼ同じ候補どうしは、先に選ばれた（スコアの高い）記事だけを残す
+        
+        Args:
+            articles_by_tag (dict): タグごとの記事リスト
+        
+        Returns:
+            dict: タグごとの選択された記事リスト
+        """
+        accept = self._batch_near_duplicate_filter() if self.near_duplicates is not None else None
+        return self.ranking.select_per_tag(articles_by_tag, self.config.notify_per_tag, self.tag_priority, accept)
+    
+    def has_articles(self, articles_by_tag: Dict[str, List[Article]]) -> bool:
         """記事が存在するかチェック"""
         return any(len(articles) > 0 for articles in articles_by_tag.values())
+
+
+def _close_response(future: Future):
+    """使わなかったリクエストの応答を閉じる（コネクションをプールに返す）"""
+    if future.exception() is None:
+        future.result().close()
+
+
+def _parse_timestamp(value: str) -> datetime:
+    """Qiita の ISO 8601 形式の日時を datetime に変換する"""
+    return datetime.fromisoformat(value)
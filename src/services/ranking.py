@@ -0,0 +1,275 @@
+"""
+記事のランキング
+いいね・ストック数、新しさ、タグの優先度を組み合わせたスコアで候補を並べ、
+同じ著者の記事が続かないようにしながら上位の記事を選ぶ。
+候補が多い場合は NumPy（インストールされていれば）でスコアをまとめて計算する
+"""
+import math
+import heapq
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from ..models import Article
+
+# NumPy でまとめて計算する候補数の下限（少ないと配列を作るほうが高くつく）
+NUMPY_MIN_CANDIDATES = 256
+
+# スコア関数の重み（既定値）
+DEFAULT_WEIGHTS = {"popularity": 1.0, "recency": 1.0, "tag_priority": 0.5}
+
+# スコア関数: 候補の列（特徴量ごとの配列）と演算（_PythonOps / _NumpyOps）を受け取り、候補ごとのスコアを返す
+Scorer = Callable[[Dict[str, Any], Any], Any]
+SCORERS: Dict[str, Scorer] = {}
+
+
+def register_scorer(name: str) -> Callable[[Scorer], Scorer]:
+    """
+    スコア関数を登録するデコレータ（設定の ranking_weights で名前を指定して使う）
+    
+    列は "likes" / "stocks" / "age_hours" / "age_half_lives" / "tag_weight"。
+    NumPy を使う場合は numpy の配列、使わない場合は float のリストが渡されるため、
+    計算には引数の ops（array / add / mul / log1p / exp）を使うこと
+    """
+    def decorator(func: Scorer) -> Scorer:
+        SCORERS[name] = func
+        return func
+    return decorator
+
+
+@register_scorer("popularity")
+def popularity_score(columns: Dict[str, Any], ops: Any) -> Any:
+    """いいね数とストック数（対数をとって頭打ちにする）"""
+    return ops.log1p(ops.add(columns["likes"], columns["stocks"]))
+
+
+@register_scorer("recency")
+def recency_score(columns: Dict[str, Any], ops: Any) -> Any:
+    """新しさ（投稿直後が 1 で、半減期ごとに半分になる）"""
+    return ops.exp(ops.mul(columns["age_half_lives"], -math.log(2)))
+
+
+@register_scorer("tag_priority")
+def tag_priority_score(columns: Dict[str, Any], ops: Any) -> Any:
+    """記事に付いているタグのうち、最も優先度の高いタグの重み（1位が 1、2位が 1/2 ...）"""
+    return columns["tag_weight"]
+
+
+class _PythonOps:
+    """リストの要素ごとの演算（NumPy が無い場合・候補が少ない場合）"""
+    
+    name = "python"
+    
+    @staticmethod
+    def array(values: Sequence[float]) -> List[float]:
+        return [float(value) for value in values]
+    
+    @staticmethod
+    def add(a: Any, b: Any) -> List[float]:
+        if isinstance(b, list):
+            return [x + y for x, y in zip(a, b)]
+        return [x + b for x in a]
+    
+    @staticmethod
+    def mul(a: Any, b: Any) -> List[float]:
+        if isinstance(b, list):
+            return [x * y for x, y in zip(a, b)]
+        return [x * b for x in a]
+    
+    @staticmethod
+    def log1p(values: List[float]) -> List[float]:
+        return [math.log1p(value) for value in values]
+    
+    @staticmethod
+    def exp(values: List[float]) -> List[float]:
+        return [math.exp(value) for value in values]
+    
+    @staticmethod
+    def tolist(values: List[float]) -> List[float]:
+        return list(values)
+
+
+class _NumpyOps:
+    """NumPy の配列演算"""
+    
+    name = "numpy"
+    
+    def __init__(self, np: Any):
+        self.np = np
+    
+    def array(self, values: Sequence[float]) -> Any:
+        return self.np.asarray(values, dtype=float)
+    
+    def add(self, a: Any, b: Any) -> Any:
+        return a + b
+    
+    def mul(self, a: Any, b: Any) -> Any:
+        return a * b
+    
+    def log1p(self, values: Any) -> Any:
+        return self.np.log1p(values)
+    
+    def exp(self, values: Any) -> Any:
+        return self.np.exp(values)
+    
+    def tolist(self, values: Any) -> List[float]:
+        return values.tolist()
+
+
+_numpy_ops = None
+
+
+def _load_numpy_ops() -> Optional[_NumpyOps]:
+    """NumPy を初めて必要になった時点で読み込む（インストールされていなければ None）"""
+    global _numpy_ops
+    if _numpy_ops is None:
+        try:
+            import numpy
+            _numpy_ops = _NumpyOps(numpy)
+        except ImportError:
+            _numpy_ops = False
+    return _numpy_ops or None
+
+
+class RankingEngine:
+    """
+    候補の記事にスコアを付けて上位を選ぶ
+    
+    スコアは登録済みスコア関数の重み付き和。上位の選択はヒープから1件ずつ取り出し、
+    既に選んだ著者の記事は author_penalty を掛けたスコアで積み直す（遅延評価の貪欲法）
+    """
+    
+    def __init__(self, weights: Optional[Dict[str, float]] = None, half_life_hours: float = 24.0,
+                 author_penalty: float = 0.5, tag_priority: Sequence[str] = (), backend: str = "auto"):
+        self.weights = dict(DEFAULT_WEIGHTS if weights is None else weights)
+        unknown = [name for name in self.weights if name not in SCORERS]
+        if unknown:
+            raise ValueError(f"Unknown ranking scorer: {', '.join(unknown)}")
+        negative = [name for name, weight in self.weights.items() if weight < 0]
+        if negative:
+            # スコアが負になると、author_penalty を掛けたときに逆にスコアが上がってしまう
+            raise ValueError(f"ranking_weights must not be negative: {', '.join(negative)}")
+        if half_life_hours <= 0:
+            raise ValueError("ranking_half_life_hours must be positive")
+        if not 0 <= author_penalty <= 1:
+            raise ValueError("ranking_author_penalty must be between 0 and 1")
+        if backend not in ("auto", "numpy", "python"):
+            raise ValueError(f"Unknown ranking backend: {backend}")
+        if backend == "numpy" and _load_numpy_ops() is None:
+            raise ImportError("numpy is required for the numpy ranking backend")
+        
+        self.half_life_hours = half_life_hours
+        self.author_penalty = author_penalty
+        self.backend = backend
+        # 優先度の高いタグほど大きい重み（大文字小文字は区別しない）
+        self._tag_weights = {tag.casefold(): 1.0 / (rank + 1) for rank, tag in enumerate(tag_priority)}
+    
+    def _ops_for(self, count: int) -> Any:
+        """候補数に応じて演算の実装を選ぶ"""
+        if self.backend == "python":
+            return _PythonOps
+        if self.backend == "numpy" or count >= NUMPY_MIN_CANDIDATES:
+            ops = _load_numpy_ops()
+            if ops is not None:
+                return ops
+        return _PythonOps
+    
+    def _columns(self, articles: List[Article], ops: Any, now: datetime) -> Dict[str, Any]:
+        """候補の特徴量を列ごとの配列にする"""
+        ages = [_age_hours(article.created_at, now) for article in articles]
+        age_hours = ops.array(ages)
+        return {
+            "likes": ops.array([article.likes or 0 for article in articles]),
+            "stocks": ops.array([article.stocks or 0 for article in articles]),
+            "age_hours": age_hours,
+            "age_half_lives": ops.mul(age_hours, 1.0 / self.half_life_hours),
+            "tag_weight": ops.array([self._tag_weight(article) for article in articles]),
+        }
+    
+    def _tag_weight(self, article: Article) -> float:
+        """記事のタグのうち最も優先度の高いものの重み"""
+        weight = self._tag_weights.get((article.tag or "").casefold(), 0.0)
+        for name in article.tags:
+            weight = max(weight, self._tag_weights.get(name.casefold(), 0.0))
+        return weight
+    
+    def score(self, articles: List[Article], now: Optional[datetime] = None) -> List[float]:
+        """候補ごとのスコアを返す"""
+        if not articles:
+            return []
+        ops = self._ops_for(len(articles))
+        columns = self._columns(articles, ops, now or datetime.now(timezone.utc))
+        total = ops.array([0.0] * len(articles))
+        for name, weight in self.weights.items():
+            if weight:
+                total = ops.add(total, ops.mul(ops.array(SCORERS[name](columns, ops)), weight))
+        return ops.tolist(total)
+    
+    def top_k(self, articles: List[Article], k: int, author_counts: Optional[Dict[str, int]] = None,
+              now: Optional[datetime] = None, accept: Optional[Callable[[Article], bool]] = None) -> List[Article]:
+        """
+        スコアの高い順に最大 k 件を選ぶ
+        
+        Args:
+            articles: 候補（同点の場合は先にあるものを優先する）
+            k: 選ぶ件数
+            author_counts: 著者ごとの既に選んだ件数（選んだ分を加算する。タグをまたいで共有できる）
+            accept: 選ぶ直前に呼ぶ関数（False を返した候補は選ばずに次の候補へ進む）
+        """
+        if k <= 0 or not articles:
+            return []
+        scores = self.score(articles, now)
+        counts = author_counts if author_counts is not None else {}
+        
+        # 全件のソートは行わず、ヒープから必要な件数だけ取り出す
+        heap = [(-score, index) for index, score in enumerate(scores)]
+        heapq.heapify(heap)
+        selected = []
+        while heap and len(selected) < k:
+            negative_score, index = heapq.heappop(heap)
+            article = articles[index]
+            penalized = self._penalized(scores[index], counts.get(article.user, 0) if article.user else 0)
+            if penalized < -negative_score:
+                # 取り出した後に同じ著者の記事が選ばれていたため、下げたスコアで積み直す
+                heapq.heappush(heap, (-penalized, index))
+                continue
+            if accept is not None and not accept(article):
+                continue
+            selected.append(article)
+            if article.user:
+                counts[article.user] = counts.get(article.user, 0) + 1
+        return selected
+    
+    def _penalized(self, score: float, picks: int) -> float:
+        """同じ著者の記事を picks 件選んだ後のスコア"""
+        if picks == 0:
+            return score
+        return score * self.author_penalty ** picks
+    
+    def select_per_tag(self, articles_by_tag: Dict[str, List[Article]], k: int, tag_order: Sequence[str],
+                       accept: Optional[Callable[[Article], bool]] = None) -> Dict[str, List[Article]]:
+        """
+        タグごとに上位 k 件を選ぶ
+        
+        優先度の高いタグから順に選び、著者の偏りの判定と accept（top_k を参照）はタグをまたいで共有する
+        """
+        now = datetime.now(timezone.utc)
+        author_counts = {}
+        selected = {}
+        for tag in tag_order:
+            articles = articles_by_tag.get(tag)
+            if articles:
+                selected[tag] = self.top_k(articles, k, author_counts, now, accept)
+        return selected
+
+
+def _age_hours(created_at: Optional[str], now: datetime) -> float:
+    """投稿からの経過時間（時間）。日時が無い・読めない場合は十分古いものとして扱う"""
+    if not created_at:
+        return math.inf
+    try:
+        created = datetime.fromisoformat(created_at)
+    except ValueError:
+        return math.inf
+    if created.tzinfo is None:
+        created = created.replace(tzinfo=timezone.utc)
+    return max(0.0, (now - created).total_seconds() / 3600)
@@ -0,0 +1,144 @@
+"""
+レートリミットスケジューラ
+Qiita API の Rate-Limit / Rate-Remaining / Rate-Reset ヘッダに合わせて
+リクエストを優先度順に払い出すトークンバケット
+"""
+import time
+import heapq
+import itertools
+import threading
+from datetime import datetime
+from typing import Dict, Any, Mapping, Optional
+
+
+class RateLimiter:
+    """Qiita API 呼び出し全体で共有するトークンバケット"""
+    
+    def __init__(self, limit: int, window_seconds: float = 3600, max_wait: float = 30):
+        self.max_wait = max_wait
+        self._window = window_seconds
+        self._limit = limit
+        self._tokens = limit
+        self._reset_at = None  # サーバから通知されたリセット時刻（UNIX時間）
+        self._server_remaining = None
+        self._cond = threading.Condition()
+        self._waiting = []  # (優先度, 受付順) のヒープ
+        self._sequence = itertools.count()
+        self._used = 0
+        self._denied = 0
+    
+    def acquire(self, priority: int = 0, max_wait: Optional[float] = None) -> bool:
+        """
+        リクエスト1回分の枠を取得する（優先度の数値が小さいほど先に払い出す）
+        
+        Args:
+            max_wait (float): 待つ最大秒数（省略時は設定値。実行の締め切りが近い場合に短くする）
+        
+        Returns:
+            bool: 取得できた場合は True。max_wait 以内に枠が空かない場合は False
+        """
+        entry = (priority, next(self._sequence))
+        give_up_at = time.time() + (self.max_wait if max_wait is None else min(max_wait, self.max_wait))
+        
+        with self._cond:
+            heapq.heappush(self._waiting, entry)
+            while True:
+                now = time.time()
+                self._refill(now)
+                
+                if self._tokens >= 1:
+                    if self._waiting[0] == entry:
+                        heapq.heappop(self._waiting)
+                        self._tokens -= 1
+                        self._used += 1
+                        self._cond.notify_all()
+                        return True
+                    # 優先度の高いリクエストが先に枠を取るのを待つ
+                    self._cond.wait(timeout=0.05)
+                    continue
+                
+                # 枠が戻るのはリセット時刻。max_wait 以内に来なければあきらめる
+                if self._reset_at is None or self._reset_at > give_up_at:
+                    self._waiting.remove(entry)
+                    heapq.heapify(self._waiting)
+                    self._denied += 1
+                    self._cond.notify_all()
+                    return False
+                self._cond.wait(timeout=max(0.01, self._reset_at - now))
+    
+    def try_acquire(self) -> bool:
+        """待たずに枠を取得できる場合だけ取得する（待っているリクエストは追い越さない）"""
+        with self._cond:
+            self._refill(time.time())
+            if self._tokens >= 1 and not self._waiting:
+                self._tokens -= 1
+                self._used += 1
+                return True
+            return False
+    
+    def _refill(self, now: float):
+        """リセット時刻を過ぎていれば枠を上限まで戻す"""
+        if self._reset_at is not None and now >= self._reset_at:
+            self._tokens = self._limit
+            self._server_remaining = None
+            self._reset_at += self._window
+    
+    def update_from_headers(self, headers: Mapping[str, str]):
+        """レスポンスヘッダからサーバ側の残り回数とリセット時刻を反映する"""
+        try:
+            limit = int(headers["Rate-Limit"])
+            remaining = int(headers["Rate-Remaining"])
+            reset_at = float(headers["Rate-Reset"])
+        except (KeyError, TypeError, ValueError):
+            return
+        
+        with self._cond:
+            if self._reset_at is not None and reset_at > self._reset_at:
+                # 新しいウィンドウに入ったため、サーバの値をそのまま使う
+                self._tokens = remaining
+            else:
+                # 並行中のリクエストを二重に数えないよう、少ない方に合わせる
+                self._tokens = min(self._tokens, remaining)
+            self._limit = limit
+            self._server_remaining = remaining
+            self._reset_at = reset_at
+            self._cond.notify_all()
+    
+    def configure(self, limit: int, max_wait: float):
+        """設定の再読み込み時に上限と待ち時間を変更する（サーバから上限を受け取っていればそちらを優先）"""
+        with self._cond:
+            self.max_wait = max_wait
+            if self._reset_at is None:
+                self._tokens = max(0, self._tokens + limit - self._limit)
+                self._limit = limit
+            self._cond.notify_all()
+    
+    def exhaust(self):
+        """レート制限超過のレスポンスを受けた際に残り枠を0にする"""
+        with self._cond:
+            self._tokens = 0
+            self._server_remaining = 0
+    
+    def reset_usage(self):
+        """実行ごとの使用量カウンタをリセットする"""
+        with self._cond:
+            self._used = 0
+            self._denied = 0
+    
+    def usage(self) -> Dict[str, Any]:
+        """今回の実行で使用したリクエスト数と残り枠を返す"""
+        with self._cond:
+            return {
+                "requests": self._used,
+                "denied": self._denied,
+                "limit": self._limit,
+                "remaining": self._server_remaining,
+                "reset_at": _format_epoch(self._reset_at)
+            }
+
+
+def _format_epoch(value: Optional[float]) -> Optional[str]:
+    """UNIX時間を ISO 8601 形式の文字列に変換する"""
+    if value is None:
+        return None
+    return datetime.fromtimestamp(value).isoformat(timespec="seconds")
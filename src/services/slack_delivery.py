@@ -0,0 +1,397 @@
+"""
+Slack送信キュー
+チャンネルをまたいで並列に、メソッドごとのレート制限を守りながらメッセージを配信する。
+送れなかったメッセージはスプールファイルに残し、次回の実行で再送する
+"""
+import os
+import json
+import time
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+from urllib.error import URLError
+from slack_sdk import WebClient
+from slack_sdk.errors import SlackApiError
+
+from ..utils.deadline import Deadline
+from ..utils.metrics import metrics
+
+# Slack のレート制限（1秒あたりの回数, バースト）
+# https://api.slack.com/docs/rate-limits
+TIER_RATES = {
+    1: (1 / 60, 1),
+    2: (20 / 60, 3),
+    3: (50 / 60, 5),
+    4: (100 / 60, 10),
+}
+METHOD_TIERS = {
+    "conversations.history": 3,
+    "conversations.replies": 3,
+}
+# chat.postMessage はチャンネルごとに 1秒1件（短いバーストは許容される）
+POST_MESSAGE_RATE = (1.0, 3)
+
+
+class TokenBucket:
+    """一定レートで補充されるトークンバケット"""
+    
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated_at = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+    
+    def acquire(self):
+        """トークンが1つ得られるまで待つ"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+                self._updated_at = now
+                if now >= self._blocked_until and self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = max(self._blocked_until - now, (1 - self._tokens) / self.rate)
+            time.sleep(wait)
+    
+    def block_for(self, seconds: float):
+        """Retry-After を受けたときに、指定秒数だけ払い出しを止める"""
+        with self._lock:
+            self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+            self._tokens = 0
+
+
+class SlackDeliveryQueue:
+    """
+    スレッド単位のメッセージ群をチャンネルごとに順番に配信するキュー
+    
+    1つのメッセージ群（グループ）は先頭が親投稿、残りが親投稿のスレッドへの返信。
+    同じチャンネルのグループは優先度の順（同じ優先度なら投入順）に1つずつ送るため、スレッド内の順序が保たれる
+    """
+    
+    def __init__(self, client: WebClient, spool_path: str, max_concurrency: int = 4, max_retries: int = 3,
+                 on_delivered: Optional[Callable[[str, Dict[str, Any], str, Optional[str]], None]] = None,
+                 on_sending: Optional[Callable[[str, Dict[str, Any]], None]] = None):
+        self.client = client
+        self.on_delivered = on_delivered  # 1件送るごとに (channel_id, message, ts, thread_ts) で呼ばれる
+        self.on_sending = on_sending  # 1件送る直前に (channel_id, message) で呼ばれる
+        self.spool_path = spool_path
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_retries = max_retries
+        self._buckets = {}
+        self._buckets_lock = threading.Lock()
+        self._groups = []
+        self._groups_lock = threading.Lock()  # 複数のスレッドから投入できるようにする
+        self._spooled = []
+        self._spool_lock = threading.Lock()
+        self._deadline = Deadline()
+    
+    def enqueue(self, channel_id: str, messages: List[Dict[str, Any]], thread_ts: Optional[str] = None,
+                priority: int = 0, tag: Optional[str] = None) -> Dict[str, Any]:
+        """
+        メッセージ群を投入する
+        
+        Args:
+            channel_id (str): 送信先チャンネル
+            messages (list): {"text", "blocks"(任意), "articles"(任意), "metadata"(任意)} の一覧。先頭が親投稿
+            thread_ts (str): 既存スレッドに続けて送る場合のスレッドID
+            priority (int): 送る順番（小さいほど先。締め切りで打ち切られるのは大きい方から）
+            tag (str): メッセージのタグ（スプールしたグループを discard_spooled で探すため）
+        
+        Returns:
+            dict: グループ（配信後に "delivered"（全件送信済み）と "parent_ts"、
+                締め切りで送らなかった場合は "deferred" が入る）
+        """
+        group = {
+            "channel": channel_id,
+            "messages": list(messages),
+            "thread_ts": thread_ts,
+            "priority": priority,
+            "tag": tag,
+            "from_spool": False,
+            "delivered": False,
+            "deferred": False,
+            "parent_ts": thread_ts
+        }
+        with self._groups_lock:
+            self._groups.append(group)
+        return group
+    
+    def load_spool(self) -> int:
+        """前回送れなかったメッセージ群を読み込み、新しいメッセージより先に送るよう投入する"""
+        if not os.path.exists(self.spool_path):
+            return 0
+        try:
+            with open(self.spool_path, "r", encoding="utf-8") as f:
+                spooled = [json.loads(line) for line in f if line.strip()]
+        except (OSError, ValueError) as e:
+            print(f"Warning: 送信スプールを読み込めませんでした ({self.spool_path}): {e}")
+            return 0
+        
+        groups = []
+        for entry in spooled:
+            groups.append({
+                "channel": entry["channel"],
+                "messages": entry["messages"],
+                "thread_ts": entry.get("thread_ts"),
+                "priority": -1,  # 前回の残りは新しいメッセージより先に送る
+                "tag": entry.get("tag"),
+                "from_spool": True,
+                "delivered": False,
+                "deferred": False,
+                "parent_ts": entry.get("thread_ts")
+            })
+        with self._groups_lock:
+            self._groups = groups + self._groups
+        if groups:
+            print(f"Loaded {len(groups)} undelivered message groups from the spool")
+        return len(groups)
+    
+    def discard_spooled(self, channel_id: str, tag: str) -> int:
+        """
+        スプールから読み込んだグループのうち、親投稿を送れていないタグのグループを取り除く
+        
+        同じタグを今回の実行で改めて組み立てて送る場合に、親投稿が2つ送られないようにする
+        （親投稿を送れなかったタグは通知できていないため、ウォーターマークは進んでおらず記事は取得し直される）
+        
+        Returns:
+            int: 取り除いたメッセージ数
+        """
+        with self._groups_lock:
+            discarded = [
+                group for group in self._groups
+                if group["from_spool"] and group["thread_ts"] is None
+                and group["channel"] == channel_id and group["tag"] == tag
+            ]
+            self._groups = [group for group in self._groups if group not in discarded]
+        return sum(len(group["messages"]) for group in discarded)
+    
+    def pending_article_urls(self) -> Set[Tuple[str, str]]:
+        """投入済み（スプールからの再送分を含む）のメッセージに含まれる記事の (チャンネル, URL)"""
+        return {
+            (group["channel"], article["url"])
+            for group in self._groups
+            for message in group["messages"]
+            for article in message.get("articles", [])
+        }
+    
+    def flush(self, deadline: Optional[Deadline] = None) -> List[Dict[str, Any]]:
+        """
+        投入済みのメッセージ群を配信し、送れなかった分をスプールに書き出す
+        
+        Args:
+            deadline (Deadline): 締め切り。過ぎた時点でまだ親投稿を送っていない新しいグループは送らずに捨て
+                （"deferred"。次回の実行で取得し直して送る）、送りかけのグループの残りはスプールする
+        
+        Returns:
+            list: 配信を試みたグループ
+        """
+        with self._groups_lock:
+            groups, self._groups = self._groups, []
+        scheduler = _PriorityScheduler(groups)
+        
+        self._deadline = deadline if deadline is not None else Deadline()
+        try:
+            workers = min(self.max_concurrency, scheduler.channels)
+            if workers <= 1:
+                self._deliver_scheduled(scheduler)
+            else:
+                with ThreadPoolExecutor(max_workers=workers) as executor:
+                    for future in [executor.submit(self._deliver_scheduled, scheduler) for _ in range(workers)]:
+                        future.result()
+        finally:
+            self._deadline = Deadline()
+        
+        self._write_spool()
+        return groups
+    
+    def _deliver_scheduled(self, scheduler: "_PriorityScheduler"):
+        """払い出されたグループを、無くなるまで1つずつ配信する"""
+        while True:
+            group = scheduler.next()
+            if group is None:
+                return
+            try:
+                if self._deadline.expired():
+                    self._defer(group)
+                else:
+                    self._deliver_group(group)
+            except Exception as e:
+                print(f"Error delivering messages to {group['channel']}: {e}")
+            finally:
+                scheduler.done(group)
+    
+    def _defer(self, group: Dict[str, Any]):
+        """締め切りを過ぎて送らなかったグループを次回に回す（スプールから読んだものは再びスプールする）"""
+        group["deferred"] = True
+        if group["from_spool"]:
+            self._spool(group, group["messages"], group["thread_ts"])
+    
+    def _deliver_group(self, group: Dict[str, Any]):
+        """グループ内のメッセージを先頭から順に送る。失敗したら残りをスプールする"""
+        thread_ts = group["thread_ts"]
+        messages = group["messages"]
+        for index, message in enumerate(messages):
+            if index > 0 and self._deadline.expired():
+                # 送りかけのスレッドは途中で捨てず、残りを次回に送る
+                self._spool(group, messages[index:], thread_ts)
+                print(f"Spooled {len(messages) - index} messages for {group['channel']}: run deadline reached")
+                return
+            if self.on_sending:
+                self.on_sending(group["channel"], message)
+            try:
+                response = self.call(
+                    "chat.postMessage",
+                    channel=group["channel"],
+                    text=message["text"],
+                    blocks=message.get("blocks"),
+                    thread_ts=thread_ts,
+                    metadata=message.get("metadata")
+                )
+            except Exception as e:
+                if _is_retryable(e):
+                    # 順序を保つため、失敗したメッセージ以降をまとめて次回に回す
+                    self._spool(group, messages[index:], thread_ts)
+                    print(f"Spooled {len(messages) - index} undelivered messages for {group['channel']}: {_describe(e)}")
+                else:
+                    print(f"Error sending message to {group['channel']}: {_describe(e)}")
+                    if thread_ts is None:
+                        return  # 親投稿が無ければ返信は送れない
+                    continue
+                return
+            
+            ts = response['ts']
+            print(f"Message sent: {ts}")
+            if self.on_delivered:
+                self.on_delivered(group["channel"], message, ts, thread_ts)
+            if thread_ts is None:
+                thread_ts = ts
+                group["parent_ts"] = ts
+        
+        group["delivered"] = True
+    
+    def call(self, method: str, **kwargs) -> Any:
+        """
+        Slack API をレート制限に従って呼び出す
+        
+        429 の場合は Retry-After に従って待ち、max_retries 回まで再試行する
+        """
+        func = getattr(self.client, method.replace(".", "_"))
+        bucket = self._bucket_for(method, kwargs.get("channel"))
+        for attempt in range(self.max_retries + 1):
+            bucket.acquire()
+            try:
+                with metrics.timer("slack_api_seconds", method=method):
+                    response = func(**kwargs)
+            except SlackApiError as e:
+                metrics.increment("slack_api_calls_total", method=method, status=e.response.status_code)
+                if e.response.status_code != 429 or attempt >= self.max_retries:
+                    raise
+                retry_after = float(e.response.headers.get("Retry-After", 1))
+                if retry_after >= self._deadline.remaining():
+                    raise  # 待つと締め切りを過ぎる（送りかけの分はスプールされる）
+                print(f"Rate limited on {method}, retrying after {retry_after:.0f}s")
+                metrics.increment("slack_retries_total", method=method)
+                bucket.block_for(retry_after)
+            except Exception:
+                metrics.increment("slack_api_calls_total", method=method, status="error")
+                raise
+            else:
+                metrics.increment("slack_api_calls_total", method=method, status="ok")
+                return response
+    
+    def _bucket_for(self, method: str, channel_id: Optional[str]) -> TokenBucket:
+        """メソッド（chat.postMessage はチャンネルごと）のトークンバケットを返す"""
+        if method == "chat.postMessage":
+            key = (method, channel_id)
+            rate, capacity = POST_MESSAGE_RATE
+        else:
+            key = (method, None)
+            rate, capacity = TIER_RATES[METHOD_TIERS.get(method, 3)]
+        with self._buckets_lock:
+            if key not in self._buckets:
+                self._buckets[key] = TokenBucket(rate, capacity)
+            return self._buckets[key]
+    
+    def _spool(self, group: Dict[str, Any], messages: List[Dict[str, Any]], thread_ts: Optional[str]):
+        """グループの未配信のメッセージを次回の再送用に記録する"""
+        entry = {"channel": group["channel"], "messages": messages, "thread_ts": thread_ts, "tag": group.get("tag")}
+        with self._spool_lock:
+            self._spooled.append(entry)
+        metrics.increment("slack_spooled_messages_total", len(messages))
+    
+    def _write_spool(self):
+        """未配信のメッセージをスプールファイルに書き出す（無ければファイルを消す）"""
+        with self._spool_lock:
+            spooled, self._spooled = self._spooled, []
+        if not spooled:
+            if os.path.exists(self.spool_path):
+                os.remove(self.spool_path)
+            return
+        
+        directory = os.path.dirname(self.spool_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.spool_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for entry in spooled:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        os.replace(tmp_path, self.spool_path)
+
+
+class _PriorityScheduler:
+    """
+    グループを優先度の順に払い出す（締め切りで打ち切られるのが優先度の低いグループになるように）
+    
+    同じチャンネルのグループは、前のグループを送り終えるまで払い出さない（スレッド内の順序を保つ）
+    """
+    
+    def __init__(self, groups: List[Dict[str, Any]]):
+        self._queues: Dict[str, deque] = {}
+        for group in sorted(groups, key=lambda g: g["priority"]):  # 同じ優先度なら投入順
+            self._queues.setdefault(group["channel"], deque()).append(group)
+        self.channels = len(self._queues)
+        self._busy: Set[str] = set()
+        self._cond = threading.Condition()
+    
+    def next(self) -> Optional[Dict[str, Any]]:
+        """送信中でないチャンネルの先頭のうち、最も優先度の高いグループを返す（残りが無ければ None）"""
+        with self._cond:
+            while self._queues:
+                best = None
+                for channel, queue in self._queues.items():
+                    if channel not in self._busy and (best is None or queue[0]["priority"] < best[0]["priority"]):
+                        best = queue
+                if best is None:
+                    self._cond.wait()
+                    continue
+                group = best.popleft()
+                if not best:
+                    del self._queues[group["channel"]]
+                self._busy.add(group["channel"])
+                return group
+            return None
+    
+    def done(self, group: Dict[str, Any]):
+        """グループを送り終えた（同じチャンネルの次のグループを払い出せるようにする）"""
+        with self._cond:
+            self._busy.discard(group["channel"])
+            self._cond.notify_all()
+
+
+def _is_retryable(error: Exception) -> bool:
+    """次回の実行で再送すべきエラーか（レート制限・サーバエラー・通信エラー）"""
+    if isinstance(error, SlackApiError):
+        status = error.response.status_code
+        return status == 429 or status >= 500
+    return isinstance(error, (URLError, OSError))
+
+
+def _describe(error: Exception) -> str:
+    """ログ用のエラー表記"""
+    if isinstance(error, SlackApiError):
+        return str(error.response.get("error", error))
+    return str(error)
@@ -2,159 +2,567 @@
 Slack通知サービス
 Slackへのメッセージ送信、履歴管理、重複チェック機能
 """
-import re
+import os
+import hashlib
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Dict, Any, Optional, Set, List
+from typing import Dict, Any, Optional, Set, List, Tuple
 from slack_sdk import WebClient
 from slack_sdk.errors import SlackApiError
 
+from ..config.routing import DEFAULT_WORKSPACE, Destination
 from ..config.settings import Config
+from ..models import Article
+from ..storage import PostedArticleIndex, RunJournal
+from .fanout import FanoutExecutor
+from .slack_delivery import SlackDeliveryQueue
+from .thread_discovery import URL_BLOCK_PREFIX, ThreadDiscovery
+from ..utils.deadline import Deadline
 from ..utils.formatters import format_latex_for_slack
+from ..utils.metrics import metrics
+from ..utils.render_cache import RenderCache
+from ..utils.slack_blocks import build_section_block, split_section_text, pack_digest_messages
+
+# 冪等キーを載せるメッセージのメタデータのイベント種別
+NOTIFICATION_EVENT_TYPE = "qiita_article_notification"
+
+
 class SlackService:
     """Slack通知サービス"""
     
-    def __init__(self, config: Config):
+    def __init__(self, config: Config, client: Optional[Any] = None):
+        self.config = config
+        self.routing = config.routing
+        # client を渡した場合は全ワークスペースでそれを使う（LocalSlackClient などのスタンドイン）
+        self._client_override = client
+        self.client = client if client is not None else WebClient(
+            token=config.slack_token, base_url=config.slack_api_url, timeout=config.slack_request_timeout
+        )
+        
+        # ワークスペースごとの送信キュー（チャンネル間は並列、レート制限と再試行、未配信分のスプール）
+        self.delivery = self._create_delivery(config, DEFAULT_WORKSPACE, self.client)
+        self.deliveries = {DEFAULT_WORKSPACE: self.delivery}
+        self._open_workspaces(config)
+        
+        # 通知先ごとの準備をシャードに分けて並列に行う
+        self.fanout = FanoutExecutor(config.slack_fanout_shards)
+        self._payloads = {}
+        self._payloads_lock = threading.Lock()
+        self._journal = None  # 実行中の実行ジャーナル（notify_articles の間だけ設定）
+        
+        self.posted_index = None
+        self._open_posted_index(config)
+        
+        # チャンネルごとの最新の親投稿とスレッドの記事URL（Slack 履歴での重複判定・取り込みに使う）
+        self.thread_discovery = ThreadDiscovery(
+            os.path.join(config.state_dir, "slack_threads.json"),
+            lookback_days=config.thread_discovery_lookback_days
+        )
+        
+        # 整形済みタイトルとブロックのキャッシュ（記事ID + 更新日時がキー）
+        self.render_cache = RenderCache(
+            config.render_cache_size,
+            path=self._render_cache_path(config)
+        )
+    
+    def _create_delivery(self, config: Config, workspace: str, client: Any) -> SlackDeliveryQueue:
+        """ワークスペースの送信キューを作成する"""
+        return SlackDeliveryQueue(
+            client,
+            self._spool_path(config, workspace),
+            max_concurrency=config.slack_delivery_concurrency,
+            max_retries=config.slack_max_retries,
+            on_delivered=functools.partial(self._on_message_delivered, workspace),
+            on_sending=functools.partial(self._on_message_sending, workspace)
+        )
+    
+    def _spool_path(self, config: Config, workspace: str) -> str:
+        """ワークスペースの送信スプールの保存先"""
+        if workspace == DEFAULT_WORKSPACE:
+            return os.path.join(config.state_dir, "slack_spool.jsonl")
+        return os.path.join(config.state_dir, f"slack_spool.{workspace}.jsonl")
+    
+    def _open_workspaces(self, config: Config):
+        """通知先に含まれるワークスペースの送信キューを用意する（既存のキューは引き継ぐ）"""
+        for workspace in sorted(config.routing.workspaces()):
+            if workspace in self.deliveries:
+                continue
+            client = self._client_override
+            if client is None:
+                client = WebClient(
+                    token=config.slack_workspace_tokens[workspace],
+                    base_url=config.slack_api_url,
+                    timeout=config.slack_request_timeout
+                )
+            self.deliveries[workspace] = self._create_delivery(config, workspace, client)
+    
+    def _open_posted_index(self, config: Config):
+        """投稿済み記事のローカルインデックスを開く（"slack_history" の場合は毎回履歴を走査）"""
+        if self.posted_index is not None:
+            self.posted_index.close()
+            self.posted_index = None
+        if config.dedup_store == "local":
+            self.posted_index = PostedArticleIndex(
+                os.path.join(config.state_dir, "posted_articles.sqlite3"),
+                retention_days=config.dedup_retention_days
+            )
+    
+    def _render_cache_path(self, config: Config) -> Optional[str]:
+        """レンダリングキャッシュの保存先（永続化しない場合は None）"""
+        if not config.render_cache_persist:
+            return None
+        return os.path.join(config.state_dir, "render_cache.json")
+    
+    def reload_config(self, config: Config):
+        """
+        再読み込みした設定を反映する（常駐モード用）
+        
+        WebClient・送信キューのレート制限状態・レンダリングキャッシュの内容は引き継ぐ
+        """
         self.config = config
-        self.tag_channel_map = config.tag_channel_map
-        self.client = WebClient(token=config.slack_token)
+        self.routing = config.routing
+        self._open_posted_index(config)
+        
+        self.render_cache.max_entries = config.render_cache_size
+        self.render_cache.path = self._render_cache_path(config)
+        
+        self.thread_discovery.path = os.path.join(config.state_dir, "slack_threads.json")
+        self.thread_discovery.lookback_days = config.thread_discovery_lookback_days
+        
+        self._open_workspaces(config)
+        for workspace, delivery in self.deliveries.items():
+            delivery.spool_path = self._spool_path(config, workspace)
+            delivery.max_concurrency = max(1, config.slack_delivery_concurrency)
+            delivery.max_retries = config.slack_max_retries
+        self.fanout = FanoutExecutor(config.slack_fanout_shards)
     
-    def notify_articles(self, articles_by_tag: Dict[str, List[Dict[str, Any]]]) -> bool:
-        """記事をSlackに通知する"""
-        success_count = 0
+    def notify_articles(self, articles_by_tag: Dict[str, List[Article]],
+                        deadline: Optional[Deadline] = None, journal: Optional[RunJournal] = None) -> Set[str]:
+        """
+        記事をSlackに通知する
+        
+        Args:
+            articles_by_tag (dict): タグごとの通知する記事
+            deadline (Deadline): 実行の締め切り。過ぎた時点でまだ送っていないタグ（優先順位の低いもの）は次回に持ち越す
+            journal (RunJournal): 実行ジャーナル。送信したメッセージを冪等キーで記録し、
+                中断した実行の再開時は送信済みのメッセージを送らず、作成済みの親投稿のスレッドに続ける
+        
+        Returns:
+            set: すべての通知先に親投稿を送れたタグ（残りの返信がスプールされたものを含む）
+        """
+        if self.posted_index is not None:
+            evicted = self.posted_index.evict_expired()
+            if evicted:
+                print(f"Evicted {evicted} expired entries from the posted article index")
+        
+        # 前回送れなかったメッセージを先に送る
+        for delivery in self.deliveries.values():
+            delivery.load_spool()
         
+        jobs = []
         for tag, articles in articles_by_tag.items():
             if not articles:
                 print(f"No articles found for tag: {tag}")
                 continue
-
-            slack_channel_id = self.tag_channel_map.get(tag)
-            if not slack_channel_id:
+            
+            destinations = self.routing.destinations(tag)
+            if not destinations:
                 print(f"❌ Error: チャンネルIDが見つかりません: {tag}")
                 continue
-
+            jobs.extend((destination, (tag, articles)) for destination in destinations)
+        
+        # 親投稿を送れずにスプールしたタグを今回も送る場合は、スプールの分を捨てて組み立て直す
+        # （スプールの親投稿と新しい親投稿が両方送られ、同じ記事が「重複」として通知されるのを防ぐ）
+        for destination, (tag, _) in jobs:
+            discarded = self.deliveries[destination.workspace].discard_spooled(destination.channel, tag)
+            if discarded:
+                print(f"♻️ {destination}: スプールした #{tag} の {discarded} 件を、今回組み立てるメッセージに置き換えます")
+        
+        enqueued_urls = set()  # 送信待ちの (通知先, URL)
+        for workspace, delivery in self.deliveries.items():
+            enqueued_urls.update(
+                (str(Destination(workspace, channel_id)), url)
+                for channel_id, url in delivery.pending_article_urls()
+            )
+        
+        # 通知先ごとの重複判定とメッセージの投入をシャードに分けて並列に行う
+        # （同じ記事の組み合わせのメッセージは1回だけ組み立て、通知先の間で使い回す）
+        self._payloads = {}
+        self._journal = journal
+        try:
+            results = self.fanout.run(
+                jobs, lambda destination, job: self._prepare_destination(destination, job[0], job[1], enqueued_urls)
+            )
+            groups_by_tag = {}
+            for (_, (tag, _)), group in zip(jobs, results):
+                groups_by_tag.setdefault(tag, []).append(group)
+            
+            # チャンネル・ワークスペースをまたいで並列に配信（同じチャンネル内は優先順位の順）
+            with metrics.span("post"):
+                self._flush_deliveries(deadline)
+        finally:
+            self._payloads = {}
+            self._journal = None
+        
+        delivered = {
+            tag for tag, groups in groups_by_tag.items()
+            if all(group is not None and group["parent_ts"] for group in groups)
+        }
+        deferred = [
+            tag for tag, groups in groups_by_tag.items()
+            if any(group is not None and group["deferred"] for group in groups)
+        ]
+        if deferred:
+            metrics.increment("tags_deferred_total", len(deferred), stage="notify")
+            print(f"⏭️ 通知の持ち時間を使い切ったため、{len(deferred)} 件のタグを次回に持ち越します: {', '.join(deferred)}")
+        
+        self.render_cache.save()
+        self.thread_discovery.save()
+        stats = self.render_cache.stats()
+        print(f"Render cache: hits={stats['hits']} misses={stats['misses']} hit_rate={stats['hit_rate']:.0%}")
+        return delivered
+    
+    def _priority_of(self, tag: str) -> int:
+        """タグの優先順位（小さいほど高い）"""
+        try:
+            return self.config.tag_priority.index(tag)
+        except ValueError:
+            return len(self.config.tag_priority)
+    
+    def _prepare_destination(self, destination: Destination, tag: str, articles: List[Article],
+                             enqueued_urls: Set[Any]) -> Dict[str, Any]:
+        """1つの通知先について重複を判定し、メッセージを送信キューに投入する"""
+        with metrics.span("dedup", tag=tag):
+            new_articles, duplicate_articles = self._split_posted_articles(
+                destination, articles, enqueued_urls
+            )
+        metrics.increment("articles_total", len(duplicate_articles), stage="duplicate")
+        
+        messages = self._render_messages(tag, new_articles, duplicate_articles)
+        thread_ts = None
+        if self._journal is not None:
+            messages, thread_ts = self._skip_posted_messages(destination, messages)
+        return self.deliveries[destination.workspace].enqueue(
+            destination.channel, messages, thread_ts=thread_ts, priority=self._priority_of(tag), tag=tag
+        )
+    
+    def _skip_posted_messages(self, destination: Destination,
+                              messages: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        中断した実行で送信済みのメッセージを除く
+        
+        Returns:
+            tuple: (送るメッセージ, 親投稿が送信済みならその ts（残りはそのスレッドに送る）)
+        """
+        if self._journal.uncertain(str(destination)):
+            self._reconcile_uncertain(destination, messages)
+        posted = self._journal.posted(str(destination))
+        parent_ts = posted.get(messages[0]["idempotency_key"])
+        if parent_ts is None:
+            return messages, None
+        remaining = [message for message in messages[1:] if message["idempotency_key"] not in posted]
+        skipped = len(messages) - len(remaining)
+        metrics.increment("journal_skipped_messages_total", skipped)
+        print(f"♻️ {destination}: 送信済みの {skipped} 件を飛ばし、既存のスレッド {parent_ts} に続けます")
+        return remaining, parent_ts
+    
+    def _render_messages(self, tag: str, new_articles: List[Article],
+                         duplicate_articles: List[Article]) -> List[Dict[str, Any]]:
+        """
+        タグのメッセージを組み立てる
+        
+        同じ実行で同じ記事の組み合わせを組み立て済みなら、その結果を返す（通知先の数によらず1回だけ組み立てる）
+        """
+        mode = self.config.notification_mode
+        key = (mode, tag, tuple(a.id for a in new_articles), tuple(a.id for a in duplicate_articles))
+        with self._payloads_lock:
+            messages = self._payloads.get(key)
+        if messages is not None:
+            metrics.increment("payload_renders_total", result="reused")
+            return messages
+        
+        if mode == "digest":
+            messages = self._build_digest_messages(tag, new_articles, duplicate_articles)
+        else:
+            messages = self._build_thread_messages(tag, new_articles, duplicate_articles)
+        if self._journal is not None:
+            for index, message in enumerate(messages):
+                idempotency_key = self._idempotency_key(tag, index, message)
+                message["idempotency_key"] = idempotency_key
+                # 送信中に落ちた場合に、Slack の履歴から送れたかどうかを確かめられるようにする
+                message["metadata"] = {
+                    "event_type": NOTIFICATION_EVENT_TYPE,
+                    "event_payload": {"idempotency_key": idempotency_key}
+                }
+        metrics.increment("payload_renders_total", result="rendered")
+        with self._payloads_lock:
+            # 他のスレッドが先に組み立てていればそちらを使う
+            return self._payloads.setdefault(key, messages)
+    
+    def _reconcile_uncertain(self, destination: Destination, messages: List[Dict[str, Any]]):
+        """
+        送信中に中断したメッセージが実際に送れていたかを Slack の履歴（メッセージのメタデータ）で確かめ、
+        送れていたものを送信済みとして記録する
+        """
+        key = str(destination)
+        delivery = self.deliveries[destination.workspace]
+        uncertain = self._journal.uncertain(key)
+        parent_key = messages[0]["idempotency_key"]
+        for message in messages:
+            message_key = message["idempotency_key"]
+            if message_key not in uncertain:
+                continue
+            request = {
+                "channel": destination.channel,
+                "oldest": f"{uncertain[message_key] - 1:.6f}",
+                "include_all_metadata": True,
+                "limit": 200
+            }
+            if message_key == parent_key:
+                method = "conversations.history"
+            else:
+                parent_ts = self._journal.posted(key).get(parent_key)
+                if parent_ts is None:
+                    continue
+                method = "conversations.replies"
+                request["ts"] = parent_ts
             try:
-                # 最新の親投稿から投稿された記事のURLを取得
-                latest_article_urls = self._get_latest_parent_article_urls(slack_channel_id)
-
-                # 今日の新規親投稿を作成し、スレッドを開始
-                parent_response = self.client.chat_postMessage(
-                    channel=slack_channel_id,
-                    text=f"📢 *最新のQiita記事まとめ - #{tag} - {datetime.now().strftime('%Y-%m-%d')}*"
-                )
-                thread_ts = parent_response['ts']
-
-                duplicate_articles = []  # 重複している記事情報を保持
-
-                for article in articles:
-                    if article["url"] in latest_article_urls:
-                        print(f"記事 {article['id']} は既に最新の親投稿にあります。スキップします。")
-                        duplicate_articles.append(f"*{article['title']}* (<{article['url']}>)")
-                        continue
-
-                    # 記事をSlackに送信
-                    self._send_message_to_slack(
-                        channel_id=slack_channel_id,
-                        article=article,
-                        thread_ts=thread_ts
-                    )
-
-                # 重複記事がある場合、同じスレッドに通知を送信
-                if duplicate_articles:
-                    duplicate_text = (
-                        "⚠️ 重複記事通知: 以下の記事は既に最新の親投稿と重複しているため、今回の更新ではスキップされました。\n"
-                        + "\n".join(duplicate_articles)
-                    )
-                    self._send_message_to_slack(
-                        channel_id=slack_channel_id,
-                        article={
-                            "title": "重複記事通知",
-                            "url": "",
-                            "description": duplicate_text,
-                            "likes": 0,
-                            "user": "system"
-                        },
-                        thread_ts=thread_ts
-                    )
-                
-                success_count += 1
-
+                ts = _find_message_by_key(delivery, method, request, message_key)
             except SlackApiError as e:
-                print(f"Error sending parent message for {tag} in {slack_channel_id}: {e.response['error']}")
+                print(f"Warning: {destination} の送信済みメッセージを確認できませんでした: {e.response['error']}")
+                return
+            if ts is not None:
+                self._journal.record_posted(key, message_key, ts, [a["url"] for a in message.get("articles", [])])
+    
+    def _idempotency_key(self, tag: str, index: int, message: Dict[str, Any]) -> str:
+        """
+        メッセージの冪等キー（同じ実行・タグの同じ内容なら再開後も同じになる）
         
-        return success_count > 0
+        親投稿は日付入りの見出しを含むため位置で、返信は含む記事URL（無ければ本文）で決める
+        """
+        if index == 0:
+            return f"{self._journal.run_id}:{tag}:parent"
+        urls = [article["url"] for article in message.get("articles", [])]
+        content = "\n".join(urls) if urls else message["text"]
+        return f"{self._journal.run_id}:{tag}:{hashlib.sha1(content.encode('utf-8')).hexdigest()[:16]}"
     
-    def _send_message_to_slack(self, channel_id: str, article: Dict[str, Any], thread_ts: Optional[str] = None) -> Optional[str]:
-        """Slack にメッセージを送信する"""
-        # シンプルなフォーマット：タグ、タイトル、URLのみ
-        text_fallback = f"{article['title']} - {article['url']}"
+    def _flush_deliveries(self, deadline: Optional[Deadline] = None):
+        """すべてのワークスペースの送信キューを配信する"""
+        deliveries = list(self.deliveries.values())
+        if len(deliveries) <= 1:
+            for delivery in deliveries:
+                delivery.flush(deadline)
+            return
+        with ThreadPoolExecutor(max_workers=len(deliveries)) as executor:
+            list(executor.map(lambda delivery: delivery.flush(deadline), deliveries))
+    
+    def _split_posted_articles(self, destination: Destination, articles: List[Article],
+                               enqueued_urls: Set[Any]) -> Tuple[List[Article], List[Article]]:
+        """
+        記事を未投稿のものと投稿済み（送信待ちを含む）のものに分ける
+        
+        未投稿の記事は enqueued_urls に追加する
+        """
+        # 投稿済みインデックスのキー（既定のワークスペースはチャンネルIDのまま）
+        key = str(destination)
+        delivery = self.deliveries[destination.workspace]
         
-        # 数式表記のクリーニング（LaTeX形式の数式を適切に表示）
-        title = format_latex_for_slack(article['title'])
+        # 投稿済み記事の判定材料を用意（ローカルインデックスが無効なら最新の親投稿から取得）
+        latest_article_urls = set()
+        if self.posted_index is not None:
+            self._backfill_posted_index(destination, delivery)
+        else:
+            latest_article_urls = self.thread_discovery.article_urls(key, destination.channel, delivery)
+        
+        # 中断した実行で送信済みの記事は、元の実行と同じメッセージになるよう未投稿として扱う
+        # （送信済みのメッセージは冪等キーで飛ばす）
+        resumed_urls = self._journal.posted_urls(key) if self._journal is not None else set()
+        
+        new_articles = []
+        duplicate_articles = []  # 重複している記事を保持
+        for article in articles:
+            if article.url in resumed_urls:
+                new_articles.append(article)
+            elif ((key, article.url) in enqueued_urls
+                    or self._is_already_posted(key, article.url, latest_article_urls)):
+                print(f"記事 {article.id} は既に投稿済みです。スキップします。")
+                duplicate_articles.append(article)
+            else:
+                new_articles.append(article)
+                enqueued_urls.add((key, article.url))
+        return new_articles, duplicate_articles
+    
+    def _on_message_sending(self, workspace: str, channel_id: str, message: Dict[str, Any]):
+        """メッセージを送る直前に、実行ジャーナルに送信を始めたことを記録する"""
+        journal = self._journal
+        if journal is not None and message.get("idempotency_key"):
+            journal.record_sending(str(Destination(workspace, channel_id)), message["idempotency_key"])
+    
+    def _on_message_delivered(self, workspace: str, channel_id: str, message: Dict[str, Any], ts: str,
+                              thread_ts: Optional[str]):
+        """メッセージの送信に成功したら、含まれる記事を投稿済みとして記録する"""
+        key = str(Destination(workspace, channel_id))
+        journal = self._journal
+        if journal is not None and message.get("idempotency_key"):
+            journal.record_posted(
+                key, message["idempotency_key"], ts, [article["url"] for article in message.get("articles", [])]
+            )
+        if self.posted_index is None:
+            # Slack 履歴で判定する場合は、次回の探索が今回の投稿を読み直さずに済むようキャッシュに反映する
+            self.thread_discovery.record(key, message, ts, thread_ts)
+            return
+        for article in message.get("articles", []):
+            self.posted_index.record(key, article["url"], article["id"])
+    
+    def _parent_text(self, tag: str) -> str:
+        """親投稿の見出し"""
+        return f"📢 *最新のQiita記事まとめ - #{tag} - {datetime.now().strftime('%Y-%m-%d')}*"
+    
+    def _duplicate_lines(self, duplicate_articles: List[Article]) -> List[str]:
+        """重複記事通知の本文（1記事1行）"""
+        return [f"*{article.title}* (<{article.url}>)" for article in duplicate_articles]
+    
+    def _build_thread_messages(self, tag: str, articles: List[Article],
+                               duplicate_articles: List[Article]) -> List[Dict[str, Any]]:
+        """親投稿と、スレッドに1件ずつ投稿する記事のメッセージを組み立てる"""
+        # 今日の新規親投稿を作成し、スレッドを開始
+        messages = [{"text": self._parent_text(tag)}]
+        
+        for article in articles:
+            messages.append(self._build_article_message(article))
+        
+        # 重複記事がある場合、同じスレッドに通知を送信
+        if duplicate_articles:
+            duplicate_text = (
+                "⚠️ 重複記事通知: 以下の記事は既に投稿済みのため、今回の更新ではスキップされました。\n"
+                + "\n".join(self._duplicate_lines(duplicate_articles))
+            )
+            notice = Article(
+                id=None,
+                title="重複記事通知",
+                url="",
+                description=duplicate_text,
+                tag=tag,
+                user="system"
+            )
+            messages.append({
+                "text": f"{notice.title} - {notice.url}",
+                "blocks": self._build_article_blocks(notice)
+            })
+        return messages
+    
+    def _build_digest_messages(self, tag: str, articles: List[Article],
+                               duplicate_articles: List[Article]) -> List[Dict[str, Any]]:
+        """
+        タグの記事をまとめて、できるだけ少ないメッセージに組み立てる
         
-        # シンプルなブロック形式（タイトルを最初に表示）
-        blocks = [
+        1通目を親投稿とし、ブロック数や文字数の上限を超えた分は続きとしてスレッドに投稿する
+        """
+        items = [
             {
-                "type": "section",
-                "text": {
-                    "type": "mrkdwn",
-                    "text": f"*【タイトル】*\n{title}\n\n*【タグ】* #{article['tag']}\n\n*【URL】*\n{article['url']}"
-                }
+                "blocks": self._build_article_blocks(article),
+                "text": f"{article.title} - {article.url}",
+                "article": article
             }
+            for article in articles
         ]
         
-        try:
-            response = self.client.chat_postMessage(
-                channel=channel_id,
-                text=text_fallback,
-                blocks=blocks,
-                thread_ts=thread_ts
-            )
-            print(f"Message sent: {response['ts']}")
-            return response['ts']
-        except SlackApiError as e:
-            print(f"Error sending message: {e.response['error']}")
-            return None
+        if duplicate_articles:
+            lines = ["⚠️ 重複記事通知: 以下の記事は既に投稿済みのため、今回の更新ではスキップされました。"]
+            lines.extend(self._duplicate_lines(duplicate_articles))
+            for chunk in split_section_text(lines):
+                items.append({"blocks": [build_section_block(chunk)], "text": chunk})
+        
+        return [
+            {
+                "text": message["text"],
+                "blocks": message["blocks"],
+                "articles": [self._article_ref(item["article"]) for item in message["items"] if item.get("article")]
+            }
+            for message in pack_digest_messages(self._parent_text(tag), items)
+        ]
     
-    def _get_latest_parent_article_urls(self, channel_id: str) -> Set[str]:
-        """Slack チャンネル内で最新の親投稿のスレッドから、投稿された記事のURLを抽出する"""
-        try:
-            # チャンネルの直近20件のメッセージを取得
-            result = self.client.conversations_history(channel=channel_id, limit=20)
-            messages = result.get('messages', [])
-            # 親投稿（スレッドの開始投稿）で、「最新のQiita記事まとめ」というテキストが含まれるものを抽出
-            parent_messages = [
-                m for m in messages 
-                if ("📢 *最新のQiita記事まとめ" in m.get('text', ''))
-                and (("thread_ts" not in m) or (m.get('thread_ts') == m.get('ts')))
-            ]
-            if not parent_messages:
-                return set()
-            # 最新の親投稿（最も新しいもの）を選ぶ
-            parent_messages.sort(key=lambda m: float(m['ts']), reverse=True)
-            target_message = parent_messages[0]
-            
-            # 対象の親投稿のスレッド（返信）を取得。親投稿自体は除外する
-            replies_result = self.client.conversations_replies(
-                channel=channel_id,
-                ts=target_message['ts'],
-                limit=10
-            )
-            replies = replies_result.get('messages', [])
-            article_urls = []
-            for msg in replies:
-                if msg.get('ts') == target_message['ts']:
-                    continue  # 親投稿は除外
-                text = msg.get('text', '')
-                # Qiita記事のURLを抽出（フォーマット例："🔗 *URL:* https://qiita.com/..."）
-                match = re.search(r"URL:.*?https://qiita\.com/[^\s\">]+", text)
-                if match:
-                    # URL部分だけを抽出
-                    url_text = match.group(0)
-                    url = re.search(r'https://[^\s">]+', url_text).group(0)
-                    article_urls.append(url)
+    def _build_article_message(self, article: Article) -> Dict[str, Any]:
+        """記事1件分のメッセージを組み立てる"""
+        # シンプルなフォーマット：タグ、タイトル、URLのみ
+        return {
+            "text": f"{article.title} - {article.url}",
+            "blocks": self._build_article_blocks(article),
+            "articles": [self._article_ref(article)]
+        }
+    
+    def _article_ref(self, article: Article) -> Dict[str, Any]:
+        """送信後に投稿済みとして記録するための記事情報（スプールに保存できる形）"""
+        return {"id": article.id, "url": article.url}
+    
+    def _build_article_blocks(self, article: Article) -> List[Dict[str, Any]]:
+        """記事のブロックを組み立てる（同じ記事・更新日時ならキャッシュを再利用する）"""
+        key = RenderCache.make_key("blocks", article, article.tag)
+        blocks = self.render_cache.get(key)
+        if key is not None:
+            metrics.increment("render_cache_requests_total", kind="blocks", result="miss" if blocks is None else "hit")
+        if blocks is None:
+            title = self._format_title(article)
             
-            print(f"Found {len(article_urls)} existing article URLs in the latest thread")
-            return set(article_urls)
-        except SlackApiError as e:
-            print(f"Error fetching latest parent message: {e.response['error']}")
-            return set()
+            # シンプルなブロック形式（タイトルを最初に表示）
+            blocks = [
+                {
+                    "type": "section",
+                    "text": {
+                        "type": "mrkdwn",
+                        "text": f"*【タイトル】*\n{title}\n\n*【タグ】* #{article.tag}\n\n*【URL】*\n{article.url}"
+                    }
+                }
+            ]
+            if article.url:
+                # 履歴から投稿済みの記事を探すときは、本文ではなくこの block_id から URL を読む
+                blocks[0]["block_id"] = URL_BLOCK_PREFIX + article.url
+            self.render_cache.put(key, blocks)
+        # キャッシュ内のリストに要素が追加されないようコピーを返す（要素は書き換えないこと）
+        return list(blocks)
+    
+    def _format_title(self, article: Article) -> str:
+        """数式表記のクリーニング（LaTeX形式の数式を適切に表示）"""
+        key = RenderCache.make_key("title", article)
+        title = self.render_cache.get(key)
+        if key is not None:
+            metrics.increment("render_cache_requests_total", kind="title", result="miss" if title is None else "hit")
+        if title is None:
+            title = format_latex_for_slack(article.title)
+            self.render_cache.put(key, title)
+        return title
+    
+    def _is_already_posted(self, channel_id: str, url: str, latest_article_urls: Set[str]) -> bool:
+        """記事がチャンネルに投稿済みかどうかを判定する"""
+        if self.posted_index is not None:
+            return self.posted_index.contains(channel_id, url)
+        return url in latest_article_urls
+    
+    def _backfill_posted_index(self, destination: Destination, delivery: SlackDeliveryQueue):
+        """初回のみ、Slack 履歴の最新の親投稿から投稿済み記事をインデックスに取り込む"""
+        key = str(destination)
+        if not self.config.dedup_backfill or self.posted_index.is_backfilled(key):
+            return
+        
+        urls = self.thread_discovery.article_urls(key, destination.channel, delivery)
+        for url in urls:
+            self.posted_index.record(key, url)
+        self.posted_index.mark_backfilled(key)
+        print(f"Backfilled {len(urls)} article URLs from Slack history for {destination}")
+
+
+def _find_message_by_key(delivery: SlackDeliveryQueue, method: str, request: Dict[str, Any],
+                         idempotency_key: str) -> Optional[str]:
+    """履歴からメタデータの冪等キーが一致するメッセージを探し、その ts を返す（無ければ None）"""
+    request = dict(request)
+    while True:
+        result = delivery.call(method, **request)
+        for message in result.get("messages", []):
+            payload = (message.get("metadata") or {}).get("event_payload") or {}
+            if payload.get("idempotency_key") == idempotency_key:
+                return message["ts"]
+        request["cursor"] = (result.get("response_metadata") or {}).get("next_cursor")
+        if not request["cursor"]:
+            return None
@@ -0,0 +1,196 @@
+"""
+スレッド探索
+チャンネルごとに最新の親投稿（ボットの「最新のQiita記事まとめ」）を探し、
+そのスレッドで投稿済みの記事URLを集める。
+親投稿の ts とスレッドの既読位置をキャッシュし、次回は oldest でそれより新しいメッセージだけを読む
+"""
+import os
+import json
+import time
+import threading
+from typing import Any, Dict, List, Optional, Set
+
+from slack_sdk.errors import SlackApiError
+
+from ..utils.metrics import metrics
+
+# 親投稿の見出しの書き出し（SlackService._parent_text）
+PARENT_PREFIX = "📢 *最新のQiita記事まとめ"
+# 記事のブロックの block_id（"qiita-url:" + 記事URL）
+URL_BLOCK_PREFIX = "qiita-url:"
+# block_id が無い（以前の形式の）ブロックで URL の直前にある見出し
+_LEGACY_URL_LABEL = "*【URL】*\n"
+
+# 1ページあたりの取得件数と、キャッシュが無い場合に遡るページ数の上限
+PAGE_SIZE = 200
+MAX_HISTORY_PAGES = 10
+
+
+def extract_article_urls(message: Dict[str, Any]) -> List[str]:
+    """メッセージのブロックから記事URLを取り出す（代替テキストは見ない）"""
+    urls = []
+    for block in message.get("blocks") or []:
+        block_id = block.get("block_id") or ""
+        if block_id.startswith(URL_BLOCK_PREFIX):
+            urls.append(block_id[len(URL_BLOCK_PREFIX):])
+            continue
+        # block_id を付ける前に投稿した記事のブロック
+        text = block.get("text")
+        if isinstance(text, dict) and _LEGACY_URL_LABEL in text.get("text", ""):
+            url = text["text"].split(_LEGACY_URL_LABEL, 1)[1].split("\n", 1)[0].strip()
+            # Slack が <URL> や <URL|表示名> の形に置き換えている場合
+            url = url.strip("<>").split("|", 1)[0]
+            if url:
+                urls.append(url)
+    return urls
+
+
+def _is_parent(message: Dict[str, Any]) -> bool:
+    """ボットの親投稿（スレッドの返信ではない「最新のQiita記事まとめ」）かどうか"""
+    return (message.get("text", "").startswith(PARENT_PREFIX)
+            and message.get("thread_ts", message.get("ts")) == message.get("ts"))
+
+
+class ThreadDiscovery:
+    """チャンネルごとの最新の親投稿とスレッドの記事URLを、キャッシュしながら探す"""
+    
+    def __init__(self, path: Optional[str], lookback_days: float = 7):
+        """
+        Args:
+            path (str): キャッシュの保存先（None なら保存しない）
+            lookback_days (float): キャッシュが無い場合に履歴を遡る日数
+        """
+        self.path = path
+        self.lookback_days = lookback_days
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._threads = self._load()  # 通知先 → {"parent_ts", "latest_ts", "urls"}
+    
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        """保存済みのキャッシュを読み込む"""
+        if not self.path or not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Warning: スレッドのキャッシュを読み込めませんでした ({self.path}): {e}")
+            return {}
+    
+    def article_urls(self, key: str, channel_id: str, delivery: Any) -> Set[str]:
+        """
+        チャンネルの最新の親投稿のスレッドに投稿された記事URLを返す
+        
+        Args:
+            key (str): キャッシュのキー（通知先）
+            channel_id (str): チャンネルID
+            delivery (SlackDeliveryQueue): Slack API の呼び出しに使う送信キュー
+        """
+        with self._lock:
+            entry = self._threads.get(key)
+            entry = dict(entry, urls=list(entry["urls"])) if entry else None
+        try:
+            # キャッシュした親投稿より新しい親投稿があるか（無ければ遡れる範囲で最新のもの）を探す
+            oldest = entry["parent_ts"] if entry else f"{time.time() - self.lookback_days * 86400:.6f}"
+            parent = self._find_latest_parent(channel_id, delivery, oldest)
+            if parent is not None:
+                entry = {"parent_ts": parent["ts"], "latest_ts": parent["ts"], "urls": extract_article_urls(parent)}
+                metrics.increment("slack_thread_discovery_total", result="discovered")
+            elif entry is not None:
+                metrics.increment("slack_thread_discovery_total", result="cached")
+            else:
+                metrics.increment("slack_thread_discovery_total", result="not_found")
+                return set()
+            
+            # スレッドの既読位置より新しい返信だけを読む
+            replies = self._read_replies(channel_id, delivery, entry["parent_ts"], entry["latest_ts"])
+            for reply in replies:
+                entry["urls"].extend(extract_article_urls(reply))
+                if float(reply["ts"]) > float(entry["latest_ts"]):
+                    entry["latest_ts"] = reply["ts"]
+        except SlackApiError as e:
+            print(f"Error fetching latest parent message: {e.response['error']}")
+            return set(entry["urls"]) if entry else set()
+        
+        self._store(key, entry)
+        print(f"Found {len(entry['urls'])} existing article URLs in the latest thread of {key}")
+        return set(entry["urls"])
+    
+    def record(self, key: str, message: Dict[str, Any], ts: str, thread_ts: Optional[str]):
+        """送信したメッセージをキャッシュに反映する（新しい親投稿ならスレッドを切り替える）"""
+        with self._lock:
+            if thread_ts is None:
+                if not _is_parent(dict(message, ts=ts)):
+                    return
+                self._threads[key] = {"parent_ts": ts, "latest_ts": ts, "urls": extract_article_urls(message)}
+                self._dirty = True
+                return
+            entry = self._threads.get(key)
+            if entry is None or entry["parent_ts"] != thread_ts:
+                return
+            entry["urls"].extend(extract_article_urls(message))
+            if float(ts) > float(entry["latest_ts"]):
+                entry["latest_ts"] = ts
+            self._dirty = True
+    
+    def save(self):
+        """キャッシュをファイルに書き出す（変更が無ければ何もしない）"""
+        with self._lock:
+            if not self.path or not self._dirty:
+                return
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            # 書き込み途中で落ちても壊れないよう、一時ファイル経由で置き換える
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self._threads, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+            self._dirty = False
+    
+    def _store(self, key: str, entry: Dict[str, Any]):
+        with self._lock:
+            # 同じ URL が重ならないようにする（出現順は保つ）
+            entry["urls"] = list(dict.fromkeys(entry["urls"]))
+            if self._threads.get(key) != entry:
+                self._threads[key] = entry
+                self._dirty = True
+    
+    def _find_latest_parent(self, channel_id: str, delivery: Any, oldest: str) -> Optional[Dict[str, Any]]:
+        """oldest より新しいメッセージから最新の親投稿を探す（新しい順に読み、見つかった時点で止める）"""
+        cursor = None
+        for _ in range(MAX_HISTORY_PAGES):
+            kwargs = {"channel": channel_id, "limit": PAGE_SIZE, "oldest": oldest}
+            if cursor:
+                kwargs["cursor"] = cursor
+            result = delivery.call("conversations.history", **kwargs)
+            for message in result.get("messages", []):
+                if _is_parent(message):
+                    return message
+            cursor = _next_cursor(result)
+            if not cursor:
+                return None
+        return None
+    
+    def _read_replies(self, channel_id: str, delivery: Any, parent_ts: str, oldest: str) -> List[Dict[str, Any]]:
+        """スレッドの返信のうち oldest より新しいものを、カーソルで全ページ読む"""
+        replies = []
+        cursor = None
+        while True:
+            kwargs = {"channel": channel_id, "ts": parent_ts, "limit": PAGE_SIZE, "oldest": oldest}
+            if cursor:
+                kwargs["cursor"] = cursor
+            result = delivery.call("conversations.replies", **kwargs)
+            # 親投稿は oldest に関わらず先頭に含まれる
+            replies.extend(
+                message for message in result.get("messages", [])
+                if message.get("ts") != parent_ts and float(message.get("ts", 0)) > float(oldest)
+            )
+            cursor = _next_cursor(result)
+            if not cursor:
+                return replies
+
+
+def _next_cursor(result: Any) -> Optional[str]:
+    """次のページのカーソル（最後のページなら None）"""
+    return (result.get("response_metadata") or {}).get("next_cursor") or None
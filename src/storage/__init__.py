@@ -0,0 +1,27 @@
+# Storage package
+# sqlite3 などは使うストアのモジュールだけを必要になった時点で読み込む
+import importlib
+
+_EXPORTS = {
+    'WatermarkStore': '.watermark_store',
+    'ResponseCache': '.response_cache',
+    'PostedArticleIndex': '.posted_index',
+    'SeenFilter': '.seen_filter',
+    'NearDuplicateIndex': '.near_duplicate_index',
+    'RunJournal': '.run_journal'
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    """公開名に初めてアクセスしたときにモジュールを読み込む（PEP 562）"""
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,100 @@
+"""
+類似記事インデックス
+通知した記事の MinHash 署名を保持し、翻訳・転載・連載の続きなど本文がほぼ同じ記事を
+LSH で絞り込んで判定する
+"""
+import os
+import json
+import time
+import base64
+import threading
+from array import array
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..utils.minhash import LSHIndex, signature as minhash_signature
+
+
+class NearDuplicateIndex:
+    """通知済み記事の MinHash 署名を一定期間保持する LSH インデックス"""
+    
+    def __init__(self, path: str, threshold: float, retention_days: float):
+        self.path = path
+        self.threshold = threshold
+        self.retention_seconds = retention_days * 24 * 60 * 60
+        self._lock = threading.Lock()
+        self._index = LSHIndex(threshold)
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        for article_id, entry in self._load().items():
+            self._entries[article_id] = entry
+            self._index.add(article_id, entry["signature"])
+        self._evict_expired(time.time())
+    
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        """保存済みの署名を読み込む"""
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            entries = {}
+            for article_id, entry in data.items():
+                packed = array("I")
+                packed.frombytes(base64.b64decode(entry["signature"]))
+                entries[article_id] = {"added_at": entry["added_at"], "signature": packed.tolist()}
+            return entries
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Warning: 類似記事インデックスを読み込めませんでした ({self.path}): {e}")
+            return {}
+    
+    @staticmethod
+    def signature(title: str, description: str = "") -> List[int]:
+        """タイトルと本文の先頭から署名を作る"""
+        return minhash_signature(f"{title} {description}")
+    
+    def find(self, signature: List[int]) -> Optional[Tuple[str, float]]:
+        """
+        しきい値以上に似ている通知済みの記事を返す
+        
+        Returns:
+            tuple: (記事ID, 推定類似度)。該当が無ければ None
+        """
+        with self._lock:
+            return self._index.query(signature)
+    
+    def add(self, article_id: str, signature: List[int]):
+        """通知した記事の署名を記録する（保存は save で行う）"""
+        with self._lock:
+            self._entries[article_id] = {"added_at": time.time(), "signature": signature}
+            self._index.add(article_id, signature)
+    
+    def _evict_expired(self, now: float):
+        """保持期間を過ぎた署名を取り除く"""
+        expired = [article_id for article_id, entry in self._entries.items()
+                   if now - entry["added_at"] > self.retention_seconds]
+        for article_id in expired:
+            del self._entries[article_id]
+            self._index.remove(article_id)
+    
+    def save(self):
+        """署名をファイルに書き出す（署名は 32bit 整数の配列を base64 で保存する）"""
+        with self._lock:
+            self._evict_expired(time.time())
+            data = {
+                article_id: {
+                    "added_at": entry["added_at"],
+                    "signature": base64.b64encode(array("I", entry["signature"]).tobytes()).decode("ascii")
+                }
+                for article_id, entry in self._entries.items()
+            }
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            # 書き込み途中で落ちても壊れないよう、一時ファイル経由で置き換える
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.path)
+    
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
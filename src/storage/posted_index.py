@@ -0,0 +1,97 @@
+"""
+投稿済み記事インデックス
+チャンネルごとに投稿した記事を SQLite に記録し、重複判定をローカルで行う
+"""
+import os
+import time
+import sqlite3
+import threading
+from typing import Optional
+
+
+class PostedArticleIndex:
+    """チャンネルごとの投稿済み記事（URL）を保持する SQLite インデックス"""
+    
+    def __init__(self, path: str, retention_days: float):
+        self.path = path
+        self.retention_seconds = retention_days * 24 * 60 * 60
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._create_tables()
+    
+    def _create_tables(self):
+        """テーブルとインデックスを作成する"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS posted_articles ("
+                " channel_id TEXT NOT NULL,"
+                " url TEXT NOT NULL,"
+                " article_id TEXT,"
+                " posted_at REAL NOT NULL,"
+                " PRIMARY KEY (channel_id, url)"
+                ")"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_posted_articles_posted_at"
+                " ON posted_articles (posted_at)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS backfilled_channels ("
+                " channel_id TEXT PRIMARY KEY,"
+                " backfilled_at REAL NOT NULL"
+                ")"
+            )
+    
+    def contains(self, channel_id: str, url: str) -> bool:
+        """チャンネルに投稿済みかどうかを返す"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM posted_articles WHERE channel_id = ? AND url = ?",
+                (channel_id, url)
+            ).fetchone()
+        return row is not None
+    
+    def record(self, channel_id: str, url: str, article_id: Optional[str] = None,
+               posted_at: Optional[float] = None):
+        """投稿した記事を記録する"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO posted_articles (channel_id, url, article_id, posted_at)"
+                " VALUES (?, ?, ?, ?)",
+                (channel_id, url, article_id, posted_at or time.time())
+            )
+    
+    def is_backfilled(self, channel_id: str) -> bool:
+        """Slack 履歴からの取り込みが済んでいるかどうかを返す"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM backfilled_channels WHERE channel_id = ?",
+                (channel_id,)
+            ).fetchone()
+        return row is not None
+    
+    def mark_backfilled(self, channel_id: str):
+        """Slack 履歴からの取り込み済みとして記録する"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO backfilled_channels (channel_id, backfilled_at) VALUES (?, ?)",
+                (channel_id, time.time())
+            )
+    
+    def evict_expired(self) -> int:
+        """保持期間を過ぎた記録を削除し、削除件数を返す"""
+        cutoff = time.time() - self.retention_seconds
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "DELETE FROM posted_articles WHERE posted_at < ?",
+                (cutoff,)
+            )
+        return cursor.rowcount
+    
+    def close(self):
+        """接続を閉じる"""
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,159 @@
+"""
+HTTPレスポンスキャッシュモジュール
+APIレスポンスを圧縮してディスクに保存し、ETag/TTLで再利用する
+"""
+import os
+import json
+import time
+import zlib
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+from urllib.parse import urlencode, urlsplit, urlunsplit
+
+
+class ResponseCache:
+    """URLとパラメータをキーにしたディスクキャッシュ（総バイト数によるLRU削除付き）"""
+    
+    INDEX_FILE = "index.json"
+    
+    def __init__(self, directory: str, ttl_seconds: float, max_bytes: int):
+        self.directory = directory
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # キー -> {"etag", "stored_at", "size"}（先頭ほど古いアクセス）
+        self._entries = self._load_index()
+        self._total_bytes = sum(entry["size"] for entry in self._entries.values())
+        self._stats = {"hits": 0, "revalidated": 0, "misses": 0, "evictions": 0}
+    
+    def _load_index(self) -> "OrderedDict[str, Dict[str, Any]]":
+        """インデックスを読み込む（本体ファイルが無いエントリは捨てる）"""
+        path = os.path.join(self.directory, self.INDEX_FILE)
+        if not os.path.exists(path):
+            return OrderedDict()
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entries = json.load(f, object_pairs_hook=OrderedDict)
+        except (OSError, ValueError) as e:
+            print(f"Warning: レスポンスキャッシュのインデックスを読み込めませんでした: {e}")
+            return OrderedDict()
+        return OrderedDict(
+            (key, entry) for key, entry in entries.items()
+            if os.path.exists(self._body_path(key))
+        )
+    
+    @staticmethod
+    def make_key(url: str, params: Optional[Dict[str, Any]] = None) -> str:
+        """URLとパラメータを正規化してキャッシュキーを作る"""
+        parts = urlsplit(url)
+        normalized_url = urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path, "", ""))
+        query = urlencode(sorted((str(k), str(v)) for k, v in (params or {}).items()))
+        return hashlib.sha256(f"{normalized_url}?{query}".encode("utf-8")).hexdigest()
+    
+    def _body_path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.z")
+    
+    def lookup(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        キャッシュエントリを返す
+        
+        Returns:
+            dict: {"etag": ETag または None, "fresh": TTL内かどうか}。未保存なら None
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            return {
+                "etag": entry.get("etag"),
+                "fresh": time.time() - entry["stored_at"] < self.ttl_seconds
+            }
+    
+    def get(self, key: str, revalidated: bool = False) -> Optional[bytes]:
+        """
+        保存済みの本体を返し、ヒットとして記録する
+        
+        Args:
+            key (str): キャッシュキー
+            revalidated (bool): 条件付きリクエスト（304）で再検証した場合は True
+        """
+        try:
+            with open(self._body_path(key), "rb") as f:
+                body = zlib.decompress(f.read())
+        except (OSError, zlib.error):
+            self._forget(key)
+            return None
+        
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                if revalidated:
+                    # 304 で鮮度が確認できたため TTL を延長する
+                    self._entries[key]["stored_at"] = time.time()
+            self._stats["revalidated" if revalidated else "hits"] += 1
+        return body
+    
+    def put(self, key: str, body: bytes, etag: Optional[str] = None):
+        """本体を圧縮して保存し、ミスとして記録する"""
+        compressed = zlib.compress(body)
+        with self._lock:
+            self._stats["misses"] += 1
+            if len(compressed) > self.max_bytes:
+                return
+            os.makedirs(self.directory, exist_ok=True)
+            with open(self._body_path(key), "wb") as f:
+                f.write(compressed)
+            
+            previous = self._entries.pop(key, None)
+            if previous:
+                self._total_bytes -= previous["size"]
+            self._entries[key] = {"etag": etag, "stored_at": time.time(), "size": len(compressed)}
+            self._total_bytes += len(compressed)
+            self._evict()
+    
+    def record_miss(self):
+        """保存対象外のレスポンスをミスとして記録する"""
+        with self._lock:
+            self._stats["misses"] += 1
+    
+    def _evict(self):
+        """総バイト数が上限を超えている間、最も古いエントリから削除する"""
+        while self._total_bytes > self.max_bytes and self._entries:
+            key, entry = self._entries.popitem(last=False)
+            self._total_bytes -= entry["size"]
+            self._stats["evictions"] += 1
+            try:
+                os.remove(self._body_path(key))
+            except OSError:
+                pass
+    
+    def _forget(self, key: str):
+        """壊れたエントリを取り除く"""
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry:
+                self._total_bytes -= entry["size"]
+    
+    def save(self):
+        """インデックスをファイルに書き出す"""
+        with self._lock:
+            os.makedirs(self.directory, exist_ok=True)
+            path = os.path.join(self.directory, self.INDEX_FILE)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self._entries, f)
+            os.replace(tmp_path, path)
+    
+    def stats(self) -> Dict[str, Any]:
+        """ヒット/ミスなどの統計を返す"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = len(self._entries)
+            stats["bytes"] = self._total_bytes
+        requests_total = stats["hits"] + stats["revalidated"] + stats["misses"]
+        stats["hit_rate"] = (
+            (stats["hits"] + stats["revalidated"]) / requests_total if requests_total else 0.0
+        )
+        return stats
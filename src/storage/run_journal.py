@@ -0,0 +1,168 @@
+"""
+実行ジャーナル
+1回の実行の途中経過（取得結果、通知する記事の選択、送信したメッセージの ts）を
+段階ごとに追記し、プロセスが途中で落ちた場合に次の実行で続きから再開できるようにする
+"""
+import os
+import json
+import time
+import uuid
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from ..models import Article
+
+# これより前に始まった実行のジャーナルは再開せずに破棄する（古い記事を今さら通知しないため）
+DEFAULT_MAX_RESUME_AGE = timedelta(hours=36)
+
+
+class RunJournal:
+    """
+    実行の段階ごとのチェックポイントを JSON Lines で追記するジャーナル
+    
+    ファイルは実行の開始時に作成し、実行が最後まで終わったら complete で削除する。
+    開始時にファイルが残っていれば前回の実行が中断したものとして、その記録を引き継ぐ
+    """
+    
+    def __init__(self, path: str, max_resume_age: timedelta = DEFAULT_MAX_RESUME_AGE):
+        """
+        Args:
+            path (str): ジャーナルの保存先
+            max_resume_age (timedelta): 再開する実行の古さの上限（次の実行までの間隔より長くする）
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._stages: Dict[str, Dict[str, Any]] = {}
+        self._posted: Dict[str, Dict[str, Dict[str, Any]]] = {}  # 通知先 → 冪等キー → {"ts", "urls"}
+        self._sending: Dict[str, Dict[str, float]] = {}  # 通知先 → 送信を始めた冪等キー → 時刻
+        
+        entries = self._load()
+        begin = entries[0] if entries and entries[0].get("stage") == "begin" else None
+        if begin is not None and datetime.now() - datetime.fromisoformat(begin["started_at"]) <= max_resume_age:
+            self.run_id = begin["run_id"]
+            self.resumed = True
+            for entry in entries[1:]:
+                self._apply(entry)
+            print(f"♻️ 中断した実行 {self.run_id} のジャーナルから再開します（{begin['started_at']} 開始）")
+        else:
+            if entries:
+                print(f"Warning: 古い実行ジャーナルを破棄します ({self.path})")
+            self.run_id = uuid.uuid4().hex[:12]
+            self.resumed = False
+        
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # 書き込み途中の行が残っていても続きを追記できるよう、読めた記録だけで書き直す
+        self._file = open(self.path, "w", encoding="utf-8")
+        if self.resumed:
+            self._file.writelines(json.dumps(entry, ensure_ascii=False) + "\n" for entry in entries)
+            self._file.flush()
+        else:
+            self._append({"stage": "begin", "run_id": self.run_id, "started_at": datetime.now().isoformat()})
+    
+    def _load(self) -> List[Dict[str, Any]]:
+        """ジャーナルの記録を読み込む（書き込み途中で落ちた最後の行は読み飛ばす）"""
+        if not os.path.exists(self.path):
+            return []
+        entries = []
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entries.append(json.loads(line))
+                    except ValueError:
+                        break
+        except OSError as e:
+            print(f"Warning: 実行ジャーナルを読み込めませんでした ({self.path}): {e}")
+            return []
+        return entries
+    
+    def _apply(self, entry: Dict[str, Any]):
+        if entry.get("stage") == "sending":
+            self._sending.setdefault(entry["destination"], {})[entry["key"]] = entry["at"]
+        elif entry.get("stage") == "posted":
+            self._posted.setdefault(entry["destination"], {})[entry["key"]] = entry
+            self._sending.get(entry["destination"], {}).pop(entry["key"], None)
+        else:
+            self._stages[entry["stage"]] = entry
+    
+    def _append(self, entry: Dict[str, Any]):
+        """1行追記する（プロセスが落ちても残るよう、記録ごとに書き出す）"""
+        with self._lock:
+            self._apply(entry)
+            self._file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            self._file.flush()
+    
+    def checkpoint_fetched(self, articles_by_tag: Dict[str, List[Article]], watermarks: Dict[str, Article]):
+        """取得した記事と、保存待ちのウォーターマーク（タグごとの最新記事）を記録する"""
+        self._append({
+            "stage": "fetched",
+            "articles": _dump_articles(articles_by_tag),
+            "watermarks": {tag: article.to_dict() for tag, article in watermarks.items()}
+        })
+    
+    def fetched(self) -> Optional[Dict[str, List[Article]]]:
+        """記録済みの取得結果（無ければ None）"""
+        entry = self._stages.get("fetched")
+        return _load_articles(entry["articles"]) if entry else None
+    
+    def watermarks(self) -> Dict[str, Article]:
+        """記録済みの保存待ちのウォーターマーク"""
+        entry = self._stages.get("fetched")
+        if not entry:
+            return {}
+        return {tag: Article.from_dict(data) for tag, data in entry["watermarks"].items()}
+    
+    def checkpoint_selected(self, articles_by_tag: Dict[str, List[Article]]):
+        """通知する記事の選択結果を記録する"""
+        self._append({"stage": "selected", "articles": _dump_articles(articles_by_tag)})
+    
+    def selected(self) -> Optional[Dict[str, List[Article]]]:
+        """記録済みの選択結果（無ければ None）"""
+        entry = self._stages.get("selected")
+        return _load_articles(entry["articles"]) if entry else None
+    
+    def record_sending(self, destination: str, key: str):
+        """メッセージを送る直前に記録する（送信中に落ちた場合、送れたかどうかを Slack に確かめる目印）"""
+        self._append({"stage": "sending", "destination": destination, "key": key, "at": time.time()})
+    
+    def record_posted(self, destination: str, key: str, ts: str, urls: Iterable[str] = ()):
+        """送信したメッセージを冪等キーで記録する"""
+        self._append({"stage": "posted", "destination": destination, "key": key, "ts": ts, "urls": list(urls)})
+    
+    def posted(self, destination: str) -> Dict[str, str]:
+        """通知先に送信済みのメッセージ（冪等キー → ts）"""
+        with self._lock:
+            return {key: entry["ts"] for key, entry in self._posted.get(destination, {}).items()}
+    
+    def uncertain(self, destination: str) -> Dict[str, float]:
+        """送信を始めたが送信済みの記録が無いメッセージ（冪等キー → 送信を始めた時刻）"""
+        with self._lock:
+            return dict(self._sending.get(destination, {}))
+    
+    def posted_urls(self, destination: str) -> Set[str]:
+        """この実行で通知先に送信済みの記事URL"""
+        with self._lock:
+            return {url for entry in self._posted.get(destination, {}).values() for url in entry["urls"]}
+    
+    def complete(self):
+        """実行が最後まで終わったのでジャーナルを削除する"""
+        with self._lock:
+            self._file.close()
+            if os.path.exists(self.path):
+                os.remove(self.path)
+    
+    def close(self):
+        """ジャーナルを残したまま閉じる（次の実行で再開する）"""
+        with self._lock:
+            self._file.close()
+
+
+def _dump_articles(articles_by_tag: Dict[str, List[Article]]) -> Dict[str, List[Dict[str, Any]]]:
+    return {tag: [article.to_dict() for article in articles] for tag, articles in articles_by_tag.items()}
+
+
+def _load_articles(data: Dict[str, List[Dict[str, Any]]]) -> Dict[str, List[Article]]:
+    return {tag: [Article.from_dict(item) for item in items] for tag, items in data.items()}
@@ -0,0 +1,160 @@
+"""
+通知済み記事フィルタ
+通知した記事IDを世代ごとのブルームフィルタに記録し、長期間（数か月）の重複判定を
+一定のメモリと O(1) の判定で行う。古い世代から順に捨てることで期間を区切る
+"""
+import os
+import json
+import math
+import time
+import struct
+import hashlib
+import threading
+from typing import Any, Dict, List, Optional
+
+# ファイル形式: マジック + ヘッダ（JSON）の長さ + ヘッダ + 世代ごとのビット列
+_MAGIC = b"QSF1"
+_HEADER_LENGTH = struct.Struct(">I")
+
+
+class _Generation:
+    """1世代分のブルームフィルタ"""
+    
+    __slots__ = ("started_at", "count", "size", "hashes", "bits")
+    
+    def __init__(self, started_at: float, size: int, hashes: int, count: int = 0,
+                 bits: Optional[bytearray] = None):
+        self.started_at = started_at
+        self.count = count
+        self.size = size  # ビット数
+        self.hashes = hashes
+        self.bits = bits if bits is not None else bytearray((size + 7) // 8)
+    
+    def _positions(self, h1: int, h2: int):
+        # 2つのハッシュ値から hashes 個の位置を作る（Kirsch-Mitzenmacher の方法）
+        return ((h1 + i * h2) % self.size for i in range(self.hashes))
+    
+    def add(self, h1: int, h2: int):
+        bits = self.bits
+        for position in self._positions(h1, h2):
+            bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+    
+    def contains(self, h1: int, h2: int) -> bool:
+        bits = self.bits
+        return all(bits[position >> 3] & (1 << (position & 7)) for position in self._positions(h1, h2))
+
+
+class SeenFilter:
+    """
+    通知済みの記事IDを保持する世代別のブルームフィルタ
+    
+    window_days の期間を generations 個の世代に分け、新しい世代に追加し、全世代で判定する。
+    誤って「通知済み」と判定する確率は1世代あたり error_rate 程度（未通知を通知済みと誤ることはあっても、
+    通知済みを見逃すことはない）
+    """
+    
+    def __init__(self, path: str, window_days: float = 180, generations: int = 6,
+                 capacity: int = 20000, error_rate: float = 0.001):
+        if generations < 1:
+            raise ValueError("seen_filter_generations must be at least 1")
+        if capacity < 1:
+            raise ValueError("seen_filter_capacity must be at least 1")
+        if not 0 < error_rate < 1:
+            raise ValueError("seen_filter_error_rate must be between 0 and 1")
+        self.path = path
+        self.max_generations = generations
+        self.generation_seconds = window_days * 24 * 60 * 60 / generations
+        self.capacity = capacity
+        # 1世代あたりのビット数とハッシュ数（容量 capacity で誤判定率が error_rate になる値）
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self._lock = threading.Lock()
+        self._generations = self._load()
+    
+    def _load(self) -> List[_Generation]:
+        """保存済みの世代を読み込む（世代ごとのビット数・ハッシュ数は保存時のものを使う）"""
+        if not os.path.exists(self.path):
+            return []
+        try:
+            with open(self.path, "rb") as f:
+                if f.read(len(_MAGIC)) != _MAGIC:
+                    raise ValueError("unknown file format")
+                header_length, = _HEADER_LENGTH.unpack(f.read(_HEADER_LENGTH.size))
+                header = json.loads(f.read(header_length).decode("utf-8"))
+                generations = []
+                for meta in header["generations"]:
+                    bits = bytearray(f.read((meta["size"] + 7) // 8))
+                    if len(bits) != (meta["size"] + 7) // 8:
+                        raise ValueError("truncated file")
+                    generations.append(_Generation(meta["started_at"], meta["size"], meta["hashes"],
+                                                   meta["count"], bits))
+                return generations
+        except (OSError, ValueError, KeyError, struct.error) as e:
+            print(f"Warning: 通知済み記事フィルタを読み込めませんでした ({self.path}): {e}")
+            return []
+    
+    @staticmethod
+    def _hash(key: str):
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        # h2 は奇数にして、位置が同じ値に偏らないようにする
+        return int.from_bytes(digest[:8], "big"), int.from_bytes(digest[8:], "big") | 1
+    
+    def _rotate(self, now: float):
+        """期間を過ぎた世代を捨て、最新の世代が古いか満杯なら新しい世代を始める"""
+        expire_before = now - self.generation_seconds * self.max_generations
+        self._generations = [g for g in self._generations if g.started_at > expire_before]
+        latest = self._generations[-1] if self._generations else None
+        if (latest is None or now - latest.started_at >= self.generation_seconds
+                or latest.count >= self.capacity):
+            self._generations.append(_Generation(now, self.size, self.hashes))
+        del self._generations[:-self.max_generations]
+    
+    def contains(self, key: str) -> bool:
+        """通知済みとして記録されているか（誤って True を返すことがある）"""
+        h1, h2 = self._hash(key)
+        with self._lock:
+            return any(generation.contains(h1, h2) for generation in self._generations)
+    
+    __contains__ = contains
+    
+    def add(self, key: str):
+        """通知済みとして記録する（保存は save で行う）"""
+        h1, h2 = self._hash(key)
+        with self._lock:
+            self._rotate(time.time())
+            latest = self._generations[-1]
+            if not latest.contains(h1, h2):
+                latest.add(h1, h2)
+    
+    def save(self):
+        """フィルタをファイルに書き出す"""
+        with self._lock:
+            self._rotate(time.time())
+            header = json.dumps({
+                "generations": [
+                    {"started_at": g.started_at, "count": g.count, "size": g.size, "hashes": g.hashes}
+                    for g in self._generations
+                ]
+            }).encode("utf-8")
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            # 書き込み途中で落ちても壊れないよう、一時ファイル経由で置き換える
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(_MAGIC)
+                f.write(_HEADER_LENGTH.pack(len(header)))
+                f.write(header)
+                for generation in self._generations:
+                    f.write(generation.bits)
+            os.replace(tmp_path, self.path)
+    
+    def stats(self) -> Dict[str, Any]:
+        """世代数・記録数・メモリ使用量（バイト）を返す"""
+        with self._lock:
+            return {
+                "generations": len(self._generations),
+                "count": sum(g.count for g in self._generations),
+                "bytes": sum(len(g.bits) for g in self._generations)
+            }
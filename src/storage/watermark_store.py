@@ -0,0 +1,50 @@
+"""
+ハイウォーターマーク保存モジュール
+タグごとに処理済みの最新記事（created_at と id）をローカルに保存する
+"""
+import os
+import json
+import threading
+from typing import Dict, Any, Optional
+
+
+class WatermarkStore:
+    """タグごとの処理済み位置を JSON ファイルに保存するストア"""
+    
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._watermarks = self._load()
+    
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        """保存済みのウォーターマークを読み込む"""
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Warning: ウォーターマークを読み込めませんでした ({self.path}): {e}")
+            return {}
+    
+    def get(self, tag: str) -> Optional[Dict[str, Any]]:
+        """タグのウォーターマーク（created_at と id）を返す"""
+        with self._lock:
+            return self._watermarks.get(tag)
+    
+    def update(self, tag: str, created_at: str, article_id: str):
+        """タグのウォーターマークを更新する（保存は save で行う）"""
+        with self._lock:
+            self._watermarks[tag] = {"created_at": created_at, "id": article_id}
+    
+    def save(self):
+        """ウォーターマークをファイルに書き出す"""
+        with self._lock:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            # 書き込み途中で落ちても壊れないよう、一時ファイル経由で置き換える
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self._watermarks, f, ensure_ascii=False, indent=4)
+            os.replace(tmp_path, self.path)
@@ -0,0 +1,41 @@
+"""
+締め切り
+1回の実行全体の持ち時間を表し、残り時間から各リクエストのタイムアウトを決める
+"""
+import math
+import time
+from typing import Optional
+
+
+class Deadline:
+    """実行の締め切り（seconds が None または 0 以下なら無期限）"""
+    
+    def __init__(self, seconds: Optional[float] = None):
+        self._expires_at = time.monotonic() + seconds if seconds and seconds > 0 else math.inf
+    
+    @classmethod
+    def _at(cls, expires_at: float) -> "Deadline":
+        deadline = cls()
+        deadline._expires_at = expires_at
+        return deadline
+    
+    @property
+    def unlimited(self) -> bool:
+        return self._expires_at == math.inf
+    
+    def remaining(self) -> float:
+        """残り秒数（無期限なら inf、過ぎていれば 0）"""
+        return max(0.0, self._expires_at - time.monotonic())
+    
+    def expired(self) -> bool:
+        return time.monotonic() >= self._expires_at
+    
+    def timeout(self, limit: float) -> float:
+        """1回のリクエストのタイムアウト（limit 秒と残り時間の短い方）"""
+        return min(limit, self.remaining())
+    
+    def portion(self, ratio: float) -> "Deadline":
+        """残り時間のうち ratio の割合で締め切る（この締め切りを越えない）子の締め切り"""
+        if self.unlimited:
+            return self
+        return Deadline._at(time.monotonic() + self.remaining() * ratio)
@@ -3,6 +3,7 @@
 LaTeX数式のSlack表示用フォーマットなど
 """
 import re
+from typing import Dict, Iterable, List
 
 
 def format_latex_for_slack(text: str) -> str:
@@ -11,13 +12,17 @@ def format_latex_for_slack(text: str) -> str:
     
     Args:
         text (str): LaTeX形式の数式を含むテキスト
-        
+    
     Returns:
         str: スラック表示用に変換されたテキスト
     """
     if not text:
         return ""
     
+    # 変換対象の記号を含まないテキストはそのまま返す
+    if not _has_latex_markers(text):
+        return text
+    
     # 1. 分数とルートの処理（最初に処理）
     text = _convert_fractions_and_roots(text)
     
@@ -39,32 +44,120 @@ def format_latex_for_slack(text: str) -> str:
     return text
 
 
+def format_latex_batch(texts: Iterable[str]) -> List[str]:
+    """
+    複数のテキストをまとめて変換する（同一テキストは1度だけ変換する）
+    
+    Args:
+        texts (Iterable[str]): LaTeX形式の数式を含むテキストの一覧
+    
+    Returns:
+        list: 入力と同じ順序の変換結果
+    """
+    converted: Dict[str, str] = {}
+    results = []
+    for text in texts:
+        if text not in converted:
+            converted[text] = format_latex_for_slack(text)
+        results.append(converted[text])
+    return results
+
+
+def _has_latex_markers(text: str) -> bool:
+    """変換のきっかけになる記号（\\, _, ^, $）を含むかどうか"""
+    return '\\' in text or '_' in text or '^' in text or '$' in text
+
+
+# 分数・ルート
+_FRAC_PATTERN = re.compile(r'\\frac\{([^}]+)\}\{([^}]+)\}')
+_SQRT_PATTERN = re.compile(r'\\sqrt\{([^}]+)\}')
+_NTH_ROOT_PATTERN = re.compile(r'\\sqrt\[([^\]]+)\]\{([^}]+)\}')
+
+
 def _convert_fractions_and_roots(text: str) -> str:
     """分数とルートを変換する"""
+    if '\\' not in text:
+        return text
+    
     # \frac{a}{b} → a/b
-    text = re.sub(r'\\frac\{([^}]+)\}\{([^}]+)\}', r'\1/\2', text)
+    text = _FRAC_PATTERN.sub(r'\1/\2', text)
     
     # \sqrt{x} → √x
-    text = re.sub(r'\\sqrt\{([^}]+)\}', r'√\1', text)
+    text = _SQRT_PATTERN.sub(r'√\1', text)
     
     # \sqrt[n]{x} → ⁿ√x
-    text = re.sub(r'\\sqrt\[([^\]]+)\]\{([^}]+)\}', r'\1√\2', text)
+    text = _NTH_ROOT_PATTERN.sub(r'\1√\2', text)
     
     return text
 
 
+# 下付き・上付き文字
+_SUBSCRIPT_PATTERN = re.compile(r'(\w+)_\{([^}]+)\}')
+_MATH_SUBSCRIPT_PATTERN = re.compile(r'\$(\w+)_\{([^}]+)\}\$')
+_SUPERSCRIPT_DIGITS_PATTERN = re.compile(r'(\w+)\^(\d+)')
+_MATH_SUPERSCRIPT_DIGITS_PATTERN = re.compile(r'\$(\w+)\^(\d+)\$')
+_SUPERSCRIPT_BRACED_PATTERN = re.compile(r'(\w+)\^\{([^}]+)\}')
+
+_SUBSCRIPT_DIGITS = {
+    '0': '₀', '1': '₁', '2': '₂', '3': '₃', '4': '₄',
+    '5': '₅', '6': '₆', '7': '₇', '8': '₈', '9': '₉'
+}
+
+_SUPERSCRIPT_DIGITS = {
+    '0': '⁰', '1': '¹', '2': '²', '3': '³', '4': '⁴',
+    '5': '⁵', '6': '⁶', '7': '⁷', '8': '⁸', '9': '⁹'
+}
+
+_SUBSCRIPT_LETTERS = {
+    'a': 'ₐ', 'b': 'ᵦ', 'c': 'ᵧ', 'd': 'ᵨ', 'e': 'ₑ', 'f': 'ᵩ', 'g': 'ᵪ',
+    'h': 'ₕ', 'i': 'ᵢ', 'j': 'ⱼ', 'k': 'ₖ', 'l': 'ₗ', 'm': 'ₘ', 'n': 'ₙ',
+    'o': 'ₒ', 'p': 'ₚ', 'q': 'ᵠ', 'r': 'ᵣ', 's': 'ₛ', 't': 'ₜ', 'u': 'ᵤ',
+    'v': 'ᵥ', 'w': 'ᵦ', 'x': 'ₓ', 'y': 'ᵧ', 'z': 'ᵨ',
+    'A': 'ₐ', 'B': 'ᵦ', 'C': 'ᵧ', 'D': 'ᵨ', 'E': 'ₑ', 'F': 'ᵩ', 'G': 'ᵪ',
+    'H': 'ₕ', 'I': 'ᵢ', 'J': 'ⱼ', 'K': 'ₖ', 'L': 'ₗ', 'M': 'ₘ', 'N': 'ₙ',
+    'O': 'ₒ', 'P': 'ₚ', 'Q': 'ᵠ', 'R': 'ᵣ', 'S': 'ₛ', 'T': 'ₜ', 'U': 'ᵤ',
+    'V': 'ᵥ', 'W': 'ᵦ', 'X': 'ₓ', 'Y': 'ᵧ', 'Z': 'ᵨ'
+}
+
+_SUPERSCRIPT_LETTERS = {
+    'a': 'ᵃ', 'b': 'ᵇ', 'c': 'ᶜ', 'd': 'ᵈ', 'e': 'ᵉ', 'f': 'ᶠ', 'g': 'ᵍ',
+    'h': 'ʰ', 'i': 'ⁱ', 'j': 'ʲ', 'k': 'ᵏ', 'l': 'ˡ', 'm': 'ᵐ', 'n': 'ⁿ',
+    'o': 'ᵒ', 'p': 'ᵖ', 'q': 'ᵠ', 'r': 'ʳ', 's': 'ˢ', 't': 'ᵗ', 'u': 'ᵘ',
+    'v': 'ᵛ', 'w': 'ʷ', 'x': 'ˣ', 'y': 'ʸ', 'z': 'ᶻ',
+    'A': 'ᴬ', 'B': 'ᴮ', 'C': 'ᶜ', 'D': 'ᴰ', 'E': 'ᴱ', 'F': 'ᶠ', 'G': 'ᴳ',
+    'H': 'ᴴ', 'I': 'ᴵ', 'J': 'ᴶ', 'K': 'ᴷ', 'L': 'ᴸ', 'M': 'ᴹ', 'N': 'ᴺ',
+    'O': 'ᴼ', 'P': 'ᴾ', 'Q': 'ᵠ', 'R': 'ᴿ', 'S': 'ˢ', 'T': 'ᵀ', 'U': 'ᵁ',
+    'V': 'ⱽ', 'W': 'ᵂ', 'X': 'ˣ', 'Y': 'ʸ', 'Z': 'ᶻ'
+}
+
+# str.translate 用の変換テーブル（対応の無い文字はそのまま残る）
+_SUBSCRIPT_DIGIT_TABLE = str.maketrans(_SUBSCRIPT_DIGITS)
+_SUPERSCRIPT_DIGIT_TABLE = str.maketrans(_SUPERSCRIPT_DIGITS)
+_SUBSCRIPT_TABLE = str.maketrans({
+    **_SUBSCRIPT_DIGITS,
+    **_SUBSCRIPT_LETTERS,
+    '=': '₌'
+})
+_SUPERSCRIPT_TABLE = str.maketrans({
+    **_SUPERSCRIPT_DIGITS,
+    **_SUPERSCRIPT_LETTERS,
+    '+': '⁺', '-': '⁻', '(': '⁽', ')': '⁾', '×': 'ˣ'
+})
+
+
 def _convert_subscripts(text: str) -> str:
     """下付き文字を変換する"""
+    if '_' not in text:
+        return text
+    
     # H_{2} → H₂ のパターン（アンダースコアの後に中括弧がある場合）
-    text = re.sub(
-        r'(\w+)_\{([^}]+)\}', 
+    text = _SUBSCRIPT_PATTERN.sub(
         lambda m: m.group(1) + _convert_subscript_content(m.group(2)), 
         text
     )
     
     # 数式環境内の下付き文字も処理
-    text = re.sub(
-        r'\$(\w+)_\{([^}]+)\}\$', 
+    text = _MATH_SUBSCRIPT_PATTERN.sub(
         lambda m: m.group(1) + _convert_subscript_content(m.group(2)), 
         text
     )
@@ -73,61 +166,34 @@ def _convert_subscripts(text: str) -> str:
 
 
 def _convert_subscript_content(content: str) -> str:
-    """下付き文字の内容を変換する"""
-    result = ""
-    i = 0
-    while i < len(content):
-        char = content[i]
-        if char.isdigit():
-            # 数字の場合は下付き文字に変換
-            result += _get_subscript(char)
-        elif char.isalpha():
-            # 文字の場合は下付き文字に変換
-            result += _get_subscript_letter(char)
-        elif char == '=':
-            # 等号の場合は下付き等号に変換
-            result += '₌'
-        else:
-            # その他の文字（カンマ、ハイフンなど）はそのまま
-            result += char
-        i += 1
-    return result
+    """下付き文字の内容を変換する（数字・英字・等号のみ変換し、その他はそのまま）"""
+    return content.translate(_SUBSCRIPT_TABLE)
 
 
 def _get_subscript_letter(letter: str) -> str:
     """文字を下付き文字に変換する"""
-    subscript_letters = {
-        'a': 'ₐ', 'b': 'ᵦ', 'c': 'ᵧ', 'd': 'ᵨ', 'e': 'ₑ', 'f': 'ᵩ', 'g': 'ᵪ',
-        'h': 'ₕ', 'i': 'ᵢ', 'j': 'ⱼ', 'k': 'ₖ', 'l': 'ₗ', 'm': 'ₘ', 'n': 'ₙ',
-        'o': 'ₒ', 'p': 'ₚ', 'q': 'ᵠ', 'r': 'ᵣ', 's': 'ₛ', 't': 'ₜ', 'u': 'ᵤ',
-        'v': 'ᵥ', 'w': 'ᵦ', 'x': 'ₓ', 'y': 'ᵧ', 'z': 'ᵨ',
-        'A': 'ₐ', 'B': 'ᵦ', 'C': 'ᵧ', 'D': 'ᵨ', 'E': 'ₑ', 'F': 'ᵩ', 'G': 'ᵪ',
-        'H': 'ₕ', 'I': 'ᵢ', 'J': 'ⱼ', 'K': 'ₖ', 'L': 'ₗ', 'M': 'ₘ', 'N': 'ₙ',
-        'O': 'ₒ', 'P': 'ₚ', 'Q': 'ᵠ', 'R': 'ᵣ', 'S': 'ₛ', 'T': 'ₜ', 'U': 'ᵤ',
-        'V': 'ᵥ', 'W': 'ᵦ', 'X': 'ₓ', 'Y': 'ᵧ', 'Z': 'ᵨ'
-    }
-    return subscript_letters.get(letter, letter)
+    return _SUBSCRIPT_LETTERS.get(letter, letter)
 
 
 def _convert_superscripts(text: str) -> str:
     """上付き文字を変換する"""
+    if '^' not in text:
+        return text
+    
     # H^3 → H³ のパターン（数字のみ）
-    text = re.sub(
-        r'(\w+)\^(\d+)', 
+    text = _SUPERSCRIPT_DIGITS_PATTERN.sub(
         lambda m: m.group(1) + _convert_superscript_content(m.group(2)), 
         text
     )
     
     # 数式環境内の上付き文字も処理
-    text = re.sub(
-        r'\$(\w+)\^(\d+)\$', 
+    text = _MATH_SUPERSCRIPT_DIGITS_PATTERN.sub(
         lambda m: m.group(1) + _convert_superscript_content(m.group(2)), 
         text
     )
     
     # 複雑な上付き文字（中括弧で囲まれた場合）
-    text = re.sub(
-        r'(\w+)\^\{([^}]+)\}', 
+    text = _SUPERSCRIPT_BRACED_PATTERN.sub(
         lambda m: m.group(1) + _convert_superscript_content_smart(m.group(2)), 
         text
     )
@@ -152,86 +218,54 @@ def _convert_superscript_content_smart(content: str) -> str:
 
 
 def _convert_superscript_content(content: str) -> str:
-    """上付き文字の内容を変換する"""
-    result = ""
-    i = 0
-    while i < len(content):
-        char = content[i]
-        if char.isdigit():
-            # 数字の場合は上付き文字に変換
-            result += _get_superscript(char)
-        elif char.isalpha():
-            # 文字の場合は上付き文字に変換
-            result += _get_superscript_letter(char)
-        elif char == '+':
-            # プラス記号の場合は上付きプラスに変換
-            result += '⁺'
-        elif char == '-':
-            # マイナス記号の場合は上付きマイナスに変換
-            result += '⁻'
-        elif char == '(':
-            # 開き括弧の場合は上付き括弧に変換
-            result += '⁽'
-        elif char == ')':
-            # 閉じ括弧の場合は上付き括弧に変換
-            result += '⁾'
-        elif char == '×':
-            # 乗算記号の場合は上付き乗算記号に変換
-            result += 'ˣ'
-        else:
-            # その他の文字（カンマ、ハイフンなど）はそのまま
-            result += char
-        i += 1
-    return result
+    """上付き文字の内容を変換する（数字・英字・+-()× のみ変換し、その他はそのまま）"""
+    return content.translate(_SUPERSCRIPT_TABLE)
 
 
 def _get_superscript_letter(letter: str) -> str:
     """文字を上付き文字に変換する"""
-    superscript_letters = {
-        'a': 'ᵃ', 'b': 'ᵇ', 'c': 'ᶜ', 'd': 'ᵈ', 'e': 'ᵉ', 'f': 'ᶠ', 'g': 'ᵍ',
-        'h': 'ʰ', 'i': 'ⁱ', 'j': 'ʲ', 'k': 'ᵏ', 'l': 'ˡ', 'm': 'ᵐ', 'n': 'ⁿ',
-        'o': 'ᵒ', 'p': 'ᵖ', 'q': 'ᵠ', 'r': 'ʳ', 's': 'ˢ', 't': 'ᵗ', 'u': 'ᵘ',
-        'v': 'ᵛ', 'w': 'ʷ', 'x': 'ˣ', 'y': 'ʸ', 'z': 'ᶻ',
-        'A': 'ᴬ', 'B': 'ᴮ', 'C': 'ᶜ', 'D': 'ᴰ', 'E': 'ᴱ', 'F': 'ᶠ', 'G': 'ᴳ',
-        'H': 'ᴴ', 'I': 'ᴵ', 'J': 'ᴶ', 'K': 'ᴷ', 'L': 'ᴸ', 'M': 'ᴹ', 'N': 'ᴺ',
-        'O': 'ᴼ', 'P': 'ᴾ', 'Q': 'ᵠ', 'R': 'ᴿ', 'S': 'ˢ', 'T': 'ᵀ', 'U': 'ᵁ',
-        'V': 'ⱽ', 'W': 'ᵂ', 'X': 'ˣ', 'Y': 'ʸ', 'Z': 'ᶻ'
-    }
-    return superscript_letters.get(letter, letter)
+    return _SUPERSCRIPT_LETTERS.get(letter, letter)
+
+
+# 書体指定コマンド（入れ子に対応するため、この順に1つずつ適用する）
+_FONT_COMMAND_PATTERNS = [
+    re.compile(r'\\mathbf\{([^}]+)\}'),   # \mathbf{text} → text (太字を通常に)
+    re.compile(r'\\text\{([^}]+)\}'),     # \text{text} → text
+    re.compile(r'\\mathit\{([^}]+)\}'),   # \mathit{text} → text (イタリックを通常に)
+    re.compile(r'\\mathrm\{([^}]+)\}'),   # \mathrm{text} → text (ローマン体を通常に)
+    re.compile(r'\\mathcal\{([^}]+)\}'),  # \mathcal{text} → text (カリグラフィーを通常に)
+]
+
+# \mathbb{text} → text (黒板太字を通常に、ただし特別な文字は変換)
+_BLACKBOARD_LETTERS = {'R': 'ℝ', 'N': 'ℕ', 'Z': 'ℤ', 'Q': 'ℚ', 'C': 'ℂ'}
+_BLACKBOARD_SPECIAL_PATTERN = re.compile(r'\\mathbb\{([RNZQC])\}')
+_BLACKBOARD_PATTERN = re.compile(r'\\mathbb\{([^}]+)\}')
 
 
 def _convert_latex_commands(text: str) -> str:
     """LaTeXコマンドを変換する"""
-    # \mathbf{text} → text (太字を通常に)
-    text = re.sub(r'\\mathbf\{([^}]+)\}', r'\1', text)
+    if '\\' not in text:
+        return text
     
-    # \text{text} → text
-    text = re.sub(r'\\text\{([^}]+)\}', r'\1', text)
+    for pattern in _FONT_COMMAND_PATTERNS:
+        text = pattern.sub(r'\1', text)
     
-    # \mathit{text} → text (イタリックを通常に)
-    text = re.sub(r'\\mathit\{([^}]+)\}', r'\1', text)
-    
-    # \mathrm{text} → text (ローマン体を通常に)
-    text = re.sub(r'\\mathrm\{([^}]+)\}', r'\1', text)
-    
-    # \mathcal{text} → text (カリグラフィーを通常に)
-    text = re.sub(r'\\mathcal\{([^}]+)\}', r'\1', text)
-    
-    # \mathbb{text} → text (黒板太字を通常に、ただし特別な文字は変換)
-    text = re.sub(r'\\mathbb\{R\}', 'ℝ', text)
-    text = re.sub(r'\\mathbb\{N\}', 'ℕ', text)
-    text = re.sub(r'\\mathbb\{Z\}', 'ℤ', text)
-    text = re.sub(r'\\mathbb\{Q\}', 'ℚ', text)
-    text = re.sub(r'\\mathbb\{C\}', 'ℂ', text)
-    text = re.sub(r'\\mathbb\{([^}]+)\}', r'\1', text)
+    text = _BLACKBOARD_SPECIAL_PATTERN.sub(lambda m: _BLACKBOARD_LETTERS[m.group(1)], text)
+    text = _BLACKBOARD_PATTERN.sub(r'\1', text)
     
     return text
 
 
+_MATH_ENVIRONMENT_PATTERN = re.compile(r'\$(.*?)\$')
+
+
 def _convert_math_environments(text: str) -> str:
     """数式環境を変換する"""
+    if '$' not in text:
+        return text
+    
     # ドル記号で囲まれた数式環境を処理
-    text = re.sub(r'\$(.*?)\$', lambda m: _process_math_content(m.group(1)), text)
+    text = _MATH_ENVIRONMENT_PATTERN.sub(lambda m: _process_math_content(m.group(1)), text)
     
     return text
 
@@ -244,87 +278,57 @@ def _process_math_content(math_text: str) -> str:
     return math_text
 
 
+# ギリシャ文字
+_GREEK_LETTERS = {
+    '\\alpha': 'α', '\\beta': 'β', '\\gamma': 'γ', '\\delta': 'δ',
+    '\\epsilon': 'ε', '\\zeta': 'ζ', '\\eta': 'η', '\\theta': 'θ',
+    '\\iota': 'ι', '\\kappa': 'κ', '\\lambda': 'λ', '\\mu': 'μ',
+    '\\nu': 'ν', '\\xi': 'ξ', '\\omicron': 'ο', '\\pi': 'π',
+    '\\rho': 'ρ', '\\sigma': 'σ', '\\tau': 'τ', '\\upsilon': 'υ',
+    '\\phi': 'φ', '\\chi': 'χ', '\\psi': 'ψ', '\\omega': 'ω',
+    '\\Gamma': 'Γ', '\\Delta': 'Δ', '\\Theta': 'Θ', '\\Lambda': 'Λ',
+    '\\Xi': 'Ξ', '\\Pi': 'Π', '\\Sigma': 'Σ', '\\Upsilon': 'Υ',
+    '\\Phi': 'Φ', '\\Psi': 'Ψ', '\\Omega': 'Ω'
+}
+
+# 数学記号
+_MATH_SYMBOLS = {
+    '\\times': '×', '\\div': '÷', '\\pm': '±', '\\mp': '∓',
+    '\\leq': '≤', '\\geq': '≥', '\\neq': '≠', '\\approx': '≈',
+    '\\equiv': '≡', '\\propto': '∝', '\\infty': '∞', '\\sum': '∑',
+    '\\prod': '∏', '\\int': '∫', '\\partial': '∂', '\\nabla': '∇',
+    '\\in': '∈', '\\notin': '∉', '\\subset': '⊂', '\\supset': '⊃',
+    '\\cup': '∪', '\\cap': '∩', '\\emptyset': '∅', '\\rightarrow': '→',
+    '\\leftarrow': '←', '\\leftrightarrow': '↔', '\\Rightarrow': '⇒',
+    '\\Leftarrow': '⇐', '\\Leftrightarrow': '⇔',
+    '\\cdot': '·', '\\bullet': '•', '\\circ': '∘', '\\star': '⋆',
+    '\\ast': '∗', '\\oplus': '⊕', '\\ominus': '⊖', '\\otimes': '⊗',
+    '\\odot': '⊙', '\\wedge': '∧', '\\vee': '∨', '\\neg': '¬',
+    '\\land': '∧', '\\lor': '∨', '\\forall': '∀', '\\exists': '∃'
+}
+
+_LATEX_SYMBOLS = {**_GREEK_LETTERS, **_MATH_SYMBOLS}
+
+# 全コマンドを1つの選択パターンにまとめる。\in と \int のように前方一致する
+# コマンドは長い方を優先する必要があるため、長い順に並べる
+_LATEX_SYMBOL_PATTERN = re.compile(
+    '|'.join(re.escape(command) for command in sorted(_LATEX_SYMBOLS, key=len, reverse=True))
+)
+
+
 def _convert_other_latex_symbols(text: str) -> str:
     """その他のLaTeX記号を変換する"""
-    # ギリシャ文字の変換
-    greek_letters = {
-        r'\\alpha': 'α', r'\\beta': 'β', r'\\gamma': 'γ', r'\\delta': 'δ',
-        r'\\epsilon': 'ε', r'\\zeta': 'ζ', r'\\eta': 'η', r'\\theta': 'θ',
-        r'\\iota': 'ι', r'\\kappa': 'κ', r'\\lambda': 'λ', r'\\mu': 'μ',
-        r'\\nu': 'ν', r'\\xi': 'ξ', r'\\omicron': 'ο', r'\\pi': 'π',
-        r'\\rho': 'ρ', r'\\sigma': 'σ', r'\\tau': 'τ', r'\\upsilon': 'υ',
-        r'\\phi': 'φ', r'\\chi': 'χ', r'\\psi': 'ψ', r'\\omega': 'ω',
-        r'\\Gamma': 'Γ', r'\\Delta': 'Δ', r'\\Theta': 'Θ', r'\\Lambda': 'Λ',
-        r'\\Xi': 'Ξ', r'\\Pi': 'Π', r'\\Sigma': 'Σ', r'\\Upsilon': 'Υ',
-        r'\\Phi': 'Φ', r'\\Psi': 'Ψ', r'\\Omega': 'Ω'
-    }
-    
-    for latex_cmd, unicode_char in greek_letters.items():
-        text = re.sub(latex_cmd, unicode_char, text)
-    
-    # 数学記号の変換
-    math_symbols = {
-        r'\\times': '×', r'\\div': '÷', r'\\pm': '±', r'\\mp': '∓',
-        r'\\leq': '≤', r'\\geq': '≥', r'\\neq': '≠', r'\\approx': '≈',
-        r'\\equiv': '≡', r'\\propto': '∝', r'\\infty': '∞', r'\\sum': '∑',
-        r'\\prod': '∏', r'\\int': '∫', r'\\partial': '∂', r'\\nabla': '∇',
-        r'\\in': '∈', r'\\notin': '∉', r'\\subset': '⊂', r'\\supset': '⊃',
-        r'\\cup': '∪', r'\\cap': '∩', r'\\emptyset': '∅', r'\\rightarrow': '→',
-        r'\\leftarrow': '←', r'\\leftrightarrow': '↔', r'\\Rightarrow': '⇒',
-        r'\\Leftarrow': '⇐', r'\\Leftrightarrow': '⇔',
-        r'\\cdot': '·', r'\\bullet': '•', r'\\circ': '∘', r'\\star': '⋆',
-        r'\\ast': '∗', r'\\oplus': '⊕', r'\\ominus': '⊖', r'\\otimes': '⊗',
-        r'\\odot': '⊙', r'\\wedge': '∧', r'\\vee': '∨', r'\\neg': '¬',
-        r'\\land': '∧', r'\\lor': '∨', r'\\forall': '∀', r'\\exists': '∃'
-    }
+    if '\\' not in text:
+        return text
     
-    for latex_cmd, unicode_char in math_symbols.items():
-        text = re.sub(latex_cmd, unicode_char, text)
-    
-    return text
+    return _LATEX_SYMBOL_PATTERN.sub(lambda m: _LATEX_SYMBOLS[m.group(0)], text)
 
 
 def _get_subscript(num_str: str) -> str:
     """数字を下付き文字に変換する"""
-    subscript_map = {
-        '0': '₀',
-        '1': '₁',
-        '2': '₂',
-        '3': '₃',
-        '4': '₄',
-        '5': '₅',
-        '6': '₆',
-        '7': '₇',
-        '8': '₈',
-        '9': '₉'
-    }
-    result = ''
-    for digit in num_str:
-        if digit in subscript_map:
-            result += subscript_map[digit]
-        else:
-            result += digit
-    return result
+    return num_str.translate(_SUBSCRIPT_DIGIT_TABLE)
 
 
 def _get_superscript(num_str: str) -> str:
     """数字を上付き文字に変換する"""
-    superscript_map = {
-        '0': '⁰',
-        '1': '¹',
-        '2': '²',
-        '3': '³',
-        '4': '⁴',
-        '5': '⁵',
-        '6': '⁶',
-        '7': '⁷',
-        '8': '⁸',
-        '9': '⁹'
-    }
-    result = ''
-    for digit in num_str:
-        if digit in superscript_map:
-            result += superscript_map[digit]
-        else:
-            result += digit
-    return result
+    return num_str.translate(_SUPERSCRIPT_DIGIT_TABLE)
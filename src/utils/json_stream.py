@@ -0,0 +1,234 @@
+"""
+JSON ストリーミングパーサ
+オブジェクトの配列（Qiita の記事一覧など）を受信しながら1件ずつ取り出す。
+指定したキーの長い文字列（記事本文など）は読み飛ばしながら切り詰めるか捨てるため、
+レスポンス全体や本文全体をメモリに載せない
+"""
+import re
+import json
+import codecs
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Tuple
+
+# 文字列の中身（閉じ引用符の手前まで）。末尾の単独のバックスラッシュは次のチャンクを待つ
+_STRING_BODY = re.compile(r'[^"\\]*(?:\\.[^"\\]*)*', re.DOTALL)
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+_DELIMITERS = frozenset(' \t\n\r,:]}')
+
+# エスケープ1文字ぶんの最大長（サロゲートペア "😀"）
+_MAX_ESCAPED_CHAR_LENGTH = 12
+# 抽出器に渡すために一度にデコードする文字数
+_DECODE_WINDOW = 4096
+
+_decoder = json.JSONDecoder()
+
+
+def iter_array_items(chunks: Iterable[bytes], string_limits: Optional[Dict[str, int]] = None,
+                     string_extractors: Optional[Dict[str, Callable[[], Any]]] = None) -> Iterator[Dict[str, Any]]:
+    """
+    JSON 配列の要素（オブジェクト）を受信しながら順に返す
+    
+    Args:
+        chunks: レスポンス本文のバイト列（response.iter_content など）
+        string_limits: 要素直下のキーごとの文字数上限。値が文字列の場合は先頭だけを残し、
+            0 のキーは要素から取り除く
+        string_extractors: 要素直下のキーごとに、文字列を少しずつ渡す抽出器を作る関数。
+            抽出器の feed(text) が True を返したら残りは渡さずに読み飛ばし、値は result() の戻り値になる
+            （PreviewExtractor など）
+    
+    Returns:
+        iterator: 配列の要素
+    
+    Raises:
+        ValueError: JSON 配列でない、または途中で途切れている場合
+    """
+    return _ArrayItemParser(chunks, string_limits or {}, string_extractors or {}).items()
+
+
+class _ArrayItemParser:
+    """トップレベルがオブジェクトの配列である JSON の逐次パーサ"""
+    
+    def __init__(self, chunks: Iterable[bytes], string_limits: Dict[str, int],
+                 string_extractors: Dict[str, Callable[[], Any]]):
+        self._chunks = iter(chunks)
+        self._text_decoder = codecs.getincrementaldecoder("utf-8")()
+        self._limits = string_limits
+        self._extractors = string_extractors
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+    
+    def items(self) -> Iterator[Dict[str, Any]]:
+        if self._next_char() != "[":
+            raise ValueError("JSON array expected")
+        self._pos += 1
+        
+        if self._next_char() == "]":
+            return
+        while True:
+            if self._next_char() != "{":
+                raise ValueError(f"JSON object expected at offset {self._pos}")
+            yield self._read_object()
+            
+            separator = self._next_char()
+            self._pos += 1
+            if separator == "]":
+                return
+            if separator != ",":
+                raise ValueError(f"',' or ']' expected at offset {self._pos - 1}")
+    
+    def _read_object(self) -> Dict[str, Any]:
+        """要素のオブジェクトを1つ読む（_pos は '{' を指している）"""
+        self._pos += 1
+        item = {}
+        if self._next_char() == "}":
+            self._pos += 1
+            return item
+        
+        while True:
+            key = self._read_value()
+            if not isinstance(key, str) or self._next_char() != ":":
+                raise ValueError(f"object key expected at offset {self._pos}")
+            self._pos += 1
+            
+            limit = self._limits.get(key)
+            extractor = self._extractors.get(key)
+            if extractor is not None and self._next_char() == '"':
+                item[key] = self._read_extracted_string(extractor())
+            elif limit is not None and self._next_char() == '"':
+                value = self._read_limited_string(limit)
+                if limit > 0:
+                    item[key] = value
+            else:
+                item[key] = self._read_value()
+            
+            separator = self._next_char()
+            self._pos += 1
+            if separator == "}":
+                return item
+            if separator != ",":
+                raise ValueError(f"',' or '}}' expected at offset {self._pos - 1}")
+    
+    def _read_value(self) -> Any:
+        """値を1つ読む（値の終わりがバッファ内に無ければ受信を続ける）"""
+        self._next_char()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            # 数値はチャンクの境界で切れている可能性があるため、区切り文字が来るまで確定しない
+            if (end == len(self._buffer) or self._buffer[end] not in _DELIMITERS) and self._fill():
+                continue
+            self._pos = end
+            return value
+    
+    def _read_limited_string(self, limit: int) -> str:
+        """
+        文字列を読み飛ばしながら先頭の limit 文字だけを返す（_pos は開き引用符を指している）
+        
+        読み終えた部分はバッファから捨てるため、長い文字列でも使うメモリは一定
+        """
+        self._pos += 1
+        raw_budget = limit * _MAX_ESCAPED_CHAR_LENGTH
+        kept = []
+        kept_length = 0
+        while True:
+            end = _STRING_BODY.match(self._buffer, self._pos).end()
+            if kept_length < raw_budget:
+                piece = self._buffer[self._pos:min(end, self._pos + raw_budget - kept_length)]
+                kept.append(piece)
+                kept_length += len(piece)
+            self._pos = end
+            if end < len(self._buffer) and self._buffer[end] == '"':
+                self._pos += 1
+                return _decode_string_prefix("".join(kept))[:limit]
+            if not self._fill():
+                raise ValueError("unterminated string")
+    
+    def _read_extracted_string(self, extractor: Any) -> str:
+        """
+        文字列をデコードしながら抽出器に渡し、抽出器の結果を返す（_pos は開き引用符を指している）
+        
+        抽出器が十分に受け取った後は、閉じ引用符まで読み飛ばすだけにする
+        """
+        self._pos += 1
+        carry = ""  # チャンクの境界で切れたエスケープ
+        done = False
+        while True:
+            end = _STRING_BODY.match(self._buffer, self._pos).end()
+            closed = end < len(self._buffer) and self._buffer[end] == '"'
+            # 抽出器が受け取り終えた時点でデコードをやめられるよう、少しずつデコードして渡す
+            start = self._pos
+            while not done:
+                stop = min(end, start + _DECODE_WINDOW)
+                raw = carry + self._buffer[start:stop]
+                if closed and stop == end:
+                    text, carry = _decode_string_prefix(raw), ""
+                else:
+                    text, carry = _decode_available(raw)
+                done = extractor.feed(text)
+                start = stop
+                if start == end:
+                    break
+            self._pos = end
+            if closed:
+                self._pos += 1
+                return extractor.result()
+            if not self._fill():
+                raise ValueError("unterminated string")
+    
+    def _next_char(self) -> str:
+        """空白を読み飛ばし、次の文字を返す（読み進めない）"""
+        while True:
+            self._pos = _WHITESPACE.match(self._buffer, self._pos).end()
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._fill():
+                raise ValueError("unexpected end of JSON")
+    
+    def _fill(self) -> bool:
+        """次のチャンクを受信してバッファに追加する。読み終えた部分は捨てる"""
+        if self._eof:
+            return False
+        self._buffer = self._buffer[self._pos:]
+        self._pos = 0
+        for chunk in self._chunks:
+            text = self._text_decoder.decode(chunk)
+            if text:
+                self._buffer += text
+                return True
+        self._buffer += self._text_decoder.decode(b"", final=True)
+        self._eof = True
+        return True
+
+
+def _decode_string_prefix(raw: str) -> str:
+    """エスケープされた文字列の先頭部分をデコードする（途中で切れたエスケープは取り除く）"""
+    for cut in range(min(len(raw), _MAX_ESCAPED_CHAR_LENGTH) + 1):
+        try:
+            return json.loads(f'"{raw[:len(raw) - cut]}"')
+        except json.JSONDecodeError:
+            continue
+    return ""
+
+
+def _decode_available(raw: str) -> Tuple[str, str]:
+    """
+    エスケープされた文字列の断片をデコードできるところまでデコードする
+    
+    Returns:
+        tuple: (デコードした文字列, 次の断片の前に付けるべき残り（途中で切れたエスケープ）)
+    """
+    for cut in range(min(len(raw), _MAX_ESCAPED_CHAR_LENGTH) + 1):
+        head = raw[:len(raw) - cut]
+        try:
+            text = json.loads(f'"{head}"')
+        except json.JSONDecodeError:
+            continue
+        # サロゲートペアの前半だけで切れている場合は、後半と合わせてデコードする
+        if text and "\ud800" <= text[-1] <= "\udbff":
+            continue
+        return text, raw[len(head):]
+    return "", raw
@@ -0,0 +1,266 @@
+"""
+メトリクス
+処理段階ごとの所要時間（スパン）、レイテンシのヒストグラム、カウンタ、ゲージを記録し、
+実行レポート（JSON）と Prometheus のテキスト形式で書き出す。
+記録は辞書の更新だけで済むため、常に有効にしておける
+"""
+import os
+import json
+import time
+import bisect
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+# メトリクス名の接頭辞（Prometheus 形式）
+PREFIX = "qiita_bot_"
+
+# レイテンシのヒストグラムの区切り（秒）
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# 1回の実行で保持するスパンの上限（常駐モードでメモリが増え続けないように）
+MAX_SPANS = 1000
+
+_HELP = {
+    "span_seconds": "処理段階ごとの所要時間",
+    "qiita_fetch_seconds": "タグ（OR検索の場合はタグの組）ごとの記事取得の所要時間",
+    "qiita_request_seconds": "Qiita API への1リクエストの所要時間",
+    "qiita_requests_total": "Qiita API へのリクエスト数（ステータス別）",
+    "qiita_rate_limited_total": "Qiita API でレート制限を受けた回数",
+    "qiita_rate_limit_denied_total": "レートリミットの枠が無く送らなかったリクエスト数",
+    "qiita_hedged_requests_total": "応答が遅く同じリクエストを重ねて送った回数（先に返った方別）",
+    "tags_deferred_total": "実行の持ち時間を使い切り次回に持ち越したタグ数（段階別）",
+    "response_cache_requests_total": "レスポンスキャッシュの参照結果",
+    "render_cache_requests_total": "レンダリングキャッシュの参照結果",
+    "slack_api_seconds": "Slack API の呼び出しの所要時間（メソッド別）",
+    "slack_api_calls_total": "Slack API の呼び出し数（メソッド・結果別）",
+    "slack_retries_total": "Slack API の 429 による再試行回数",
+    "slack_spooled_messages_total": "送れずにスプールしたメッセージ数",
+    "slack_thread_discovery_total": "Slack 履歴での最新の親投稿の探索結果",
+    "journal_skipped_messages_total": "中断した実行で送信済みのため送らなかったメッセージ数",
+    "articles_total": "記事数（段階別）",
+}
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+class MetricsRegistry:
+    """スレッドセーフなメトリクスの記録先"""
+    
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self.reset()
+    
+    def reset(self):
+        """記録を消して、新しい実行の記録を始める"""
+        with self._lock:
+            self._counters = {}
+            self._gauges = {}
+            self._histograms = {}
+            self._spans = []
+            self._started_at = datetime.now()
+            self._origin = time.perf_counter()
+    
+    @contextmanager
+    def span(self, stage: str, **labels: str) -> Iterator[None]:
+        """処理段階の所要時間を記録する（span_seconds ヒストグラムにも加える）"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            duration = time.perf_counter() - start
+            self.observe("span_seconds", duration, stage=stage, **labels)
+            with self._lock:
+                if len(self._spans) < MAX_SPANS:
+                    self._spans.append({
+                        "stage": stage,
+                        "labels": labels,
+                        "start": round(start - self._origin, 6),
+                        "duration": round(duration, 6),
+                        "thread": threading.current_thread().name
+                    })
+    
+    @contextmanager
+    def timer(self, name: str, **labels: str) -> Iterator[None]:
+        """with ブロックの所要時間をヒストグラムに記録する"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+    
+    def observe(self, name: str, value: float, **labels: str):
+        """ヒストグラムに値を記録する"""
+        key = (name, _label_key(labels))
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = {
+                    "buckets": [0] * (len(self.buckets) + 1), "count": 0, "sum": 0.0,
+                    "min": value, "max": value
+                }
+            histogram["buckets"][index] += 1
+            histogram["count"] += 1
+            histogram["sum"] += value
+            histogram["min"] = min(histogram["min"], value)
+            histogram["max"] = max(histogram["max"], value)
+    
+    def increment(self, name: str, value: float = 1, **labels: str):
+        """カウンタを増やす"""
+        key = (name, _label_key(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+    
+    def set_gauge(self, name: str, value: float, **labels: str):
+        """ゲージの値を設定する"""
+        with self._lock:
+            self._gauges[(name, _label_key(labels))] = value
+    
+    def report(self) -> Dict[str, Any]:
+        """実行レポート（JSON に変換できる辞書）を返す"""
+        with self._lock:
+            histograms = []
+            for (name, labels), histogram in sorted(self._histograms.items()):
+                histograms.append({
+                    "name": name,
+                    "labels": dict(labels),
+                    "count": histogram["count"],
+                    "sum": round(histogram["sum"], 6),
+                    "min": round(histogram["min"], 6),
+                    "max": round(histogram["max"], 6),
+                    "p50": self._quantile(histogram, 0.5),
+                    "p95": self._quantile(histogram, 0.95),
+                })
+            return {
+                "started_at": self._started_at.isoformat(timespec="seconds"),
+                "duration_seconds": round(time.perf_counter() - self._origin, 6),
+                "spans": list(self._spans),
+                "counters": [{"name": n, "labels": dict(l), "value": v} for (n, l), v in sorted(self._counters.items())],
+                "gauges": [{"name": n, "labels": dict(l), "value": v} for (n, l), v in sorted(self._gauges.items())],
+                "histograms": histograms,
+            }
+    
+    def quantile(self, name: str, q: float, **labels: str) -> Optional[float]:
+        """
+        ラベル labels を含むすべての系列をまとめて分位点を見積もる（例: タグをまたいだ stage の p95）
+        
+        Returns:
+            float: 分位点。該当する記録が無ければ None
+        """
+        match = set(_label_key(labels))
+        merged = None
+        with self._lock:
+            for (series, key), histogram in self._histograms.items():
+                if series != name or not match <= set(key):
+                    continue
+                if merged is None:
+                    merged = {"buckets": list(histogram["buckets"]), "count": histogram["count"],
+                              "max": histogram["max"]}
+                    continue
+                merged["buckets"] = [a + b for a, b in zip(merged["buckets"], histogram["buckets"])]
+                merged["count"] += histogram["count"]
+                merged["max"] = max(merged["max"], histogram["max"])
+        if merged is None:
+            return None
+        return self._quantile(merged, q)
+    
+    def _quantile(self, histogram: Dict[str, Any], q: float) -> float:
+        """ヒストグラムの区切りから分位点を見積もる（該当する区切りの上限。最後の区切りを超えたら最大値）"""
+        target = q * histogram["count"]
+        cumulative = 0
+        for bound, count in zip(self.buckets, histogram["buckets"]):
+            cumulative += count
+            if cumulative >= target:
+                return round(min(bound, histogram["max"]), 6)
+        return round(histogram["max"], 6)
+    
+    def to_prometheus(self) -> str:
+        """Prometheus のテキスト形式に変換する"""
+        with self._lock:
+            counters = sorted(self._counters.items())
+            gauges = sorted(self._gauges.items())
+            histograms = sorted((key, dict(value, buckets=list(value["buckets"])))
+                                for key, value in self._histograms.items())
+        
+        lines = []
+        declared = set()
+        
+        def declare(name: str, kind: str):
+            if name not in declared:
+                declared.add(name)
+                if name in _HELP:
+                    lines.append(f"# HELP {PREFIX}{name} {_HELP[name]}")
+                lines.append(f"# TYPE {PREFIX}{name} {kind}")
+        
+        for (name, labels), value in counters:
+            declare(name, "counter")
+            lines.append(f"{PREFIX}{name}{_format_labels(labels)} {_format_value(value)}")
+        for (name, labels), value in gauges:
+            declare(name, "gauge")
+            lines.append(f"{PREFIX}{name}{_format_labels(labels)} {_format_value(value)}")
+        for (name, labels), histogram in histograms:
+            declare(name, "histogram")
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), histogram["buckets"]):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else _format_value(bound)
+                lines.append(f"{PREFIX}{name}_bucket{_format_labels(labels + (('le', le),))} {cumulative}")
+            lines.append(f"{PREFIX}{name}_sum{_format_labels(labels)} {_format_value(histogram['sum'])}")
+            lines.append(f"{PREFIX}{name}_count{_format_labels(labels)} {histogram['count']}")
+        return "\n".join(lines) + "\n"
+    
+    def summary(self) -> str:
+        """処理段階ごとの所要時間の1行サマリ（ログ用）"""
+        totals = {}
+        with self._lock:
+            for span in self._spans:
+                totals[span["stage"]] = totals.get(span["stage"], 0.0) + span["duration"]
+        return " ".join(f"{stage}={seconds:.2f}s" for stage, seconds in totals.items())
+    
+    def export(self, directory: str):
+        """実行レポート（run_report.json）と Prometheus 形式（metrics.prom）を書き出す"""
+        os.makedirs(directory, exist_ok=True)
+        _write_atomic(os.path.join(directory, "run_report.json"),
+                      json.dumps(self.report(), ensure_ascii=False, indent=2))
+        _write_atomic(os.path.join(directory, "metrics.prom"), self.to_prometheus())
+
+
+def _label_key(labels: Dict[str, Any]) -> LabelKey:
+    """ラベルを辞書のキーに使える形にする"""
+    if not labels:
+        return ()
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+def _format_labels(labels: LabelKey) -> str:
+    """Prometheus 形式のラベル表記"""
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape_label(value)}"' for name, value in labels) + "}"
+
+
+def _escape_label(value: str) -> str:
+    """ラベルの値のエスケープ（バックスラッシュ・引用符・改行）"""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_value(value: float) -> str:
+    """Prometheus 形式の数値表記"""
+    if isinstance(value, int) or float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _write_atomic(path: str, text: str):
+    """一時ファイル経由で書き込む（読み取り側が書きかけのファイルを読まないように）"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+# プロセス全体で共有する記録先
+metrics = MetricsRegistry()
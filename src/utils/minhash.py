@@ -0,0 +1,145 @@
+"""
+MinHash / LSH
+文字 n-gram（シングル）の集合から MinHash 署名を作り、LSH のバンドで類似候補を絞り込む。
+署名は One Permutation Hashing（1回のハッシュでビンごとの最小値をとる）で作るため、
+計算量はシングル数に比例し、署名の長さ（ビン数）には依存しない
+"""
+import zlib
+import unicodedata
+from typing import Dict, Hashable, List, Optional, Set, Tuple
+
+# 署名の長さ（2のべき乗）
+NUM_BINS = 64
+_BIN_BITS = NUM_BINS.bit_length() - 1
+_BIN_MASK = NUM_BINS - 1
+_EMPTY = 0xFFFFFFFF
+
+# シングルのハッシュ値を混ぜる乗数（CRC32 は線形なため、そのままだと最小値が偏る）
+_MIX = 0x9E3779B1
+_MASK32 = 0xFFFFFFFF
+
+
+def normalize_text(text: str) -> str:
+    """全角・半角や大文字小文字の違いをならし、空白をまとめる"""
+    return " ".join(unicodedata.normalize("NFKC", text).casefold().split())
+
+
+def signature(text: str, shingle_size: int = 3) -> List[int]:
+    """
+    文字 shingle_size-gram の MinHash 署名を返す
+    
+    Returns:
+        list: NUM_BINS 個の 32bit 整数
+    """
+    # UTF-32 にすると1文字が4バイト固定になり、シングルをバイト列のスライスで取り出せる
+    data = normalize_text(text).encode("utf-32-le")
+    width = 4 * shingle_size
+    signature = [_EMPTY] * NUM_BINS
+    if not data:
+        return signature
+    last = max(0, len(data) - width)
+    crc32 = zlib.crc32
+    for start in range(0, last + 1, 4):
+        value = (crc32(data[start:start + width]) * _MIX) & _MASK32
+        index = value & _BIN_MASK
+        value >>= _BIN_BITS
+        if value < signature[index]:
+            signature[index] = value
+    return _densify(signature)
+
+
+def _densify(signature: List[int]) -> List[int]:
+    """シングルが入らなかったビンを、右隣で最初に値のあるビンの値（距離で変えたもの）で埋める"""
+    if _EMPTY not in signature:
+        return signature
+    filled = [i for i, value in enumerate(signature) if value != _EMPTY]
+    if not filled:
+        return signature
+    result = list(signature)
+    for i in range(NUM_BINS):
+        if signature[i] != _EMPTY:
+            continue
+        distance = 1
+        while signature[(i + distance) % NUM_BINS] == _EMPTY:
+            distance += 1
+        result[i] = (signature[(i + distance) % NUM_BINS] + distance * _MIX) & _MASK32
+    return result
+
+
+def similarity(a: List[int], b: List[int]) -> float:
+    """署名から Jaccard 係数を推定する（一致するビンの割合）"""
+    return sum(1 for x, y in zip(a, b) if x == y) / NUM_BINS
+
+
+def rows_per_band(threshold: float, recall: float = 0.99) -> int:
+    """
+    しきい値の類似度の組を recall 以上の確率で候補にできる範囲で、最も大きいバンドの行数を返す
+    
+    行数が大きいほど候補が絞られ、照合の回数が減る
+    """
+    best = 1
+    rows = 1
+    while rows <= NUM_BINS:
+        bands = NUM_BINS // rows
+        if 1 - (1 - threshold ** rows) ** bands >= recall:
+            best = rows
+        rows *= 2
+    return best
+
+
+class LSHIndex:
+    """MinHash 署名の LSH インデックス（バンドごとのハッシュ表）"""
+    
+    def __init__(self, threshold: float):
+        if not 0 < threshold <= 1:
+            raise ValueError("near_duplicate_threshold must be between 0 and 1")
+        self.threshold = threshold
+        self.rows = rows_per_band(threshold)
+        self._buckets: Dict[Tuple[int, Tuple[int, ...]], Set[Hashable]] = {}
+        self._signatures: Dict[Hashable, List[int]] = {}
+    
+    def __len__(self) -> int:
+        return len(self._signatures)
+    
+    def _bands(self, signature: List[int]):
+        rows = self.rows
+        for band, start in enumerate(range(0, NUM_BINS, rows)):
+            yield band, tuple(signature[start:start + rows])
+    
+    def add(self, key: Hashable, signature: List[int]):
+        """署名を登録する（同じキーは置き換える）"""
+        self.remove(key)
+        self._signatures[key] = signature
+        for band in self._bands(signature):
+            self._buckets.setdefault(band, set()).add(key)
+    
+    def remove(self, key: Hashable):
+        """署名を取り除く"""
+        signature = self._signatures.pop(key, None)
+        if signature is None:
+            return
+        for band in self._bands(signature):
+            bucket = self._buckets.get(band)
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del self._buckets[band]
+    
+    def query(self, signature: List[int]) -> Optional[Tuple[Hashable, float]]:
+        """
+        しきい値以上で最も似ている登録済みの署名を返す
+        
+        Returns:
+            tuple: (キー, 推定類似度)。該当が無ければ None
+        """
+        candidates = set()
+        for band in self._bands(signature):
+            bucket = self._buckets.get(band)
+            if bucket:
+                candidates.update(bucket)
+        best = None
+        for key in candidates:
+            score = similarity(signature, self._signatures[key])
+            if score >= self.threshold and (best is None or score > best[1]):
+                best = (key, score)
+        return best
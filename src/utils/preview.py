@@ -0,0 +1,214 @@
+"""
+本文プレビュー
+Markdown の記事本文を先頭から1行ずつ読み、読める文章だけを指定した文字数まで取り出す。
+コードブロック・表・HTML・フロントマターは読み飛ばし、リンクや画像の記法は取り除き、
+インライン数式は format_latex_for_slack で変換する。
+文字数に達した時点で読むのをやめるため、長い記事でも短い記事と同じ手間で済む
+"""
+import re
+from typing import List
+
+from .formatters import format_latex_for_slack
+
+# 1行として見る最大の文字数（minify された HTML など極端に長い行は先頭だけを見る）
+MAX_LINE_LENGTH = 4096
+
+_FENCE = re.compile(r" {0,3}(`{3,}|~{3,})")
+_HEADING = re.compile(r"#{1,6}(?:\s+|$)")
+_HORIZONTAL_RULE = re.compile(r"([-*_])(?:\s*\1){2,}\s*$")
+_LIST_MARKER = re.compile(r"(?:[-*+]|\d{1,9}[.)])\s+(?:\[[ xX]\]\s+)?")
+_LINK_DEFINITION = re.compile(r"\[[^\]]+\]:\s")
+_HTML_BLOCK = re.compile(r"</?[A-Za-z][\w-]*(?:[\s>/]|$)")
+# 行内の記法。どの選択肢も次の区切り文字までしか読まないため、行の長さに比例した時間で済む
+_INLINE = re.compile(
+    r"`(?P<code>[^`]+)`"                      # インラインコード → 中身
+    r"|!\[[^\[\]]*\]\([^()]*\)"              # 画像 → 取り除く
+    r"|\[(?P<link>[^\[\]]*)\]\([^()]*\)"     # リンク → 表示テキスト
+    r"|\[(?P<ref>[^\[\]]*)\]\[[^\[\]]*\]"   # 参照リンク → 表示テキスト
+    r"|\[\^[^\[\]]*\]"                        # 脚注 → 取り除く
+    r"|<https?://[^<>\s]*>|https?://\S+"      # URL → 取り除く
+    r"|<!--.*?-->|</?[A-Za-z][^<>]*>"         # HTML タグ・コメント → 取り除く
+    r"|(?P<math>\$[^$]+\$)"                   # インライン数式 → 変換
+    r"|\*+|~~"                                # 強調・取り消し線の記号 → 取り除く
+)
+
+
+def extract_preview(markdown: str, limit: int) -> str:
+    """Markdown の本文から先頭 limit 文字ぶんの読める文章を取り出す"""
+    extractor = PreviewExtractor(limit)
+    extractor.feed(markdown)
+    return extractor.result()
+
+
+class PreviewExtractor:
+    """
+    Markdown を少しずつ受け取り、読める文章を limit 文字まで集める
+    
+    本文を受信しながら feed で渡し、True が返ったら（十分に集まったので）残りは渡さなくてよい
+    """
+    
+    def __init__(self, limit: int):
+        self.limit = limit
+        self._parts: List[str] = []
+        self._length = 0
+        self._pending = ""  # 改行がまだ来ていない行
+        self._skip_rest_of_line = False
+        self._line_number = 0
+        self._fence = None  # コードブロックの開始記号（``` や ~~~）
+        self._fence_close = None  # コードブロックを閉じる行のパターン
+        self._in_front_matter = False
+        self._in_math_block = False
+        self._in_html_comment = False
+        self._in_indented_code = False
+        self._previous_blank = True
+    
+    @property
+    def done(self) -> bool:
+        return self._length >= self.limit
+    
+    def feed(self, text: str) -> bool:
+        """
+        本文の続きを渡す
+        
+        Returns:
+            bool: limit 文字に達した場合は True
+        """
+        if self.done or not text:
+            return self.done
+        start = 0
+        while not self.done:
+            if self._fence is not None and not self._pending and not self._skip_rest_of_line:
+                # コードブロックの中は1行ずつ見ずに、閉じる行まで読み飛ばす
+                close = self._fence_close.search(text, start)
+                if close is None:
+                    # 閉じる行が次の断片に続いている場合に備えて、最後の行だけは残す
+                    start = max(start, text.rfind("\n", start) + 1)
+                    break
+                self._fence = None
+                start = close.end()
+                continue
+            end = text.find("\n", start)
+            if end < 0:
+                break
+            self._end_line(text[start:end])
+            start = end + 1
+        if not self.done:
+            self._add_partial(text[start:])
+        return self.done
+    
+    def result(self) -> str:
+        """集めた文章（改行の無い最後の行も含める）"""
+        if self._pending and not self.done:
+            self._process_line(self._pending)
+        self._pending = ""
+        return " ".join(self._parts)[:self.limit]
+    
+    def _add_partial(self, text: str):
+        """改行の無い行の断片をためる（長すぎる行は先頭だけを見る）"""
+        if self._skip_rest_of_line:
+            return
+        self._pending += text[:MAX_LINE_LENGTH + 1 - len(self._pending)]
+        if len(self._pending) > MAX_LINE_LENGTH:
+            self._process_line(self._pending[:MAX_LINE_LENGTH])
+            self._pending = ""
+            self._skip_rest_of_line = True
+    
+    def _end_line(self, text: str):
+        if self._skip_rest_of_line:
+            self._skip_rest_of_line = False
+            self._pending = ""
+            return
+        line = self._pending + text if self._pending else text
+        self._pending = ""
+        self._process_line(line[:MAX_LINE_LENGTH])
+    
+    def _process_line(self, line: str):
+        """1行を読み、文章として読める部分を追加する"""
+        self._line_number += 1
+        line = line.rstrip("\r")
+        stripped = line.strip()
+        blank = not stripped
+        previous_blank = self._previous_blank
+        self._previous_blank = blank
+        
+        # フロントマター（先頭の --- から次の --- まで）
+        if self._line_number == 1 and stripped == "---":
+            self._in_front_matter = True
+            return
+        if self._in_front_matter:
+            if stripped in ("---", "..."):
+                self._in_front_matter = False
+            return
+        
+        # コードブロック（```math などの数式ブロックを含む）
+        fence = _FENCE.match(line)
+        if self._fence is not None:
+            if fence and fence.group(1)[0] == self._fence[0] and len(fence.group(1)) >= len(self._fence) \
+                    and not line[fence.end():].strip():
+                self._fence = None
+            return
+        if fence:
+            self._fence = fence.group(1)
+            self._fence_close = re.compile(
+                r"^ {0,3}%s{%d,}[ \t]*\r?\n" % (re.escape(self._fence[0]), len(self._fence)), re.MULTILINE
+            )
+            return
+        
+        # 数式ブロック（$$ だけの行で囲まれた部分）と HTML のコメント
+        if self._in_math_block:
+            if stripped.endswith("$$"):
+                self._in_math_block = False
+            return
+        if stripped.startswith("$$"):
+            self._in_math_block = not (len(stripped) > 2 and stripped.endswith("$$"))
+            return
+        if self._in_html_comment:
+            if "-->" in stripped:
+                self._in_html_comment = False
+            return
+        if stripped.startswith("<!--"):
+            self._in_html_comment = "-->" not in stripped
+            return
+        
+        # インデントされたコードブロック（空行の後の4文字以上のインデント）
+        if blank:
+            return
+        if line.startswith(("    ", "\t")) and (previous_blank or self._in_indented_code):
+            self._in_indented_code = True
+            return
+        self._in_indented_code = False
+        
+        # 表・HTML ブロック・Qiita の注記（:::note）の行・区切り線・リンク定義
+        if (stripped.startswith("|") or stripped.startswith(":::") or _HTML_BLOCK.match(stripped)
+                or _HORIZONTAL_RULE.match(stripped) or _LINK_DEFINITION.match(stripped)):
+            return
+        if ("|" in stripped and not stripped.strip("|:- \t")) or not stripped.strip("="):
+            return  # 見出し行の無い表の区切り（---|---）と、見出しの下線（===）
+        
+        # 行頭の記号（引用・見出し・箇条書き）を取り除く
+        text = stripped.lstrip("> \t")
+        heading = _HEADING.match(text)
+        if heading:
+            text = text[heading.end():].rstrip("# \t")
+        else:
+            marker = _LIST_MARKER.match(text)
+            if marker:
+                text = text[marker.end():]
+        
+        text = " ".join(_INLINE.sub(_replace_inline, text).split())
+        if text:
+            self._parts.append(text)
+            self._length += len(text) + 1
+
+
+def _replace_inline(match: "re.Match") -> str:
+    """行内の記法を読める文字列に置き換える"""
+    if match.group("code") is not None:
+        return match.group("code")
+    if match.group("link") is not None:
+        return match.group("link")
+    if match.group("ref") is not None:
+        return match.group("ref")
+    if match.group("math") is not None:
+        return format_latex_for_slack(match.group("math"))
+    return ""
@@ -0,0 +1,102 @@
+"""
+レンダリングキャッシュ
+整形済みタイトルや Slack ブロックを記事ID + 更新日時をキーにして再利用する
+"""
+import os
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from ..models import Article
+
+
+class RenderCache:
+    """件数上限付きの LRU キャッシュ（任意でファイルに永続化する）"""
+    
+    def __init__(self, max_entries: int, path: Optional[str] = None):
+        self.max_entries = max_entries
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+        if path:
+            self._load()
+    
+    def _load(self):
+        """永続化されたエントリを読み込む"""
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                entries = json.load(f, object_pairs_hook=OrderedDict)
+        except (OSError, ValueError) as e:
+            print(f"Warning: レンダリングキャッシュを読み込めませんでした ({self.path}): {e}")
+            return
+        self._entries = entries
+        self._trim()
+    
+    @staticmethod
+    def make_key(kind: str, article: Article, *extra: str) -> Optional[str]:
+        """
+        記事ID と更新日時からキーを作る
+        
+        Returns:
+            str: キャッシュキー。記事IDが無い（システム通知など）場合は None
+        """
+        if not article.id:
+            return None
+        parts = [kind, article.id, article.updated_at or article.created_at or ""]
+        parts.extend(extra)
+        return "\x1f".join(parts)
+    
+    def get(self, key: Optional[str]) -> Optional[Any]:
+        """キャッシュされた値を返す（無ければ None）"""
+        if key is None:
+            return None
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return self._entries[key]
+            self._misses += 1
+            return None
+    
+    def put(self, key: Optional[str], value: Any):
+        """値を保存する（キーが None の場合は何もしない）"""
+        if key is None:
+            return
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            self._trim()
+    
+    def _trim(self):
+        """上限を超えた分を古いものから捨てる"""
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+    
+    def save(self):
+        """エントリをファイルに書き出す（永続化しない設定の場合は何もしない）"""
+        if not self.path:
+            return
+        with self._lock:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self._entries, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+    
+    def stats(self) -> Dict[str, Any]:
+        """ヒット率などの統計を返す"""
+        with self._lock:
+            total = self._hits + self._misses
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "entries": len(self._entries),
+                "hit_rate": self._hits / total if total else 0.0
+            }
@@ -0,0 +1,100 @@
+"""
+Slackブロックユーティリティ
+Block Kit の制限（1メッセージ50ブロック、テキスト長）に収まるようにメッセージを分割する
+"""
+from typing import Any, Dict, List
+
+# Slack の制限値
+MAX_BLOCKS_PER_MESSAGE = 50
+MAX_SECTION_TEXT_LENGTH = 3000
+MAX_MESSAGE_TEXT_LENGTH = 40000
+
+
+def build_section_block(text: str) -> Dict[str, Any]:
+    """mrkdwn のセクションブロックを作る"""
+    return {
+        "type": "section",
+        "text": {
+            "type": "mrkdwn",
+            "text": text
+        }
+    }
+
+
+def split_section_text(lines: List[str], max_length: int = MAX_SECTION_TEXT_LENGTH) -> List[str]:
+    """行のリストを、1セクションの文字数上限に収まるテキストに分割する"""
+    chunks = []
+    current = ""
+    for line in lines:
+        line = line[:max_length]
+        candidate = f"{current}\n{line}" if current else line
+        if len(candidate) > max_length:
+            chunks.append(current)
+            candidate = line
+        current = candidate
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def pack_digest_messages(title: str, items: List[Dict[str, Any]],
+                         max_blocks: int = MAX_BLOCKS_PER_MESSAGE,
+                         max_text_length: int = MAX_MESSAGE_TEXT_LENGTH) -> List[Dict[str, Any]]:
+    """
+    見出しと複数の項目を、できるだけ少ないメッセージに詰め込む
+    
+    Args:
+        title (str): 先頭メッセージの見出し（2通目以降は「続き」を付ける）
+        items (list): {"blocks": ブロックのリスト, "text": 代替テキスト} の一覧。
+            その他のキー（記事など）はそのまま各メッセージの "items" に入る
+        max_blocks (int): 1メッセージあたりのブロック数上限
+        max_text_length (int): 1メッセージあたりのテキスト長上限（ブロック + 代替テキスト）
+    
+    Returns:
+        list: {"text": 代替テキスト, "blocks": ブロック, "items": 含まれる項目} の一覧
+    """
+    messages = []
+    current = None
+    
+    for item in items:
+        size = sum(_block_text_length(block) for block in item["blocks"]) + len(item["text"])
+        if current is None or (
+            current["items"]
+            and (len(current["blocks"]) + len(item["blocks"]) > max_blocks
+                 or current["length"] + size > max_text_length)
+        ):
+            if current is not None:
+                messages.append(current)
+            current = _new_message(title, len(messages))
+        
+        current["blocks"].extend(item["blocks"])
+        current["items"].append(item)
+        current["text"] += "\n" + item["text"]
+        current["length"] += size
+    
+    if current is None:
+        current = _new_message(title, 0)
+    messages.append(current)
+    
+    for message in messages:
+        del message["length"]
+    return messages
+
+
+def _new_message(title: str, index: int) -> Dict[str, Any]:
+    """見出しだけのメッセージを作る"""
+    heading = title if index == 0 else f"{title}（続き {index + 1}）"
+    return {
+        "text": heading,
+        "blocks": [build_section_block(heading), {"type": "divider"}],
+        "items": [],
+        "length": len(heading) * 2
+    }
+
+
+def _block_text_length(block: Dict[str, Any]) -> int:
+    """ブロックに含まれるテキストの長さ"""
+    text = block.get("text")
+    if isinstance(text, dict):
+        return len(text.get("text", ""))
+    return 0